@@ -0,0 +1,240 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, insert, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from college_stats import bump_college_stats
+from database import AsyncSessionLocal
+from models import Event, Registration, RegistrationStatus
+from trending import bump_trending
+
+# Admission queue for registrations. Registrations for one event are admitted
+# in batches: while one batch commits, every request arriving for that event
+# waits in memory, and the next batch writes all of them at once with two
+# UPDATEs of the event row and one multi-row INSERT. A surge therefore costs
+# a handful of transactions instead of one write (and one lock wait) per
+# student.
+#
+# Students who don't fit are waitlisted rather than told "Event is full".
+# Each gets a ticket from Event.waitlist_issued; tickets only grow, so the head
+# of the waitlist is one seek on ix_registrations_event_waitlist. A cancelled
+# seat passes straight to the head in the same transaction, so new arrivals
+# can't overtake the queue. ADMISSION_QUEUE_ENABLED=false goes back to one
+# conditional UPDATE per request (register_one) and "Event is full".
+ADMISSION_QUEUE_ENABLED = os.getenv("ADMISSION_QUEUE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Retry-After sent to waitlisted students, pacing their position polls
+WAITLIST_POLL_SECONDS = int(os.getenv("WAITLIST_POLL_SECONDS", 30))
+
+class _Admission:
+    """Requests waiting for one event's next batch, and the lock the batches take turns on"""
+
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending: List[Tuple[int, asyncio.Future]] = []
+
+# One small entry per event registered for since the worker started
+_admissions: Dict[int, _Admission] = {}
+
+async def admit(event_id: int, college_id: int, student_id: int) -> int:
+    """Register the student, or waitlist them if the event is full. Returns the registration id.
+
+    The caller must not hold an open transaction: the batch commits on its
+    own connection.
+    """
+    admission = _admissions.setdefault(event_id, _Admission())
+    future = asyncio.get_running_loop().create_future()
+    admission.pending.append((student_id, future))
+
+    async with admission.lock:
+        # An earlier batch may already have taken this request along
+        if not future.done():
+            batch, admission.pending = admission.pending, []
+            try:
+                registration_ids = await _admit_batch(event_id, college_id, [student for student, _ in batch])
+            except Exception as exc:
+                for _, waiting in batch:
+                    waiting.set_exception(exc)
+            else:
+                for student, waiting in batch:
+                    waiting.set_result(registration_ids[student])
+            finally:
+                # This request was cancelled mid-batch (client gone, timeout):
+                # nobody else will pick the batch up, so fail it rather than hang
+                for _, waiting in batch:
+                    if waiting is future:
+                        waiting.cancel()
+                    elif not waiting.done():
+                        waiting.set_exception(HTTPException(
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Registration was interrupted; check your registrations and try again"
+                        ))
+    return await future
+
+async def _admit_batch(event_id: int, college_id: int, students: List[int]) -> Dict[int, int]:
+    students = list(dict.fromkeys(students))
+    requested = len(students)
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        # Take a ticket for everyone first: the UPDATE locks the event row, so
+        # the seat count it returns can't change before we commit
+        event = (await db.execute(
+            update(Event).where(Event.id == event_id).values(
+                waitlist_issued=Event.waitlist_issued + requested
+            ).returning(
+                Event.waitlist_issued, Event.registered_count, Event.max_attendees
+            ).execution_options(synchronize_session=False)
+        )).first()
+        if event is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found or registration closed"
+            )
+
+        # Arrival order decides who gets the free seats; they hand back their tickets
+        seats = min(requested, max(0, event.max_attendees - event.registered_count))
+        first_ticket = event.waitlist_issued - requested + 1
+        if seats:
+            await db.execute(
+                update(Event).where(Event.id == event_id).values(
+                    registered_count=Event.registered_count + seats,
+                    waitlist_issued=Event.waitlist_issued - seats
+                ).execution_options(synchronize_session=False)
+            )
+
+        rows = [
+            {
+                "student_id": student_id,
+                "event_id": event_id,
+                "status": RegistrationStatus.REGISTERED if i < seats else RegistrationStatus.WAITLISTED,
+                "waitlist_ticket": None if i < seats else first_ticket + i - seats,
+                "registration_date": now,
+            }
+            for i, student_id in enumerate(students)
+        ]
+        # Unordered RETURNING lets SQLAlchemy send multi-row INSERTs; rows are matched up by student
+        inserted = (await db.execute(
+            insert(Registration).returning(Registration.student_id, Registration.id), rows
+        )).all()
+        # Waitlisted sign-ups count towards trending too: they show demand.
+        # data_version moves even with no seats taken, so cached rankings do too
+        await bump_college_stats(db, college_id, total_registrations=seats)
+        await bump_trending(db, event_id, added=[now] * requested)
+        await db.commit()
+    return dict(inserted)
+
+async def register_one(db: AsyncSession, event_id: int, college_id: int, student_id: int) -> int:
+    """One request, one conditional UPDATE: the path without the admission queue"""
+    registration = Registration(
+        student_id=student_id,
+        event_id=event_id,
+        status=RegistrationStatus.REGISTERED,
+        registration_date=datetime.utcnow()
+    )
+
+    # Reserve a seat with one conditional UPDATE: it only matches while seats
+    # remain, so concurrent requests can never oversell the event
+    reserved = await db.execute(
+        update(Event).where(
+            and_(
+                Event.id == event_id,
+                Event.registered_count < Event.max_attendees
+            )
+        ).values(
+            registered_count=Event.registered_count + 1
+        ).execution_options(synchronize_session=False)
+    )
+
+    if reserved.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Event is full"
+        )
+
+    db.add(registration)
+    await bump_college_stats(db, college_id, total_registrations=1)
+    await bump_trending(db, event_id, added=[registration.registration_date])
+    await db.commit()
+    return registration.id
+
+async def promote_next(db: AsyncSession, event_id: int) -> Optional[int]:
+    """Give a seat the caller already holds to the head of the waitlist.
+
+    Returns the promoted registration id, or None if nobody is waiting (the
+    caller then releases the seat).
+    """
+    while True:
+        head = (await db.execute(
+            select(Registration.id).filter(
+                and_(
+                    Registration.event_id == event_id,
+                    Registration.status == RegistrationStatus.WAITLISTED
+                )
+            ).order_by(Registration.waitlist_ticket).limit(1)
+        )).scalar()
+        if head is None:
+            return None
+
+        # The status guard loses the race if a concurrent cancel promoted the same head
+        promoted = await db.execute(
+            update(Registration).where(
+                and_(
+                    Registration.id == head,
+                    Registration.status == RegistrationStatus.WAITLISTED
+                )
+            ).values(
+                status=RegistrationStatus.REGISTERED,
+                waitlist_ticket=None
+            ).execution_options(synchronize_session=False)
+        )
+        if promoted.rowcount == 1:
+            return head
+
+async def fill_open_seats(db: AsyncSession, event_id: int) -> int:
+    """Promote waiters into any free seats, e.g. after max_attendees was raised"""
+    promoted = 0
+    while True:
+        reserved = await db.execute(
+            update(Event).where(
+                and_(
+                    Event.id == event_id,
+                    Event.registered_count < Event.max_attendees
+                )
+            ).values(
+                registered_count=Event.registered_count + 1
+            ).execution_options(synchronize_session=False)
+        )
+        if reserved.rowcount != 1:
+            return promoted
+
+        if await promote_next(db, event_id) is None:
+            await db.execute(
+                update(Event).where(Event.id == event_id).values(
+                    registered_count=Event.registered_count - 1
+                ).execution_options(synchronize_session=False)
+            )
+            return promoted
+        promoted += 1
+
+async def waitlist_position(db: AsyncSession, registration: Registration) -> int:
+    """1-based place in the waitlist: waiters holding an earlier ticket, plus one.
+
+    An index-only count over the waiters ahead; it writes nothing, so clients
+    can poll it instead of retrying registration.
+    """
+    ahead = (await db.execute(
+        select(func.count(Registration.id)).filter(
+            and_(
+                Registration.event_id == registration.event_id,
+                Registration.status == RegistrationStatus.WAITLISTED,
+                Registration.waitlist_ticket < registration.waitlist_ticket
+            )
+        )
+    )).scalar()
+    return ahead + 1
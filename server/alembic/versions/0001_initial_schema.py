@@ -0,0 +1,148 @@
+"""Initial schema
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'colleges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('address', sa.Text(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('website', sa.String(), nullable=True),
+        sa.Column('logo', sa.String(), nullable=True),
+        sa.Column('allow_student_registration', sa.Boolean(), nullable=True),
+        sa.Column('require_approval_for_events', sa.Boolean(), nullable=True),
+        sa.Column('max_events_per_student', sa.Integer(), nullable=True),
+        sa.Column('email_notifications', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_colleges_id'), 'colleges', ['id'], unique=False)
+    op.create_index(op.f('ix_colleges_name'), 'colleges', ['name'], unique=False)
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('role', sa.Enum('ADMIN', 'STUDENT', 'FACULTY', name='userrole'), nullable=True),
+        sa.Column('department', sa.String(), nullable=True),
+        sa.Column('year', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('profile_image', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('events_attended', sa.Integer(), nullable=True),
+        sa.Column('college_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['college_id'], ['colleges.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    op.create_table(
+        'events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('time', sa.String(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('category', sa.Enum('TECHNOLOGY', 'CAREER', 'CULTURAL', 'SPORTS', 'ACADEMIC', 'WORKSHOP', 'SEMINAR', 'OTHER', name='eventcategory'), nullable=False),
+        sa.Column('max_attendees', sa.Integer(), nullable=False),
+        sa.Column('registered_count', sa.Integer(), nullable=True),
+        sa.Column('attended_count', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('DRAFT', 'ACTIVE', 'CANCELLED', 'COMPLETED', name='eventstatus'), nullable=True),
+        sa.Column('image', sa.String(), nullable=True),
+        sa.Column('requirements', sa.Text(), nullable=True),
+        sa.Column('tags', sa.String(), nullable=True),
+        sa.Column('qr_code', sa.String(), nullable=True),
+        sa.Column('is_registration_open', sa.Boolean(), nullable=True),
+        sa.Column('registration_deadline', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('organizer_id', sa.Integer(), nullable=False),
+        sa.Column('college_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['college_id'], ['colleges.id']),
+        sa.ForeignKeyConstraint(['organizer_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_events_category'), 'events', ['category'], unique=False)
+    op.create_index(op.f('ix_events_date'), 'events', ['date'], unique=False)
+    op.create_index(op.f('ix_events_id'), 'events', ['id'], unique=False)
+    op.create_index(op.f('ix_events_status'), 'events', ['status'], unique=False)
+    op.create_index(op.f('ix_events_title'), 'events', ['title'], unique=False)
+
+    op.create_table(
+        'registrations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('registration_date', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('status', sa.Enum('REGISTERED', 'CANCELLED', 'ATTENDED', 'NO_SHOW', name='registrationstatus'), nullable=True),
+        sa.Column('check_in_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_registrations_id'), 'registrations', ['id'], unique=False)
+
+    op.create_table(
+        'feedback',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_feedback_id'), 'feedback', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_feedback_id'), table_name='feedback')
+    op.drop_table('feedback')
+    op.drop_index(op.f('ix_registrations_id'), table_name='registrations')
+    op.drop_table('registrations')
+    op.drop_index(op.f('ix_events_title'), table_name='events')
+    op.drop_index(op.f('ix_events_status'), table_name='events')
+    op.drop_index(op.f('ix_events_id'), table_name='events')
+    op.drop_index(op.f('ix_events_date'), table_name='events')
+    op.drop_index(op.f('ix_events_category'), table_name='events')
+    op.drop_table('events')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_colleges_name'), table_name='colleges')
+    op.drop_index(op.f('ix_colleges_id'), table_name='colleges')
+    op.drop_table('colleges')
+    sa.Enum(name='registrationstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='eventstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='eventcategory').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,37 @@
+"""Materialized college_stats counters
+
+Revision ID: 0002_college_stats
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_college_stats'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by create_all since the counters were introduced already have the table
+    if sa.inspect(op.get_bind()).has_table('college_stats'):
+        return
+    op.create_table(
+        'college_stats',
+        sa.Column('college_id', sa.Integer(), nullable=False),
+        sa.Column('total_events', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_students', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_registrations', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_events', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['college_id'], ['colleges.id']),
+        sa.PrimaryKeyConstraint('college_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('college_stats')
@@ -0,0 +1,38 @@
+"""Indexes for the hot query shapes
+
+Revision ID: 0003_query_indexes
+Revises: 0002_college_stats
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_query_indexes'
+down_revision = '0002_college_stats'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_users_college_role', 'users', ['college_id', 'role']),
+    ('ix_events_college_status_date', 'events', ['college_id', 'status', 'date']),
+    ('ix_events_college_registered_count', 'events', ['college_id', 'registered_count']),
+    ('ix_events_college_date', 'events', ['college_id', 'date', 'id']),
+    ('ix_events_college_created_at', 'events', ['college_id', 'created_at', 'id']),
+    ('ix_registrations_event_status', 'registrations', ['event_id', 'status']),
+    ('ix_registrations_student_event', 'registrations', ['student_id', 'event_id']),
+    ('ix_registrations_student_created_at', 'registrations', ['student_id', 'created_at', 'id']),
+    ('ix_feedback_event_created_at', 'feedback', ['event_id', 'created_at', 'id']),
+    ('ix_feedback_student_event', 'feedback', ['student_id', 'event_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,58 @@
+"""Full-text search index on events
+
+Revision ID: 0004_event_search
+Revises: 0003_query_indexes
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_event_search'
+down_revision = '0003_query_indexes'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(events.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(events.description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(events.location, '') || ' ' || coalesce(events.tags, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            title, description, location, tags,
+            content='events', content_rowid='id', tokenize='porter unicode61'
+        )""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts(rowid, title, description, location, tags)
+            VALUES (new.id, new.title, new.description, new.location, new.tags);
+        END""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+            INSERT INTO events_fts(events_fts, rowid, title, description, location, tags)
+            VALUES ('delete', old.id, old.title, old.description, old.location, old.tags);
+        END""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF title, description, location, tags ON events BEGIN
+            INSERT INTO events_fts(events_fts, rowid, title, description, location, tags)
+            VALUES ('delete', old.id, old.title, old.description, old.location, old.tags);
+            INSERT INTO events_fts(rowid, title, description, location, tags)
+            VALUES (new.id, new.title, new.description, new.location, new.tags);
+        END""")
+        op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_events_search ON events USING GIN (({SEARCH_VECTOR}))")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS events_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS events_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS events_fts_ai")
+        op.execute("DROP TABLE IF EXISTS events_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_events_search")
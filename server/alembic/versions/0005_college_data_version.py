@@ -0,0 +1,26 @@
+"""Per-college data version for listing ETags
+
+Revision ID: 0005_college_data_version
+Revises: 0004_event_search
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_college_data_version'
+down_revision = '0004_event_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('college_stats') as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('college_stats') as batch_op:
+        batch_op.drop_column('data_version')
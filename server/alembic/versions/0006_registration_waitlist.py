@@ -0,0 +1,39 @@
+"""Registration waitlist
+
+Revision ID: 0006_registration_waitlist
+Revises: 0005_college_data_version
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_registration_waitlist'
+down_revision = '0005_college_data_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE registrationstatus ADD VALUE IF NOT EXISTS 'WAITLISTED'")
+
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.add_column(sa.Column('waitlist_issued', sa.Integer(), nullable=False, server_default='0'))
+    with op.batch_alter_table('registrations') as batch_op:
+        batch_op.add_column(sa.Column('waitlist_ticket', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_registrations_event_waitlist', 'registrations', ['event_id', 'status', 'waitlist_ticket'], unique=False
+    )
+
+
+def downgrade() -> None:
+    # Waitlisted rows have no status to go back to; PostgreSQL keeps the enum value
+    op.execute("DELETE FROM registrations WHERE status = 'WAITLISTED'")
+    op.drop_index('ix_registrations_event_waitlist', table_name='registrations')
+    # Plain ALTER TABLE (SQLite 3.35+): a batch rebuild of events would drop the search triggers
+    op.drop_column('registrations', 'waitlist_ticket')
+    op.drop_column('events', 'waitlist_issued')
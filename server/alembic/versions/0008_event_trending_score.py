@@ -0,0 +1,71 @@
+"""Event trending score
+
+Revision ID: 0008_event_trending_score
+Revises: 0007_rate_limit_buckets
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from datetime import datetime, timezone
+import math
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_event_trending_score'
+down_revision = '0007_rate_limit_buckets'
+branch_labels = None
+depends_on = None
+
+# The same setting and epoch as trending.py, so backfilled scores and the ones
+# added later are on one scale; scores are log2 of sum(2^(t / half-life))
+HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24))
+EPOCH = datetime(2000, 1, 1)
+
+
+def _weight(registered_at) -> float:
+    if isinstance(registered_at, str):
+        registered_at = datetime.fromisoformat(registered_at)
+    if registered_at.tzinfo is not None:
+        registered_at = registered_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return (registered_at - EPOCH).total_seconds() / (HALF_LIFE_HOURS * 3600)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.add_column(sa.Column('trending_score', sa.Float(), nullable=False, server_default='0'))
+    op.create_index(
+        'ix_events_college_status_trending', 'events', ['college_id', 'status', 'trending_score'], unique=False
+    )
+    op.create_index(
+        'ix_registrations_event_date', 'registrations', ['event_id', 'registration_date'], unique=False
+    )
+
+    # Backfill from the existing sign-ups
+    bind = op.get_bind()
+    scores = {}
+    for event_id, registered_at in bind.execute(sa.text(
+        "SELECT event_id, registration_date FROM registrations "
+        "WHERE status != 'CANCELLED' AND registration_date IS NOT NULL"
+    )):
+        weight = _weight(registered_at)
+        score = scores.get(event_id)
+        if score is None:
+            scores[event_id] = weight
+        else:
+            high, low = max(score, weight), min(score, weight)
+            scores[event_id] = high + math.log2(1 + 2 ** (low - high))
+    if scores:
+        bind.execute(
+            sa.text("UPDATE events SET trending_score = :score WHERE id = :id"),
+            [{"id": event_id, "score": score} for event_id, score in scores.items()]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_registrations_event_date', table_name='registrations')
+    op.drop_index('ix_events_college_status_trending', table_name='events')
+    # Plain ALTER TABLE (SQLite 3.35+): a batch rebuild of events would drop the search triggers
+    op.drop_column('events', 'trending_score')
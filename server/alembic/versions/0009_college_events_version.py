@@ -0,0 +1,26 @@
+"""Per-college events version for the event calendar
+
+Revision ID: 0009_college_events_version
+Revises: 0008_event_trending_score
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_college_events_version'
+down_revision = '0008_event_trending_score'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('college_stats') as batch_op:
+        batch_op.add_column(sa.Column('events_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('college_stats') as batch_op:
+        batch_op.drop_column('events_version')
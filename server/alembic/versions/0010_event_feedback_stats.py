@@ -0,0 +1,48 @@
+"""Running per-event feedback aggregates
+
+Revision ID: 0010_event_feedback_stats
+Revises: 0009_college_events_version
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_event_feedback_stats'
+down_revision = '0009_college_events_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_feedback_stats',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_1', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_2', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_3', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_4', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_5', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id']),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+
+    # Backfill from the existing feedback
+    op.execute(
+        "INSERT INTO event_feedback_stats "
+        "(event_id, rating_sum, rating_count, rating_1, rating_2, rating_3, rating_4, rating_5) "
+        "SELECT event_id, SUM(rating), COUNT(*), "
+        "SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END), SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END), SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END) "
+        "FROM feedback GROUP BY event_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('event_feedback_stats')
@@ -1,29 +1,183 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+import asyncio
+import hashlib
 import os
+import threading
+import time
 
-from database import get_db
-from models import User
+from cache import TTLCache
+from database import get_async_db
+from models import User, UserRole
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Principal cache: bounds how long a change made outside this process can go unnoticed
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+# bcrypt cost factor for this environment. Pinning min/max to the same value makes
+# hashes with any other cost "need update", so they are rehashed on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Hashing runs on a bounded thread pool so it never blocks the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 256))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 security = HTTPBearer()
 
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool with a cap on pending jobs"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+
+    def _track(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._track, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "queue_depth": max(self.pending - self.running, 0),
+            "running": self.running,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached, immutable snapshot of the authenticated user"""
+    id: int
+    email: str
+    role: UserRole
+    college_id: int
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            college_id=user.college_id,
+            is_active=user.is_active
+        )
+
+# Keyed by token subject (email)
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+# Keyed by sha256 of the raw token, each entry lives until the token's exp
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.pop(email)
+
+def auth_cache_stats() -> dict:
+    return {
+        "principals": principal_cache.stats(),
+        "tokens": token_cache.stats()
+    }
+
+# Cached principals are dropped once a change to their user commits: dropping
+# them at flush would let a concurrent request cache the old row again before
+# the commit, for the whole TTL
+_PENDING_INVALIDATIONS = "invalidated_principals"
+
+def _invalidate_after_commit(target: User, email: str) -> None:
+    session = object_session(target)
+    if session is None:
+        invalidate_principal(email)
+    else:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(email)
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_principal(mapper, connection, target):
+    state = inspect(target)
+    for field in ("is_active", "role", "college_id", "email"):
+        history = state.attrs[field].history
+        if history.has_changes():
+            _invalidate_after_commit(target, target.email)
+            for old_email in history.deleted if field == "email" else ():
+                _invalidate_after_commit(target, old_email)
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_principal(mapper, connection, target):
+    _invalidate_after_commit(target, target.email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    for email in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        invalidate_principal(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_principals(session):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    """get_password_hash off the event loop"""
+    return await password_hasher.run(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash if the stored one uses an outdated cost"""
+    return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -35,6 +189,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str):
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    email = token_cache.get(token_key)
+    if email is not None:
+        return email
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -44,36 +203,45 @@ def verify_token(token: str):
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return email
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Memoize until the token expires
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        token_cache.set(token_key, email, ttl=expires_at - time.time())
+    return email
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     token = credentials.credentials
     email = verify_token(token)
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    if not user.is_active:
+    principal = principal_cache.get(email)
+    if principal is None:
+        user = (await db.execute(select(User).filter(User.email == email))).scalars().first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal.from_user(user)
+        principal_cache.set(email, principal)
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Inactive user",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    return principal
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -81,7 +249,7 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)):
         )
     return current_user
 
-def get_current_student_user(current_user: User = Depends(get_current_user)):
+def get_current_student_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role not in ["student", "faculty"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Upcoming/available event listings: SQL scan vs the in-memory event calendar.
+
+Seeds one college with --events events (about half of them upcoming) and
+times /events/upcoming, /student/events (first page, a category, and a page
+deep into the list by cursor) and the admin dashboard, --requests times each,
+first through the SQL path and then through the calendar. Reports latency,
+the calendar's build time and its memory accounting.
+
+Then checks that both paths return identical bodies and cursors, before and
+after a registration (counts are refreshed without a rebuild) and after an
+admin creates, edits and deletes events (the calendar is rebuilt). Fails on
+any difference.
+
+    python benchmarks/bench_calendar.py --events 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+def use_calendar(enabled):
+    import routers.admin
+    import routers.events
+    import routers.student
+
+    for module in (routers.admin, routers.events, routers.student):
+        module.EVENT_CALENDAR_ENABLED = enabled
+
+
+async def fetch(client, url, headers):
+    response = await client.get(url, headers=headers)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+async def timings(client, calls, requests):
+    results = {}
+    for name, url, headers in calls:
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            await fetch(client, url, headers)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[name] = (statistics.median(samples), samples[int(len(samples) * 0.99) - 1])
+    return results
+
+
+async def compare(client, calls, label):
+    """Bodies and next cursors of both paths; returns the names that differ"""
+    differences = []
+    for name, url, headers in calls:
+        use_calendar(False)
+        expected = await fetch(client, url, headers)
+        use_calendar(True)
+        actual = await fetch(client, url, headers)
+        if expected.json() != actual.json() or expected.headers.get("X-Next-Cursor") != actual.headers.get("X-Next-Cursor"):
+            differences.append(f"{label}: {name}")
+    return differences
+
+
+async def run(app, dataset, args):
+    import httpx
+    from event_calendar import calendar_stats, invalidate_calendar
+
+    college_id = dataset["college_id"]
+    admin = auth_headers(dataset["admin_email"])
+    student = auth_headers(dataset["student_emails"][0])
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # A cursor --depth pages into the available list, identical for both paths
+        use_calendar(False)
+        cursor = None
+        for _ in range(args.depth):
+            page = await fetch(client, "/student/events?limit=100" + (f"&cursor={cursor}" if cursor else ""), student)
+            cursor = page.headers.get("X-Next-Cursor")
+        calls = [
+            ("upcoming", "/events/upcoming?limit=50", student),
+            ("available", "/student/events?limit=100", student),
+            ("category", "/student/events?limit=100&category=Career", student),
+            (f"page {args.depth + 1}", f"/student/events?limit=100&cursor={cursor}", student),
+            ("dashboard", "/admin/dashboard", admin),
+        ]
+
+        sql = await timings(client, calls, args.requests)
+
+        use_calendar(True)
+        invalidate_calendar(college_id)
+        start = time.perf_counter()
+        await fetch(client, "/events/upcoming?limit=1", student)
+        build = time.perf_counter() - start
+        cached = await timings(client, calls, args.requests)
+        stats = calendar_stats()
+
+        differences = await compare(client, calls, "seeded")
+
+        # A registration moves one event's count: refreshed in place, no rebuild
+        builds = calendar_stats()["builds"]
+        event_id = (await fetch(client, "/events/upcoming?limit=1", student)).json()[0]["id"]
+        other = auth_headers(dataset["student_emails"][-1])
+        response = await client.post(f"/student/events/{event_id}/register", headers=other)
+        if response.status_code != 200:
+            raise RuntimeError(f"register -> {response.status_code}: {response.text[:200]}")
+        differences += await compare(client, calls, "after a registration")
+        rebuilt_on_registration = calendar_stats()["builds"] > builds
+
+        # Admin edits: the next request rebuilds
+        soon = datetime.utcnow() + timedelta(hours=1)
+        created = await client.post("/admin/events", headers=admin, json={
+            "title": "Bench calendar", "description": "d", "date": soon.isoformat(),
+            "time": "10:00 AM", "location": "Hall", "category": "Career", "max_attendees": 10
+        })
+        await client.put(f"/admin/events/{event_id}", headers=admin, json={"title": "Renamed", "category": "Career"})
+        upcoming = (await fetch(client, "/events/upcoming?limit=3", student)).json()
+        await client.delete(f"/admin/events/{upcoming[-1]['id']}", headers=admin)
+        if created.status_code != 200:
+            raise RuntimeError(f"create -> {created.status_code}: {created.text[:200]}")
+        differences += await compare(client, calls, "after admin edits")
+
+    return sql, cached, build, stats, differences, rebuilt_on_registration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and path")
+    parser.add_argument("--depth", type=int, default=50, help="Pages walked for the deep-page cursor")
+    args = parser.parse_args()
+
+    use_temp_database("calendar")
+    create_schema()
+
+    from main import app
+
+    print(f"Seeding {args.events} events...")
+    dataset = seed_college(num_events=args.events, registrations_per_event=0, feedback_per_event=0, num_students=10)
+    sql, cached, build, stats, differences, rebuilt = asyncio.run(run(app, dataset, args))
+
+    print(f"{'endpoint':<12} {'sql p50':>9} {'p99':>9} {'calendar p50':>13} {'p99':>9} {'speedup':>8}")
+    for name in sql:
+        print(f"{name:<12} {sql[name][0]:>7.2f}ms {sql[name][1]:>7.2f}ms {cached[name][0]:>11.2f}ms "
+              f"{cached[name][1]:>7.2f}ms {sql[name][0] / cached[name][0]:>7.1f}x")
+    print(f"Calendar: {stats['events']} upcoming events in {stats['bytes'] / 2**20:.1f} MiB "
+          f"({stats['bytes'] / max(stats['events'], 1):.0f} bytes/event), built in {build * 1000:.0f}ms")
+
+    failed = False
+    for difference in differences:
+        print(f"FAIL: calendar and SQL responses differ ({difference})")
+        failed = True
+    if rebuilt:
+        print("FAIL: a registration rebuilt the calendar instead of refreshing its counts")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Door-scanner throughput: PUT /admin/registrations/{id}/checkin one at a time
+vs POST /admin/events/{id}/checkins in batches.
+
+Both runs check in every registration of a fresh event, then verify the
+stored attended_count and events_attended totals.
+
+    python benchmarks/bench_checkin.py --attendees 500 --batch 100
+"""
+
+import argparse
+import sys
+import time
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+def stored_totals(event_id):
+    from sqlalchemy import func
+    from database import SessionLocal
+    from models import User, Event, Registration, RegistrationStatus
+
+    db = SessionLocal()
+    try:
+        attended_count = db.get(Event, event_id).attended_count
+        attended_rows = db.query(func.count(Registration.id)).filter(
+            Registration.event_id == event_id,
+            Registration.status == RegistrationStatus.ATTENDED
+        ).scalar()
+        events_attended = db.query(func.sum(User.events_attended)).join(
+            Registration, Registration.student_id == User.id
+        ).filter(Registration.event_id == event_id).scalar()
+        return attended_count, attended_rows, events_attended
+    finally:
+        db.close()
+
+
+def fresh_event(attendees, label):
+    """One event with `attendees` registrations, none checked in yet"""
+    from database import engine
+    from models import User, Event, Registration, RegistrationStatus
+
+    dataset = seed_college(num_events=1, registrations_per_event=attendees, feedback_per_event=0,
+                           college_name=f"{label} College")
+    event_id = dataset["event_ids"][0]
+    with engine.begin() as conn:
+        conn.execute(Registration.__table__.update().where(Registration.event_id == event_id).values(
+            status=RegistrationStatus.REGISTERED))
+        conn.execute(Event.__table__.update().where(Event.id == event_id).values(attended_count=0))
+        conn.execute(User.__table__.update().where(User.college_id == dataset["college_id"]).values(events_attended=0))
+        registration_ids = [row[0] for row in conn.execute(
+            Registration.__table__.select().with_only_columns(Registration.id).where(
+                Registration.event_id == event_id
+            ).order_by(Registration.id)
+        )]
+    return dataset, event_id, registration_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attendees", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=100, help="Registrations per bulk request")
+    args = parser.parse_args()
+
+    use_temp_database("checkin")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    failed = False
+
+    # One request per registration
+    dataset, event_id, registration_ids = fresh_event(args.attendees, "Single")
+    headers = auth_headers(dataset["admin_email"])
+    start = time.perf_counter()
+    for registration_id in registration_ids:
+        client.put(f"/admin/registrations/{registration_id}/checkin", headers=headers).raise_for_status()
+    single = time.perf_counter() - start
+    single_totals = stored_totals(event_id)
+
+    # Batches of registration ids
+    dataset, event_id, registration_ids = fresh_event(args.attendees, "Bulk")
+    headers = auth_headers(dataset["admin_email"])
+    start = time.perf_counter()
+    checked_in = 0
+    for i in range(0, len(registration_ids), args.batch):
+        response = client.post(f"/admin/events/{event_id}/checkins", headers=headers,
+                               json={"registration_ids": registration_ids[i:i + args.batch]})
+        response.raise_for_status()
+        checked_in += response.json()["checked_in"]
+    bulk = time.perf_counter() - start
+    bulk_totals = stored_totals(event_id)
+
+    # Scanning the same badges again must not count anyone twice
+    response = client.post(f"/admin/events/{event_id}/checkins", headers=headers,
+                           json={"registration_ids": registration_ids[:args.batch], "student_ids": [0]})
+    response.raise_for_status()
+    statuses = {result["status"] for result in response.json()["results"]}
+
+    print(f"{args.attendees} attendees")
+    print(f"single: {args.attendees / single:8.0f} check-ins/s ({single:.2f}s), stored {single_totals}")
+    print(f"bulk:   {args.attendees / bulk:8.0f} check-ins/s ({bulk:.2f}s, batches of {args.batch}), stored {bulk_totals}")
+    print(f"speedup: {single / bulk:.1f}x")
+
+    expected = (args.attendees,) * 3
+    if single_totals != expected or bulk_totals != expected or checked_in != args.attendees:
+        print(f"FAIL: expected {args.attendees} check-ins reflected in every counter")
+        failed = True
+    if response.json()["checked_in"] != 0 or statuses != {"already_checked_in", "not_found"}:
+        print(f"FAIL: repeated scan changed counters or misreported results: {statuses}")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Latency of GET /events/upcoming while GET /admin/reports/events runs in parallel.
+
+Both streams share one event loop, as they would on a single uvicorn worker.
+With the async database path a slow report no longer stalls cheap reads.
+
+    python benchmarks/bench_concurrency.py --events 5000 --duration 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def poll(client, path, headers, params, deadline, samples):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers, params=params)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+
+
+async def run(app, dataset, duration, readers, reporters):
+    import httpx
+
+    student = auth_headers(dataset["student_emails"][0])
+    admin = auth_headers(dataset["admin_email"])
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, reporter_count in (("idle", 0), ("with reports", reporters)):
+            upcoming, reports = [], []
+            deadline = time.perf_counter() + duration
+            tasks = [poll(client, "/events/upcoming", student, {"limit": 10}, deadline, upcoming) for _ in range(readers)]
+            tasks += [poll(client, "/admin/reports/events", admin, {"limit": 500}, deadline, reports) for _ in range(reporter_count)]
+            await asyncio.gather(*tasks)
+
+            print(f"/events/upcoming ({label}): {len(upcoming)} requests, "
+                  f"p50 {statistics.median(upcoming) * 1000:.1f} ms, "
+                  f"p99 {percentile(upcoming, 99) * 1000:.1f} ms")
+            if reports:
+                print(f"/admin/reports/events: {len(reports)} requests, "
+                      f"p50 {statistics.median(reports) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--registrations", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per phase")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--reporters", type=int, default=2)
+    args = parser.parse_args()
+
+    use_temp_database("concurrency")
+    create_schema()
+
+    from main import app
+
+    dataset = seed_college(num_events=args.events, registrations_per_event=args.registrations)
+    asyncio.run(run(app, dataset, args.duration, args.readers, args.reporters))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /admin/dashboard: live COUNT(*) queries vs materialized college_stats.
+
+    python benchmarks/bench_dashboard.py --events 10000 --registrations 100   # 1M registrations
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from common import use_temp_database, create_schema, seed_college, auth_headers, count_queries
+
+
+def legacy_dashboard(db, college_id):
+    """The five COUNT(*) queries the dashboard used to run on every request."""
+    from sqlalchemy import and_
+    from models import User, Event, Registration, EventStatus
+
+    return {
+        "total_events": db.query(Event).filter(Event.college_id == college_id).count(),
+        "total_students": db.query(User).filter(
+            and_(User.college_id == college_id, User.role == "student")
+        ).count(),
+        "total_registrations": db.query(Registration).join(Event).filter(
+            Event.college_id == college_id
+        ).count(),
+        "upcoming_events": db.query(Event).filter(
+            and_(
+                Event.college_id == college_id,
+                Event.date >= datetime.utcnow(),
+                Event.status == EventStatus.ACTIVE
+            )
+        ).count(),
+        "completed_events": db.query(Event).filter(
+            and_(Event.college_id == college_id, Event.status == EventStatus.COMPLETED)
+        ).count(),
+    }
+
+
+def best_of(rounds, fn):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--registrations", type=int, default=100, help="Registrations per event")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database("dashboard")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from database import SessionLocal
+    from college_stats import rebuild_college_stats
+    from main import app
+
+    start = time.perf_counter()
+    dataset = seed_college(num_events=args.events, registrations_per_event=args.registrations, feedback_per_event=0)
+    print(f"Seeded {args.events * args.registrations:,} registrations in {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rebuild_college_stats(db)
+        db.commit()
+        print(f"Reconcile: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        legacy, legacy_time = best_of(args.rounds, lambda: legacy_dashboard(db, dataset["college_id"]))
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    headers = auth_headers(dataset["admin_email"])
+    with count_queries() as queries:
+        client.get("/admin/dashboard", headers=headers).raise_for_status()
+    response, endpoint_time = best_of(
+        args.rounds, lambda: client.get("/admin/dashboard", headers=headers).json()
+    )
+
+    print(f"Legacy COUNT(*) path:   {legacy_time * 1000:8.1f} ms (5 queries)")
+    print(f"Materialized endpoint:  {endpoint_time * 1000:8.1f} ms ({queries['count']} queries incl. auth)")
+
+    if response != legacy:
+        print(f"FAIL: counters diverged\n  legacy:       {legacy}\n  materialized: {response}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write traffic against the engine settings from database.py.
+
+Concurrent clients send 80% reads (GET /events/upcoming and GET /events/{id})
+and 20% registrations, first with the old engine defaults (no pool,
+rollback journal, synchronous=FULL) and then with the tuned defaults
+(connection pool, WAL, synchronous=NORMAL, mmap and a larger page cache).
+Each configuration runs in its own process, since the engine is built from
+the environment at import time.
+
+    python benchmarks/bench_engine.py --clients 16 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+from bench_concurrency import percentile
+
+CONFIGS = {
+    # What create_engine(DATABASE_URL) used to give us. pysqlite's own 5s
+    # lock timeout applied before, so the busy timeout stays the same.
+    "legacy": {
+        "DB_POOL_SIZE": "0",
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+    },
+    "tuned": {},
+}
+
+WRITE_RATIO = 0.2
+
+
+async def client_loop(client, rng, dataset, deadline, samples, outcomes):
+    events = dataset["event_ids"]
+    students = dataset["student_emails"]
+    while time.perf_counter() < deadline:
+        headers = auth_headers(rng.choice(students))
+        if rng.random() < WRITE_RATIO:
+            kind = "register"
+            request = client.post(f"/student/events/{rng.choice(events)}/register", headers=headers)
+        elif rng.random() < 0.5:
+            kind = "upcoming"
+            request = client.get("/events/upcoming", headers=headers, params={"limit": 20})
+        else:
+            kind = "detail"
+            request = client.get(f"/events/{rng.choice(events)}", headers=headers)
+
+        start = time.perf_counter()
+        response = await request
+        samples.setdefault(kind, []).append(time.perf_counter() - start)
+        if response.status_code == 200:
+            outcomes["ok"] += 1
+        elif response.status_code == 400:
+            # Already registered or event full: a correct answer, not a failure
+            outcomes["rejected"] += 1
+        else:
+            outcomes[f"error {response.status_code}"] += 1
+
+
+async def run(app, dataset, clients, duration):
+    import httpx
+
+    # Count unhandled server errors (for example "database is locked") as 500s
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    samples = {}
+    outcomes = Counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, random.Random(seed), dataset, deadline, samples, outcomes)
+            for seed in range(clients)
+        ))
+        elapsed = time.perf_counter() - start
+    return samples, outcomes, elapsed
+
+
+def measure(args):
+    """Child process: seed a fresh database and run the workload with the current environment"""
+    use_temp_database("engine")
+    create_schema()
+
+    from main import app
+
+    dataset = seed_college(
+        num_events=args.events, registrations_per_event=0, feedback_per_event=0,
+        num_students=args.students, max_attendees=args.capacity
+    )
+    samples, outcomes, elapsed = asyncio.run(run(app, dataset, args.clients, args.duration))
+
+    latencies = [sample for kind in samples.values() for sample in kind]
+    print(json.dumps({
+        "throughput": len(latencies) / elapsed,
+        "outcomes": dict(outcomes),
+        "latency": {
+            kind: {"p50": statistics.median(values) * 1000, "p99": percentile(values, 99) * 1000}
+            for kind, values in sorted(samples.items())
+        },
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per configuration")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args)
+        return
+
+    results = {}
+    for name, overrides in CONFIGS.items():
+        child = subprocess.run(
+            [sys.executable, __file__, "--measure"] + sys.argv[1:],
+            env={**os.environ, **overrides}, capture_output=True, text=True
+        )
+        if child.returncode != 0:
+            print(child.stderr)
+            sys.exit(child.returncode)
+        results[name] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    print(f"{args.clients} clients, {int(WRITE_RATIO * 100)}% registrations, {args.duration:.0f}s per configuration")
+    print(f"{'config':<8} {'req/s':>7} {'errors':>7}  {'request':<9} {'p50 ms':>8} {'p99 ms':>8}")
+    failed = False
+    for name, result in results.items():
+        errors = sum(count for outcome, count in result["outcomes"].items() if outcome.startswith("error"))
+        for i, (kind, latency) in enumerate(result["latency"].items()):
+            prefix = f"{name:<8} {result['throughput']:>7.0f} {errors:>7}" if i == 0 else " " * 24
+            print(f"{prefix}  {kind:<9} {latency['p50']:>8.1f} {latency['p99']:>8.1f}")
+        if name == "tuned" and errors:
+            print(f"FAIL: tuned engine returned errors: {result['outcomes']}")
+            failed = True
+
+    print(f"Throughput: {results['tuned']['throughput'] / results['legacy']['throughput']:.1f}x")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
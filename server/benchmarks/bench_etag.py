@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Requests/sec of the polled event listings: full responses vs cache-validated
+polls that send If-None-Match and get 304 Not Modified.
+
+Also checks that a 304 never reads the events table and that registration
+and event writes change the ETag.
+
+    python benchmarks/bench_etag.py --events 1000 --polls 500
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+LISTINGS = ["/events/", "/events/upcoming", "/events/popular", "/events/categories"]
+
+
+async def run(app, dataset, polls, engines):
+    import httpx
+    from sqlalchemy import event as sa_event
+
+    student = auth_headers(dataset["student_emails"][-1])
+    admin = auth_headers(dataset["admin_email"])
+    failed = False
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        print(f"{'listing':<20} {'200 req/s':>10} {'304 req/s':>10} {'speedup':>8}")
+        for url in LISTINGS:
+            first = await client.get(url, headers=student)
+            first.raise_for_status()
+            etag = first.headers["ETag"]
+
+            start = time.perf_counter()
+            for _ in range(polls):
+                (await client.get(url, headers=student)).raise_for_status()
+            full = polls / (time.perf_counter() - start)
+
+            for target in engines:
+                sa_event.listen(target, "before_cursor_execute", capture)
+            statements.clear()
+            start = time.perf_counter()
+            for _ in range(polls):
+                response = await client.get(url, headers={**student, "If-None-Match": etag})
+                if response.status_code == 200 and response.headers["ETag"] != etag:
+                    # /events/upcoming rolls its tag over every minute; revalidate against the new one
+                    etag = response.headers["ETag"]
+                    statements.clear()
+                elif response.status_code != 304:
+                    print(f"FAIL: {url} answered {response.status_code} to a current ETag")
+                    failed = True
+                    break
+            validated = polls / (time.perf_counter() - start)
+            for target in engines:
+                sa_event.remove(target, "before_cursor_execute", capture)
+
+            print(f"{url:<20} {full:>10.0f} {validated:>10.0f} {validated / full:>7.1f}x")
+            touched = [statement for statement in statements if " events" in statement]
+            if touched:
+                print(f"FAIL: 304 responses for {url} queried the events table: {touched[0]}")
+                failed = True
+
+        # Writes must invalidate the tag. Seeded dates depend on --events, so the
+        # writes use an event of their own that is always in the future
+        created = await client.post("/admin/events", headers=admin, json={
+            "title": "ETag check",
+            "description": "Benchmark event",
+            "date": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+            "time": "10:00 AM",
+            "location": "Hall 0",
+            "category": "Workshop",
+            "max_attendees": 10,
+        })
+        created.raise_for_status()
+        event_id = created.json()["id"]
+        writes = [
+            ("register", lambda: client.post(f"/student/events/{event_id}/register", headers=student)),
+            ("cancel", lambda: client.delete(f"/student/events/{event_id}/register", headers=student)),
+            ("update event", lambda: client.put(f"/admin/events/{event_id}", headers=admin, json={"title": "Renamed"})),
+        ]
+        for label, write in writes:
+            etag = (await client.get("/events/", headers=student)).headers["ETag"]
+            (await write()).raise_for_status()
+            response = await client.get("/events/", headers={**student, "If-None-Match": etag})
+            if response.status_code != 200 or response.headers["ETag"] == etag:
+                print(f"FAIL: ETag unchanged after {label}")
+                failed = True
+        if not failed:
+            print("ETag changed after register, cancel and event update")
+
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--polls", type=int, default=500, help="Requests per listing and mode")
+    args = parser.parse_args()
+
+    use_temp_database("etag")
+    create_schema()
+
+    from database import engine, async_engine
+    from main import app
+
+    dataset = seed_college(num_events=args.events, registrations_per_event=10, feedback_per_event=0, num_students=50)
+    failed = asyncio.run(run(app, dataset, args.polls, (engine, async_engine.sync_engine)))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
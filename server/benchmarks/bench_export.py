@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Memory check for the streaming registration and feedback exports.
+
+Seeds one event with N registrations and N feedback rows, then drains both
+export endpoints in a fresh process through a minimal ASGI client that
+discards each chunk as it arrives. Fails if peak RSS grows by more than
+--max-growth-mb during the exports or if any row is missing.
+
+    python benchmarks/bench_export.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+SEED_CHUNK = 50000
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drain(app, path, params, headers):
+    """Run one GET through the ASGI app, counting body bytes and lines without keeping them"""
+    totals = {"status": None, "bytes": 0, "lines": 0}
+    requested = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            totals["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            totals["bytes"] += len(body)
+            totals["lines"] += body.count(b"\n")
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(params).encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    disconnected.set()
+    return totals
+
+
+def measure(dataset, rows, max_growth_mb):
+    """Child process: export everything and report RSS growth"""
+    from main import app
+
+    headers = auth_headers(dataset["admin_email"])
+    event_id = dataset["event_ids"][0]
+    exports = [
+        (f"/admin/events/{event_id}/registrations/export", "csv"),
+        (f"/admin/events/{event_id}/registrations/export", "ndjson"),
+        ("/admin/feedback/export", "csv"),
+        ("/admin/feedback/export", "ndjson"),
+    ]
+
+    # Warm up imports, pools and caches so they are not counted as export memory
+    asyncio.run(drain(app, "/admin/feedback/export", {"format": "csv", "event_id": 0}, headers))
+    baseline = peak_rss_mb()
+
+    failed = False
+    for path, export_format in exports:
+        start = time.perf_counter()
+        totals = asyncio.run(drain(app, path, {"format": export_format}, headers))
+        elapsed = time.perf_counter() - start
+        growth = peak_rss_mb() - baseline
+        # CSV has a header line; NDJSON is one line per row
+        data_lines = totals["lines"] - (1 if export_format == "csv" else 0)
+        print(f"{path:<42} {export_format:<7} {data_lines:>9,} rows {totals['bytes'] / 2**20:7.1f} MB "
+              f"in {elapsed:5.1f}s   peak RSS +{growth:.1f} MB")
+        if totals["status"] != 200 or data_lines != rows:
+            print(f"FAIL: expected {rows} rows with status 200, got {data_lines} rows, status {totals['status']}")
+            failed = True
+
+    growth = peak_rss_mb() - baseline
+    if growth > max_growth_mb:
+        print(f"FAIL: peak RSS grew by {growth:.1f} MB, bound is {max_growth_mb} MB")
+        failed = True
+    return failed
+
+
+def seed(rows):
+    from database import engine
+    from models import Registration, Feedback, RegistrationStatus
+
+    dataset = seed_college(num_events=1, registrations_per_event=0, feedback_per_event=0, num_students=1000)
+    event_id = dataset["event_ids"][0]
+    with engine.connect() as conn:
+        student_ids = [row[0] for row in conn.exec_driver_sql(
+            "SELECT id FROM users WHERE college_id = ? AND role = 'STUDENT'", (dataset["college_id"],)
+        )]
+
+    for start in range(0, rows, SEED_CHUNK):
+        chunk = range(start, min(start + SEED_CHUNK, rows))
+        with engine.begin() as conn:
+            conn.execute(Registration.__table__.insert(), [
+                {"student_id": student_ids[i % len(student_ids)], "event_id": event_id,
+                 "status": RegistrationStatus.REGISTERED, "notes": f"note {i}"}
+                for i in chunk
+            ])
+            conn.execute(Feedback.__table__.insert(), [
+                {"student_id": student_ids[i % len(student_ids)], "event_id": event_id,
+                 "rating": 1 + i % 5, "comment": f"comment, with \"quotes\" {i}"}
+                for i in chunk
+            ])
+    return dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Registrations and feedback rows to export")
+    parser.add_argument("--max-growth-mb", type=float, default=64)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        sys.exit(1 if measure(json.loads(args.measure), args.rows, args.max_growth_mb) else 0)
+
+    use_temp_database("export")
+    create_schema()
+    start = time.perf_counter()
+    dataset = seed(args.rows)
+    print(f"Seeded {args.rows:,} registrations and feedback rows in {time.perf_counter() - start:.1f}s")
+
+    # Measure in a fresh process so seeding does not set the RSS high-water mark
+    child = subprocess.run(
+        [sys.executable, __file__, "--rows", str(args.rows), "--max-growth-mb", str(args.max_growth_mb),
+         "--measure", json.dumps(dataset)],
+        env=dict(os.environ)
+    )
+    sys.exit(child.returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Feedback summary: GROUP BY over the feedback rows vs the running aggregates.
+
+Seeds one event with --feedback ratings and another with none, then times
+GET /admin/events/{id}/feedback/summary against the AVG/COUNT/histogram
+query it replaces. --submissions attendees then rate the event through the
+API, --concurrency at a time. Fails if the summary, or the event's row in
+/admin/reports/events, differs from a recount of the feedback table, or if
+the summary's query count depends on the amount of feedback.
+
+    python benchmarks/bench_feedback.py --feedback 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from common import use_temp_database, create_schema, seed_college, auth_headers, count_queries
+
+
+def recount(event_id):
+    from sqlalchemy import func
+    from database import SessionLocal
+    from models import Feedback
+
+    db = SessionLocal()
+    try:
+        rows = dict(db.query(Feedback.rating, func.count(Feedback.id)).filter(
+            Feedback.event_id == event_id
+        ).group_by(Feedback.rating).all())
+    finally:
+        db.close()
+    count = sum(rows.values())
+    return {
+        "event_id": event_id,
+        "feedback_count": count,
+        "avg_rating": sum(rating * n for rating, n in rows.items()) / count if count else None,
+        "rating_histogram": {str(rating): rows.get(rating, 0) for rating in range(1, 6)},
+    }
+
+
+def time_group_by(event_id, requests):
+    from sqlalchemy import case, func, select
+    from database import engine
+    from models import Feedback
+
+    query = select(
+        func.avg(Feedback.rating), func.count(Feedback.id),
+        *(func.sum(case((Feedback.rating == rating, 1), else_=0)) for rating in range(1, 6))
+    ).filter(Feedback.event_id == event_id)
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(requests):
+            start = time.perf_counter()
+            conn.execute(query).one()
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def submit(app, event_id, emails, concurrency):
+    import httpx
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def rate(client, i, email):
+        async with limit:
+            response = await client.post(
+                f"/student/events/{event_id}/feedback",
+                headers=auth_headers(email),
+                json={"event_id": event_id, "rating": 1 + i % 5, "comment": "bench"}
+            )
+        return response.status_code
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        return await asyncio.gather(*(rate(client, i, email) for i, email in enumerate(emails)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feedback", type=int, default=100000, help="Ratings on the busy event")
+    parser.add_argument("--submissions", type=int, default=200, help="Ratings submitted through the API")
+    parser.add_argument("--requests", type=int, default=200, help="Timed summary requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max submissions in flight")
+    args = parser.parse_args()
+
+    use_temp_database("feedback")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from auth import principal_cache, token_cache
+    from main import app
+
+    print(f"Seeding {args.feedback} ratings...")
+    # Attendees are the even-numbered students; those past --feedback haven't rated yet
+    busy = seed_college(
+        num_events=1, feedback_per_event=args.feedback,
+        registrations_per_event=args.feedback + 2 * args.submissions
+    )
+    quiet = seed_college(num_events=1, registrations_per_event=0, feedback_per_event=0, college_name="Quiet College")
+    event_id = busy["event_ids"][0]
+    admin = auth_headers(busy["admin_email"])
+    summary_url = f"/admin/events/{event_id}/feedback/summary"
+
+    client = TestClient(app)
+    samples = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        client.get(summary_url, headers=admin)
+        samples.append((time.perf_counter() - start) * 1000)
+    group_by = time_group_by(event_id, args.requests)
+    print(f"GROUP BY over {args.feedback} ratings: {group_by:.2f}ms p50 (query only); "
+          f"summary endpoint: {statistics.median(samples):.2f}ms p50 (whole request)")
+
+    failed = False
+    counts = {}
+    for label, dataset in (("no feedback", quiet), (f"{args.feedback} ratings", busy)):
+        # Cold caches so the principal lookup is counted the same way every time
+        principal_cache.clear()
+        token_cache.clear()
+        with count_queries() as counter:
+            client.get(f"/admin/events/{dataset['event_ids'][0]}/feedback/summary",
+                       headers=auth_headers(dataset["admin_email"]))
+        counts[label] = counter["count"]
+    print(f"Summary queries: {counts}")
+    if len(set(counts.values())) != 1:
+        print("FAIL: summary query count depends on the amount of feedback")
+        failed = True
+
+    raters = busy["student_emails"][args.feedback:][::2][:args.submissions]
+    statuses = asyncio.run(submit(app, event_id, raters, args.concurrency))
+    print(f"Submitted {len(raters)} ratings through the API: {sorted(set(statuses))}")
+    if set(statuses) != {200}:
+        print("FAIL: feedback submissions failed")
+        failed = True
+
+    expected = recount(event_id)
+    summary = client.get(summary_url, headers=admin).json()
+    report = client.get("/admin/reports/events", headers=admin).json()[0]
+    if summary != expected:
+        print(f"FAIL: summary {summary} != recount {expected}")
+        failed = True
+    if (report["avg_rating"], report["feedback_count"]) != (expected["avg_rating"], expected["feedback_count"]):
+        print(f"FAIL: report has {report['avg_rating']} over {report['feedback_count']}, recount {expected}")
+        failed = True
+    if not failed:
+        print(f"OK: {expected['feedback_count']} ratings, average {expected['avg_rating']:.3f}, "
+              f"histogram {expected['rating_histogram']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Login throughput at 1, 8 and 64 concurrent clients.
+
+bcrypt runs on the password hashing pool, so /health is polled alongside the
+logins to show that the event loop stays responsive.
+
+    BCRYPT_ROUNDS=12 python benchmarks/bench_login.py --logins 128
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from common import use_temp_database, create_schema, seed_college
+from bench_concurrency import percentile
+
+PASSWORD = "bench-password"
+
+
+async def run_level(client, emails, clients, logins):
+    latencies = []
+    health = []
+    queue = asyncio.Queue()
+    for i in range(logins):
+        queue.put_nowait(emails[i % len(emails)])
+
+    async def login_worker():
+        while not queue.empty():
+            email = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async def health_probe(done):
+        while not done.is_set():
+            start = time.perf_counter()
+            (await client.get("/health")).raise_for_status()
+            health.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    done = asyncio.Event()
+    probe = asyncio.create_task(health_probe(done))
+    start = time.perf_counter()
+    await asyncio.gather(*(login_worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe
+
+    print(f"{clients:>3} clients: {logins / elapsed:7.1f} logins/s, "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms, p99 {percentile(latencies, 99) * 1000:7.1f} ms, "
+          f"/health p99 {percentile(health, 99) * 1000:6.1f} ms")
+
+
+async def run(app, emails, levels, logins):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for clients in levels:
+            await run_level(client, emails, clients, max(logins, clients))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=128, help="Logins per concurrency level")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    use_temp_database("login")
+    create_schema()
+
+    from database import SessionLocal
+    from models import User
+    from auth import get_password_hash, password_hasher, BCRYPT_ROUNDS
+    from main import app
+
+    dataset = seed_college(num_events=0, registrations_per_event=0, feedback_per_event=0, num_students=64)
+    db = SessionLocal()
+    try:
+        hashed = get_password_hash(PASSWORD)
+        db.query(User).filter(User.college_id == dataset["college_id"]).update({"password": hashed})
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"bcrypt rounds {BCRYPT_ROUNDS}, {password_hasher.workers} hashing workers")
+    asyncio.run(run(app, dataset["student_emails"], args.levels, args.logins))
+
+
+if __name__ == "__main__":
+    main()
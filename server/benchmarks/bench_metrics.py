@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Overhead of the Prometheus middleware on a browsing mix.
+
+The middleware's own cost per request is timed around a no-op ASGI app and
+compared with the app's time per request on the mix; that share is the
+overhead, and the run fails above --max-overhead percent or if /metrics is
+missing the expected series. Rounds against the bare and the instrumented
+app alternate in one process as an end-to-end cross-check, though their
+round-to-round noise is larger than the effect.
+
+    python benchmarks/bench_metrics.py --rounds 10 --requests 400
+    python benchmarks/bench_metrics.py --multiprocess   # mmap-backed values, as with several workers
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+async def run_round(app, dataset, requests, clients, seed):
+    import httpx
+
+    rng = random.Random(seed)
+    headers = [auth_headers(email) for email in dataset["student_emails"][:20]]
+    paths = [
+        f"/events/{rng.choice(dataset['event_ids'])}" if rng.random() < 0.5 else "/events/upcoming"
+        for _ in range(requests)
+    ]
+
+    async def client_loop(client, share):
+        for path in share:
+            (await client.get(path, headers=rng.choice(headers))).raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, paths[i::clients]) for i in range(clients)))
+        return requests / (time.perf_counter() - start)
+
+
+async def middleware_cost(iterations):
+    """Seconds the middleware adds to one request, measured around a no-op app"""
+    from metrics import MetricsMiddleware
+
+    class Route:
+        path = "/bench"
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = {}
+    for name, target in (("bare", endpoint), ("metrics", MetricsMiddleware(endpoint))):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await target({"type": "http", "method": "GET"}, receive, send)
+        timings[name] = (time.perf_counter() - start) / iterations
+    return timings["metrics"] - timings["bare"]
+
+
+async def scrape(app):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/metrics")
+        response.raise_for_status()
+        return response.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds per mode")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per round")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="Percent")
+    parser.add_argument("--multiprocess", action="store_true", help="Use a PROMETHEUS_MULTIPROC_DIR")
+    args = parser.parse_args()
+
+    if args.multiprocess:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="campus_spark_metrics_")
+    # The bare app is the baseline; the middleware is wrapped around it below
+    os.environ["METRICS_ENABLED"] = "false"
+    use_temp_database("metrics")
+    create_schema()
+
+    from database import engine, async_engine
+    from metrics import MetricsMiddleware, instrument_engine
+    from main import app
+
+    dataset = seed_college(num_events=args.events, registrations_per_event=10, feedback_per_event=0, num_students=50)
+    # Pool timing costs well under a microsecond per checkout; it stays on in both modes
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+    instrumented = MetricsMiddleware(app)
+
+    asyncio.run(run_round(app, dataset, args.requests, args.clients, seed=0))  # warm caches
+    ratios = []
+    bare_throughputs = []
+    for i in range(args.rounds):
+        # Alternate which mode goes first so neither always gets a warmer cache
+        modes = [("bare", app), ("metrics", instrumented)]
+        if i % 2:
+            modes.reverse()
+        throughput = {name: asyncio.run(run_round(target, dataset, args.requests, args.clients, seed=i + 1))
+                      for name, target in modes}
+        ratios.append(throughput["metrics"] / throughput["bare"])
+        bare_throughputs.append(throughput["bare"])
+        print(f"round {i + 1:>2}: bare {throughput['bare']:6.0f} req/s, metrics {throughput['metrics']:6.0f} req/s")
+
+    # One event loop is CPU-bound here, so 1 / throughput is the time each request costs
+    cost = asyncio.run(middleware_cost(20000))
+    overhead = cost * statistics.median(bare_throughputs) * 100
+    mode = "multiprocess" if args.multiprocess else "single process"
+    print(f"End to end: median throughput change {(statistics.median(ratios) - 1) * 100:+.2f}%")
+    print(f"Middleware: {cost * 1e6:.1f} us per request = {overhead:.2f}% of a request on this mix ({mode} mode)")
+
+    exposition = asyncio.run(scrape(instrumented))
+    expected = [
+        'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/events/{event_id}",status="200"}',
+        'http_request_duration_seconds_count{method="GET",route="/events/upcoming",status="200"}',
+        'http_response_size_bytes_sum{method="GET",route="/events/upcoming",status="200"}',
+        'http_requests_in_progress{method="GET"',
+        'db_pool_checkout_wait_seconds_count{engine="async"}',
+        'db_pool_connections_in_use{engine="async"',
+    ]
+    failed = False
+    for series in expected:
+        if series not in exposition:
+            print(f"FAIL: /metrics has no {series}")
+            failed = True
+    if overhead > args.max_overhead:
+        print(f"FAIL: overhead above {args.max_overhead}%")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
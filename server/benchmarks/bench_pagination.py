@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Deep-page latency of GET /events/: OFFSET (skip) vs keyset cursor.
+
+    python benchmarks/bench_pagination.py --rows 1000000 --page 1000
+"""
+
+import argparse
+import time
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+def best_of(rounds, fn):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Events in the college")
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    use_temp_database("pagination")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import desc
+    from database import SessionLocal
+    from models import Event
+    from pagination import encode_cursor
+    from main import app
+
+    start = time.perf_counter()
+    dataset = seed_college(num_events=args.rows, registrations_per_event=0, feedback_per_event=0)
+    print(f"Seeded {args.rows:,} events in {time.perf_counter() - start:.1f}s")
+
+    skip = (args.page - 1) * args.limit
+    db = SessionLocal()
+    try:
+        # Sort key of the last row on the previous page, as a client would have received it
+        previous = db.query(Event.date, Event.id).filter(
+            Event.college_id == dataset["college_id"]
+        ).order_by(desc(Event.date), desc(Event.id)).offset(skip - 1).limit(1).one()
+        cursor = encode_cursor([previous.date, previous.id])
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    headers = auth_headers(dataset["student_emails"][0])
+
+    def fetch(params):
+        response = client.get("/events/", headers=headers, params={"limit": args.limit, **params})
+        response.raise_for_status()
+        return [event["id"] for event in response.json()]
+
+    if fetch({"skip": skip}) != fetch({"cursor": cursor}):
+        raise SystemExit("FAIL: offset and cursor pages differ")
+
+    first = best_of(args.rounds, lambda: fetch({}))
+    offset = best_of(args.rounds, lambda: fetch({"skip": skip}))
+    keyset = best_of(args.rounds, lambda: fetch({"cursor": cursor}))
+
+    print(f"page 1:                    {first * 1000:8.1f} ms")
+    print(f"page {args.page} via skip={skip}: {offset * 1000:8.1f} ms")
+    print(f"page {args.page} via cursor:     {keyset * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Rate limiting and load shedding under a credential-stuffing run.
+
+- stuffing: --attempts wrong-password logins from one IP, split between one
+  targeted account and many random emails, while a student keeps browsing
+  /events/upcoming. Fails if more passwords are checked with bcrypt than
+  the auth buckets allow, or if the student is ever refused.
+- shared buckets: --workers DatabaseBackend instances, each with its own
+  engine like a worker process, race for one bucket; exactly its capacity
+  may get through.
+- shedding: --burst requests hit a slow app behind LoadSheddingMiddleware;
+  the ones beyond the concurrency cap plus the queue must get 503 with
+  Retry-After, and a request queued past the timeout too.
+
+    python benchmarks/bench_ratelimit.py --attempts 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+async def stuffing(app, dataset, attempts):
+    import httpx
+
+    target = dataset["student_emails"][0]
+    browser = auth_headers(dataset["student_emails"][1])
+    outcomes = Counter()
+    browsing = Counter()
+    done = asyncio.Event()
+
+    async def attempt(client, i):
+        email = target if i % 2 else f"nobody{i}@bench.edu"
+        response = await client.post("/auth/login", json={"email": email, "password": "guess"})
+        outcomes[response.status_code] += 1
+        if response.status_code == 429 and "Retry-After" not in response.headers:
+            outcomes["429 without Retry-After"] += 1
+
+    async def browse(client):
+        while not done.is_set():
+            browsing[(await client.get("/events/upcoming", headers=browser)).status_code] += 1
+            await asyncio.sleep(0.05)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        browser_task = asyncio.create_task(browse(client))
+        start = time.perf_counter()
+        await asyncio.gather(*(attempt(client, i) for i in range(attempts)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await browser_task
+    return outcomes, browsing, elapsed
+
+
+async def shared_buckets(workers, takes):
+    from database import ASYNC_DATABASE_URL, create_db_engine
+    from ratelimit import DatabaseBackend, RateLimit
+
+    limit = RateLimit(10, 3600)
+    # An engine each, like separate worker processes
+    engines = [create_db_engine(ASYNC_DATABASE_URL, is_async=True) for _ in range(workers)]
+    backends = [DatabaseBackend(engine) for engine in engines]
+    waits = await asyncio.gather(*(
+        backends[i % workers].take("bench:ip:10.0.0.1", limit) for i in range(takes)
+    ))
+    for engine in engines:
+        await engine.dispose()
+    return sum(1 for wait in waits if wait == 0), limit.capacity, min(wait for wait in waits if wait > 0)
+
+
+async def shedding(burst, max_concurrent, max_queued):
+    from ratelimit import ConcurrencyLimiter, LoadSheddingMiddleware
+
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def call(app):
+        started = {}
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                started.update(status=message["status"], headers=dict(message["headers"]))
+
+        await app({"type": "http", "method": "GET", "path": "/bench", "headers": []}, receive, send)
+        if started["status"] == 503 and b"retry-after" not in started["headers"]:
+            return "503 without Retry-After"
+        return started["status"]
+
+    limiter = ConcurrencyLimiter(max_concurrent, max_queued, queue_timeout=5)
+    burst_outcomes = Counter(await asyncio.gather(*(call(LoadSheddingMiddleware(slow_app, limiter)) for _ in range(burst))))
+
+    # One slot and a queue timeout shorter than the request ahead: the second one gives up
+    impatient = ConcurrencyLimiter(1, 10, queue_timeout=0.05)
+    timeout_outcomes = Counter(await asyncio.gather(*(call(LoadSheddingMiddleware(slow_app, impatient)) for _ in range(2))))
+    return burst_outcomes, timeout_outcomes, limiter.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=500, help="Login attempts in the stuffing run")
+    parser.add_argument("--workers", type=int, default=4, help="Database backends sharing one bucket")
+    parser.add_argument("--takes", type=int, default=100, help="Takes from the shared bucket")
+    parser.add_argument("--burst", type=int, default=100, help="Requests in the shedding burst")
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    parser.add_argument("--max-queued", type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ["RATE_LIMIT_ENABLED"] = "true"
+    # The count of bcrypt checks matters here, not their cost
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    use_temp_database("ratelimit")
+    create_schema()
+
+    from database import SessionLocal
+    from models import User
+    from auth import get_password_hash, password_hasher
+    from ratelimit import AUTH_RATE_PER_IP, AUTH_RATE_PER_USER, RateLimit
+    from main import app
+
+    dataset = seed_college(num_events=50, registrations_per_event=0, feedback_per_event=0, num_students=10)
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.college_id == dataset["college_id"]).update({"password": get_password_hash("secret")})
+        db.commit()
+    finally:
+        db.close()
+    failed = False
+
+    outcomes, browsing, elapsed = asyncio.run(stuffing(app, dataset, args.attempts))
+    # Every attempt that passed the buckets was checked against a password hash (or found no user)
+    allowed = RateLimit.parse(AUTH_RATE_PER_IP).capacity
+    checked = password_hasher.completed
+    print(f"stuffing: {args.attempts} attempts in {elapsed:.1f}s -> {dict(outcomes)}, "
+          f"{checked} bcrypt checks; browsing student got {dict(browsing)}")
+    if outcomes[429] < args.attempts - allowed or outcomes.get("429 without Retry-After"):
+        print(f"FAIL: expected at least {args.attempts - allowed} 429s with Retry-After "
+              f"({AUTH_RATE_PER_IP} per IP, {AUTH_RATE_PER_USER} per user)")
+        failed = True
+    if checked > RateLimit.parse(AUTH_RATE_PER_USER).capacity:
+        print(f"FAIL: {checked} bcrypt checks for one targeted account, budget is {AUTH_RATE_PER_USER}")
+        failed = True
+    if set(browsing) != {200}:
+        print("FAIL: the browsing student was refused during the stuffing run")
+        failed = True
+
+    granted, capacity, next_wait = asyncio.run(shared_buckets(args.workers, args.takes))
+    print(f"shared buckets: {granted} of {args.takes} takes granted across {args.workers} backends "
+          f"(capacity {capacity}), next token in {next_wait:.0f}s")
+    if granted != capacity:
+        print(f"FAIL: expected exactly {capacity} granted")
+        failed = True
+
+    burst, timeouts, stats = asyncio.run(shedding(args.burst, args.max_concurrent, args.max_queued))
+    print(f"shedding: {args.burst} requests, cap {args.max_concurrent} + queue {args.max_queued} -> {dict(burst)}; "
+          f"queue timeout -> {dict(timeouts)}")
+    if burst != Counter({200: args.max_concurrent + args.max_queued, 503: args.burst - args.max_concurrent - args.max_queued}):
+        print("FAIL: unexpected shedding outcomes")
+        failed = True
+    if timeouts != Counter({200: 1, 503: 1}):
+        print("FAIL: the queued request didn't time out")
+        failed = True
+    if stats["active"] or stats["queue_depth"]:
+        print(f"FAIL: limiter not drained: {stats}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Flash-crowd harness for POST /student/events/{id}/register.
+
+Fires N concurrent registrations from distinct students at one event and
+asserts that exactly `capacity` get a seat (the rest are waitlisted, or told
+the event is full with ADMISSION_QUEUE_ENABLED=false) and that the stored
+registered_count and registration rows match. Requests the load shedder
+turns away (503 with Retry-After, once more than MAX_CONCURRENT_REQUESTS +
+MAX_QUEUED_REQUESTS arrive together) are counted as "shed"; any other
+failures (for example SQLite lock timeouts) are reported separately.
+
+    python benchmarks/bench_registration_surge.py --clients 5000 --capacity 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+from bench_concurrency import percentile
+
+
+async def surge(app, event_id, emails, concurrency):
+    import httpx
+
+    # Count unhandled server errors as 500s instead of aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    outcomes = Counter()
+
+    async def register(client, email):
+        async with limit:
+            start = time.perf_counter()
+            response = await client.post(f"/student/events/{event_id}/register", headers=auth_headers(email))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code == 200:
+                # "registered" or, with the admission queue, "waitlisted"
+                outcomes[response.json()["status"]] += 1
+            elif response.status_code == 400 and response.json().get("detail") == "Event is full":
+                outcomes["full"] += 1
+            elif response.status_code == 503 and "Retry-After" in response.headers:
+                outcomes["shed"] += 1
+            else:
+                outcomes[f"error {response.status_code}"] += 1
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(register(client, email) for email in emails))
+        elapsed = time.perf_counter() - start
+
+    return outcomes, latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=5000, help="Max requests in flight")
+    args = parser.parse_args()
+
+    use_temp_database("surge")
+    create_schema()
+
+    from sqlalchemy import func
+    from database import SessionLocal
+    from models import Event, Registration, RegistrationStatus
+    from main import app
+
+    dataset = seed_college(
+        num_events=1, registrations_per_event=0, feedback_per_event=0,
+        num_students=args.clients, max_attendees=args.capacity
+    )
+    event_id = dataset["event_ids"][0]
+
+    outcomes, latencies, elapsed = asyncio.run(
+        surge(app, event_id, dataset["student_emails"][:args.clients], args.concurrency)
+    )
+
+    db = SessionLocal()
+    try:
+        registered_count = db.get(Event, event_id).registered_count
+        stored = db.query(func.count(Registration.id)).filter(
+            Registration.event_id == event_id,
+            Registration.status == RegistrationStatus.REGISTERED
+        ).scalar()
+    finally:
+        db.close()
+
+    print(f"{args.clients} clients, capacity {args.capacity}: {dict(outcomes)}")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} req/s over {elapsed:.2f}s")
+    print(f"Latency: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"Stored: registered_count={registered_count}, registration rows={stored}")
+
+    if outcomes["registered"] != args.capacity or registered_count != args.capacity or stored != args.capacity:
+        print(f"FAIL: expected exactly {args.capacity} successful registrations and stored seats")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark and query-count regression check for GET /admin/reports/events.
+
+The report must run a constant number of queries no matter how many events
+the college has. Exits non-zero if the query count grows with the dataset.
+
+    python benchmarks/bench_reports.py --events 2000
+"""
+
+import argparse
+import sys
+import time
+
+from common import use_temp_database, create_schema, seed_college, auth_headers, count_queries
+
+# Principal lookup + events page + registration aggregate + feedback aggregate
+QUERY_BUDGET = 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--registrations", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database("reports")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    small = seed_college(num_events=5, registrations_per_event=args.registrations, college_name="Small College")
+    large = seed_college(num_events=args.events, registrations_per_event=args.registrations, college_name="Large College")
+
+    client = TestClient(app)
+    failed = False
+
+    for label, dataset in (("small", small), ("large", large)):
+        headers = auth_headers(dataset["admin_email"])
+        with count_queries() as queries:
+            response = client.get("/admin/reports/events", headers=headers, params={"limit": 500})
+        response.raise_for_status()
+
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            client.get("/admin/reports/events", headers=headers, params={"limit": 500}).raise_for_status()
+            timings.append(time.perf_counter() - start)
+
+        print(f"{label:>6}: {len(dataset['event_ids']):>6} events, "
+              f"{len(response.json()):>4} reports/page, {queries['count']} queries, "
+              f"best {min(timings) * 1000:.1f} ms")
+
+        if queries["count"] > QUERY_BUDGET:
+            print(f"FAIL: {queries['count']} queries exceeds budget of {QUERY_BUDGET}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Latency of GET /events/search on a college with 100k events, compared with
+the unindexed alternative: a LIKE scan that finds every match so the
+results could be ranked.
+
+Titles, locations and tags use a small topic vocabulary; descriptions draw
+from a Zipf-distributed vocabulary so terms range from common to rare.
+
+    python benchmarks/bench_search.py --events 100000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+WORDS = (
+    "robotics workshop career fair hackathon startup pitch poetry jazz concert football cricket "
+    "seminar lecture quantum biology chemistry finance marketing design photography film theatre "
+    "debate chess coding python data science machine learning cloud security networking music "
+    "dance yoga marathon volunteering sustainability climate entrepreneurship alumni orientation"
+).split()
+
+# Synthetic long-tail vocabulary for descriptions, ranked by frequency
+LONG_TAIL = [f"topic{rank}" for rank in range(20000)]
+
+QUERIES = ["robotics", "jazz concert", "machine learning", "photo", "hack", "topic5", "topic250 topic900", "topic4321"]
+
+
+def seed_events(college_id, organizer_id, count):
+    from database import engine
+    from models import Event, EventCategory, EventStatus
+
+    rng = random.Random(42)
+    zipf = list(accumulate(1 / (rank + 1) for rank in range(len(LONG_TAIL))))
+    categories = list(EventCategory)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, count, 10000):
+            conn.execute(Event.__table__.insert(), [
+                {
+                    "title": " ".join(rng.sample(WORDS, 3)).title(),
+                    "description": " ".join(rng.sample(WORDS, 2) + rng.choices(LONG_TAIL, cum_weights=zipf, k=28)),
+                    "date": now + timedelta(minutes=i),
+                    "time": "10:00 AM",
+                    "location": f"{rng.choice(WORDS).title()} Hall",
+                    "category": categories[i % len(categories)],
+                    "tags": ",".join(rng.sample(WORDS, 2)),
+                    "max_attendees": 100,
+                    "registered_count": 0,
+                    "attended_count": 0,
+                    "status": EventStatus.ACTIVE,
+                    "is_registration_open": True,
+                    "organizer_id": organizer_id,
+                    "college_id": college_id,
+                }
+                for i in range(start, min(start + 10000, count))
+            ])
+
+
+def like_scan(college_id, q):
+    """Every event containing all terms as substrings; ranking needs the full match set"""
+    from sqlalchemy import or_
+    from database import SessionLocal
+    from models import Event
+
+    db = SessionLocal()
+    try:
+        query = db.query(Event.id).filter(Event.college_id == college_id)
+        for term in q.split():
+            columns = (Event.title, Event.description, Event.location, Event.tags)
+            query = query.filter(or_(*[column.ilike(f"%{term}%") for column in columns]))
+        return query.all()
+    finally:
+        db.close()
+
+
+def timed(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_database("search")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from database import engine
+    from main import app
+
+    dataset = seed_college(num_events=0, registrations_per_event=0, feedback_per_event=0)
+    with engine.connect() as conn:
+        admin_id = conn.exec_driver_sql("SELECT id FROM users WHERE email = ?", (dataset["admin_email"],)).scalar()
+    start = time.perf_counter()
+    seed_events(dataset["college_id"], admin_id, args.events)
+    print(f"Seeded {args.events:,} events (FTS triggers included) in {time.perf_counter() - start:.1f}s")
+
+    client = TestClient(app)
+    headers = auth_headers(dataset["student_emails"][0])
+    failed = False
+
+    print(f"{'query':<24} {'matches':>8} {'search p50':>11} {'search p95':>11} {'LIKE scan p50':>14}")
+    for q in QUERIES:
+        def search():
+            response = client.get("/events/search", headers=headers, params={"q": q, "limit": 20})
+            response.raise_for_status()
+            return response.json()
+
+        results, search_timings = timed(search, args.rounds)
+        matches, like_timings = timed(lambda: like_scan(dataset["college_id"], q), max(3, args.rounds // 4))
+        search_timings.sort()
+        print(f"{q:<24} {len(matches):>8} {statistics.median(search_timings) * 1000:>8.1f} ms "
+              f"{search_timings[int(len(search_timings) * 0.95) - 1] * 1000:>8.1f} ms "
+              f"{statistics.median(like_timings) * 1000:>11.1f} ms")
+
+        # Every hit must contain each query term (stemmed or as a prefix) in an indexed column
+        for event in results:
+            text = " ".join(filter(None, (event["title"], event["description"], event["location"], event["tags"]))).lower()
+            if not all(term[:5] in text for term in q.split()):
+                print(f"FAIL: event {event['id']} does not match '{q}'")
+                failed = True
+                break
+        if not results:
+            print(f"FAIL: no results for '{q}'")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
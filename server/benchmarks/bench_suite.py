@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Load and latency suite: boots main.app in-process against a generated
+dataset and drives realistic traffic mixes with concurrent clients.
+
+Scenarios, run one after another on the same dataset:
+  browse              students listing, searching and opening events
+  registration_burst  students registering for a handful of events at once
+  admin_reports       dashboard, reports, registrations and feedback pages
+  checkin_wave        door staff checking in the burst's registrations,
+                      one at a time and in bulk batches
+
+Reports p50/p95/p99 latency, throughput and SQL queries per request (the
+median) for every endpoint. --json writes the results for comparison
+between commits; --compare prints the change against an earlier run with
+the same arguments and fails if any endpoint now runs more queries per
+request.
+
+    python benchmarks/bench_suite.py --events 5000 --students 2000 --json results.json
+    python benchmarks/bench_suite.py --events 5000 --students 2000 --compare results.json
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from common import SERVER_DIR, use_temp_database, create_schema, seed_college, auth_headers
+from bench_concurrency import percentile
+
+SCENARIOS = ["browse", "registration_burst", "admin_reports", "checkin_wave"]
+
+SEARCH_TERMS = ["event", "event 1", "hall", "benchmark", "event 42"]
+
+# Fail --compare when an endpoint's median queries per request grows by more than this
+QUERY_REGRESSION = 0.5
+
+# Queries executed on behalf of the request running in the current context
+_query_counter = contextvars.ContextVar("query_counter", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class Recorder:
+    """Sends requests and records latency, status and query count per endpoint"""
+
+    def __init__(self, client):
+        self.client = client
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    async def request(self, endpoint, method, url, headers, **kwargs):
+        counter = [0]
+        token = _query_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        finally:
+            _query_counter.reset(token)
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        self.queries[endpoint].append(counter[0])
+        self.statuses[endpoint][response.status_code] += 1
+        return response
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            statuses = self.statuses[endpoint]
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "throughput": len(samples) / elapsed,
+                "p50_ms": statistics.median(samples) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                # Median: the steady state, not first-request auth cache misses
+                "queries_per_request": statistics.median(self.queries[endpoint]),
+                "errors": sum(count for code, count in statuses.items() if code >= 500),
+                "statuses": {str(code): count for code, count in sorted(statuses.items())},
+            }
+        requests = sum(len(samples) for samples in self.latencies.values())
+        return {"elapsed_s": elapsed, "requests": requests, "throughput": requests / elapsed, "endpoints": endpoints}
+
+
+# Scenarios. Each client calls its scenario's step until the deadline or
+# until the step returns False because the scenario's work is used up.
+
+async def browse_step(recorder, rng, world):
+    headers = rng.choice(world["students"])
+    event_id = rng.choice(world["event_ids"])
+    step = rng.choices(
+        ["list", "upcoming", "popular", "categories", "detail", "search", "mine"],
+        weights=[20, 25, 10, 5, 25, 10, 5]
+    )[0]
+    if step == "list":
+        await recorder.request("GET /events/", "GET", "/events/", headers, params={"limit": 20})
+    elif step == "upcoming":
+        await recorder.request("GET /events/upcoming", "GET", "/events/upcoming", headers, params={"limit": 20})
+    elif step == "popular":
+        await recorder.request("GET /events/popular", "GET", "/events/popular", headers)
+    elif step == "categories":
+        await recorder.request("GET /events/categories", "GET", "/events/categories", headers)
+    elif step == "detail":
+        await recorder.request("GET /events/{id}", "GET", f"/events/{event_id}", headers)
+    elif step == "search":
+        await recorder.request("GET /events/search", "GET", "/events/search", headers,
+                               params={"q": rng.choice(SEARCH_TERMS), "limit": 20})
+    else:
+        await recorder.request("GET /student/registrations", "GET", "/student/registrations", headers)
+    return True
+
+
+async def registration_burst_step(recorder, rng, world):
+    if not world["burst"]:
+        return False
+    headers, event_id = world["burst"].pop()
+    await recorder.request("POST /student/events/{id}/register", "POST", f"/student/events/{event_id}/register", headers)
+    return True
+
+
+async def admin_reports_step(recorder, rng, world):
+    headers = world["admin"]
+    step = rng.choices(["dashboard", "reports", "registrations", "feedback", "students"], weights=[30, 25, 25, 10, 10])[0]
+    if step == "dashboard":
+        await recorder.request("GET /admin/dashboard", "GET", "/admin/dashboard", headers)
+    elif step == "reports":
+        await recorder.request("GET /admin/reports/events", "GET", "/admin/reports/events", headers)
+    elif step == "registrations":
+        event_id = rng.choice(world["event_ids"])
+        await recorder.request("GET /admin/events/{id}/registrations", "GET",
+                               f"/admin/events/{event_id}/registrations", headers)
+    elif step == "feedback":
+        await recorder.request("GET /admin/feedback", "GET", "/admin/feedback", headers)
+    else:
+        await recorder.request("GET /admin/students", "GET", "/admin/students", headers)
+    return True
+
+
+async def checkin_wave_step(recorder, rng, world):
+    if world["checkin_batches"]:
+        event_id, registration_ids = world["checkin_batches"].pop()
+        await recorder.request("POST /admin/events/{id}/checkins", "POST", f"/admin/events/{event_id}/checkins",
+                               world["admin"], json={"registration_ids": registration_ids})
+        return True
+    if world["checkins"]:
+        registration_id = world["checkins"].pop()
+        await recorder.request("PUT /admin/registrations/{id}/checkin", "PUT",
+                               f"/admin/registrations/{registration_id}/checkin", world["admin"])
+        return True
+    return False
+
+
+STEPS = {
+    "browse": browse_step,
+    "registration_burst": registration_burst_step,
+    "admin_reports": admin_reports_step,
+    "checkin_wave": checkin_wave_step,
+}
+
+
+def prepare_checkins(world, batch_size):
+    """Split the burst's registrations between single check-ins and bulk batches"""
+    from database import engine
+    from models import Registration, RegistrationStatus
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            Registration.__table__.select().with_only_columns(Registration.id, Registration.event_id).where(
+                Registration.event_id.in_(world["burst_event_ids"]),
+                Registration.status == RegistrationStatus.REGISTERED
+            ).order_by(Registration.id)
+        ).all()
+
+    by_event = defaultdict(list)
+    for registration_id, event_id in rows:
+        by_event[event_id].append(registration_id)
+    world["checkins"], world["checkin_batches"] = [], []
+    for index, (event_id, registration_ids) in enumerate(sorted(by_event.items())):
+        if index % 2 == 0:
+            world["checkins"] += registration_ids
+        else:
+            world["checkin_batches"] += [
+                (event_id, registration_ids[start:start + batch_size])
+                for start in range(0, len(registration_ids), batch_size)
+            ]
+
+
+async def run_scenario(app, name, world, clients, duration, seed):
+    import httpx
+
+    # Count unhandled server errors as 500s instead of aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        recorder = Recorder(client)
+        step = STEPS[name]
+
+        async def run_client(rng, deadline):
+            while time.perf_counter() < deadline and await step(recorder, rng, world):
+                pass
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(run_client(random.Random(seed * 1000 + i), deadline) for i in range(clients)))
+        return recorder.summary(time.perf_counter() - start)
+
+
+def build_world(dataset, args):
+    rng = random.Random(args.seed)
+    students = [auth_headers(email) for email in dataset["student_emails"]]
+    # Burst: every student not seeded onto the chosen events tries to register for each of them
+    burst_event_ids = rng.sample(dataset["event_ids"], min(args.burst_events, len(dataset["event_ids"])))
+    burst = [
+        (students[i], event_id)
+        for event_id in burst_event_ids
+        for i in range(args.registrations, len(students))
+    ]
+    rng.shuffle(burst)
+    return {
+        "admin": auth_headers(dataset["admin_email"]),
+        "students": students,
+        "event_ids": dataset["event_ids"],
+        "burst_event_ids": burst_event_ids,
+        "burst": burst,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    for name, scenario in results["scenarios"].items():
+        print(f"\n{name}: {scenario['requests']} requests in {scenario['elapsed_s']:.1f}s, "
+              f"{scenario['throughput']:.0f} req/s")
+        print(f"  {'endpoint':<40} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'queries':>8} {'errors':>6}")
+        for endpoint, stats in scenario["endpoints"].items():
+            print(f"  {endpoint:<40} {stats['requests']:>6} {stats['throughput']:>7.0f} {stats['p50_ms']:>8.1f} "
+                  f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['queries_per_request']:>8.2f} "
+                  f"{stats['errors']:>6}")
+
+
+def compare(results, baseline):
+    """Print changes against a baseline run; True if queries per request regressed"""
+    regressed = False
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta']['started_at']})")
+    ignored = ("json", "compare")
+    changed = sorted(
+        key for key, value in results["meta"]["args"].items()
+        if key not in ignored and baseline["meta"]["args"].get(key) != value
+    )
+    if changed:
+        print(f"  Note: arguments differ from the baseline ({', '.join(changed)}); results are not like for like")
+    print(f"  {'scenario / endpoint':<60} {'p95':>9} {'req/s':>9} {'queries':>14}")
+    for name, scenario in results["scenarios"].items():
+        before_endpoints = baseline["scenarios"].get(name, {}).get("endpoints", {})
+        for endpoint, stats in scenario["endpoints"].items():
+            before = before_endpoints.get(endpoint)
+            if not before:
+                continue
+            p95 = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            throughput = (stats["throughput"] - before["throughput"]) / before["throughput"] * 100
+            queries = f"{before['queries_per_request']:.2f} -> {stats['queries_per_request']:.2f}"
+            print(f"  {name + ' ' + endpoint:<60} {p95:>+8.0f}% {throughput:>+8.0f}% {queries:>14}")
+            if stats["queries_per_request"] > before["queries_per_request"] + QUERY_REGRESSION:
+                print(f"  FAIL: {endpoint} runs more queries per request than in the baseline")
+                regressed = True
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--registrations", type=int, default=20, help="Seeded registrations per event")
+    parser.add_argument("--feedback", type=int, default=5, help="Seeded feedback per event")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=10, help="Max seconds per scenario")
+    parser.add_argument("--burst-events", type=int, default=5, help="Events targeted by the registration burst")
+    parser.add_argument("--batch", type=int, default=50, help="Registrations per bulk check-in")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Results file from an earlier run")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",")
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    use_temp_database("suite")
+    create_schema()
+
+    from sqlalchemy import event
+    from database import engine, async_engine
+    from main import app
+
+    start = time.perf_counter()
+    # Capacity leaves room for the burst, so it both fills seats and hits full events
+    dataset = seed_college(
+        num_events=args.events, registrations_per_event=args.registrations, feedback_per_event=args.feedback,
+        num_students=args.students, max_attendees=args.registrations + args.students // 2
+    )
+    print(f"Seeded {args.events} events, {args.students} students, {args.events * args.registrations} registrations "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", _count_query)
+
+    world = build_world(dataset, args)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "args": vars(args),
+        },
+        "scenarios": {},
+    }
+    for index, name in enumerate(scenarios):
+        if name == "checkin_wave":
+            prepare_checkins(world, args.batch)
+        results["scenarios"][name] = asyncio.run(
+            run_scenario(app, name, world, args.clients, args.duration, args.seed + index)
+        )
+
+    print_results(results)
+    failed = False
+    errors = sum(
+        stats["errors"] for scenario in results["scenarios"].values() for stats in scenario["endpoints"].values()
+    )
+    if errors:
+        print(f"\nFAIL: {errors} requests returned a server error")
+        failed = True
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            failed = compare(results, json.load(f)) or failed
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
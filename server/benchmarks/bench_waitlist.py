@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Database work during a registration surge, with and without the waitlist.
+
+--clients students register for one event of --capacity seats at the same
+moment. Afterwards --cancellations seated students cancel, spread over
+--churn seconds, and the run ends when that window closes.
+
+- retry (ADMISSION_QUEUE_ENABLED=false): students told "Event is full" retry every
+  --retry-interval seconds, hoping to catch a freed seat.
+- queue: the admission queue registers the surge in batches and waitlists
+  whoever doesn't fit; they poll GET /student/events/{id}/waitlist as often
+  as its Retry-After says, and each cancelled seat passes to the head of the
+  waitlist.
+
+At most --concurrency requests are in flight, like a server's connection
+backlog. Each mode runs in its own process and counts requests, SQL
+statements and write statements (INSERT/UPDATE/DELETE). The run fails on
+server errors or if the seats in the database don't add up.
+
+    python benchmarks/bench_waitlist.py --clients 2000 --capacity 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+MODES = {
+    "retry": {"ADMISSION_QUEUE_ENABLED": "false"},
+    "queue": {"ADMISSION_QUEUE_ENABLED": "true"},
+}
+
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+async def surge(app, event_id, emails, args):
+    import httpx
+
+    # Count unhandled server errors (for example "database is locked") as 500s
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    register_url = f"/student/events/{event_id}/register"
+    limit = asyncio.Semaphore(args.concurrency)
+    outcomes = Counter()
+    seated = []
+    answered = 0
+    all_answered = asyncio.Event()
+    churn_over = asyncio.Event()
+
+    def first_answer():
+        nonlocal answered
+        answered += 1
+        if answered == len(emails):
+            all_answered.set()
+
+    async def send(kind, method, url, headers):
+        async with limit:
+            outcomes[kind] += 1
+            return await client.request(method, url, headers=headers)
+
+    async def pause(seconds):
+        # Sleep, but stop waiting as soon as the run is over
+        try:
+            await asyncio.wait_for(churn_over.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def student(email, rng):
+        headers = auth_headers(email)
+        response = await send("register", "POST", register_url, headers)
+        first_answer()
+        while True:
+            if response.status_code >= 500:
+                outcomes[f"error {response.status_code}"] += 1
+                return
+            body = response.json()
+            if response.status_code == 200 and body["status"] == "registered":
+                seated.append(headers)
+                return
+            if body.get("detail") == "Event is full":
+                kind, method, url, wait = "register", "POST", register_url, args.retry_interval
+            elif body.get("status") == "waitlisted":
+                kind, method, url = "poll", "GET", f"/student/events/{event_id}/waitlist"
+                wait = int(response.headers["Retry-After"])
+            else:
+                outcomes[f"unexpected {response.status_code}"] += 1
+                return
+            await pause(wait * rng.uniform(0.5, 1.5))
+            if churn_over.is_set():
+                return
+            response = await send(kind, method, url, headers)
+
+    async def churn(rng):
+        await all_answered.wait()
+        for _ in range(args.cancellations):
+            headers = seated.pop(rng.randrange(len(seated)))
+            response = await send("cancel", "DELETE", register_url, headers)
+            if response.status_code != 200:
+                outcomes[f"error {response.status_code}"] += 1
+            # The pause after the last cancellation leaves time to fill that seat too
+            await asyncio.sleep(args.churn / args.cancellations)
+        churn_over.set()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            churn(random.Random(0)),
+            *(student(email, random.Random(i)) for i, email in enumerate(emails))
+        )
+        elapsed = time.perf_counter() - start
+    return outcomes, elapsed
+
+
+def measure(args):
+    """Child process: seed a fresh database and run the surge in the current mode"""
+    use_temp_database("waitlist")
+    create_schema()
+
+    from sqlalchemy import event as sa_event, func, update
+    from database import SessionLocal, engine, async_engine
+    from models import Event, Registration, RegistrationStatus
+    from main import app
+
+    dataset = seed_college(
+        num_events=1, registrations_per_event=0, feedback_per_event=0,
+        num_students=args.clients, max_attendees=args.capacity
+    )
+    event_id = dataset["event_ids"][0]
+    # Cancelling needs an event that hasn't started yet
+    with engine.begin() as conn:
+        conn.execute(update(Event).where(Event.id == event_id).values(date=datetime.utcnow() + timedelta(days=7)))
+
+    statements = Counter()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements["all"] += 1
+        if statement.lstrip().upper().startswith(WRITES):
+            statements["writes"] += 1
+
+    sa_event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    outcomes, elapsed = asyncio.run(surge(app, event_id, dataset["student_emails"][:args.clients], args))
+    sa_event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+    db = SessionLocal()
+    try:
+        registered_count = db.get(Event, event_id).registered_count
+        stored = dict(db.query(Registration.status, func.count(Registration.id)).filter(
+            Registration.event_id == event_id
+        ).group_by(Registration.status).all())
+    finally:
+        db.close()
+
+    print(json.dumps({
+        "elapsed": elapsed,
+        "outcomes": dict(outcomes),
+        "statements": statements["all"],
+        "writes": statements["writes"],
+        "registered_count": registered_count,
+        "stored": {status.value: n for status, n in stored.items()},
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--cancellations", type=int, default=20, help="Seated students who cancel after the surge")
+    parser.add_argument("--churn", type=float, default=10, help="Seconds the cancellations are spread over")
+    parser.add_argument("--retry-interval", type=float, default=0.5, help="Seconds between retries without the waitlist")
+    parser.add_argument("--concurrency", type=int, default=64, help="Max requests in flight")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args)
+        return
+
+    results = {}
+    for name, overrides in MODES.items():
+        child = subprocess.run(
+            [sys.executable, __file__, "--measure"] + sys.argv[1:],
+            env={**os.environ, **overrides}, capture_output=True, text=True
+        )
+        if child.returncode != 0:
+            print(child.stderr)
+            sys.exit(child.returncode)
+        results[name] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    print(f"{args.clients} clients, {args.capacity} seats, {args.cancellations} cancellations over {args.churn:.0f}s")
+    print(f"{'mode':<6} {'requests':>9} {'statements':>11} {'writes':>8} {'seconds':>8}  registrations")
+    failed = False
+    for name, result in results.items():
+        outcomes = result["outcomes"]
+        requests = outcomes.get("register", 0) + outcomes.get("poll", 0) + outcomes.get("cancel", 0)
+        print(f"{name:<6} {requests:>9} {result['statements']:>11} {result['writes']:>8} {result['elapsed']:>8.1f}  "
+              f"{result['stored']}")
+        errors = {outcome: n for outcome, n in outcomes.items() if outcome.startswith(("error", "unexpected"))}
+        if errors:
+            print(f"FAIL: {name} mode: {errors}")
+            failed = True
+        if result["registered_count"] != args.capacity or result["stored"].get("registered") != args.capacity:
+            print(f"FAIL: {name} mode left {result['registered_count']} seats taken and "
+                  f"{result['stored'].get('registered')} registered rows, expected {args.capacity}")
+            failed = True
+
+    retry, queue = results["retry"], results["queue"]
+    print(f"Waitlist: {retry['statements'] / queue['statements']:.1f}x fewer statements, "
+          f"{retry['writes'] / queue['writes']:.1f}x fewer writes")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
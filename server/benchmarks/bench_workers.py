@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Production launcher: cold start and steady-state throughput by worker count.
+
+Creates a throwaway database with the migrate step, seeds one college, then
+for each --workers count starts `start_server.py --production` as a real
+server on a free port and measures:
+
+- cold start: from launching the process to the first successful
+  /events/upcoming, and to the last worker finishing its startup (pool and
+  calendar warm-up included);
+- steady state: requests per second and p50/p99 latency of a mix of
+  listing requests from --connections keep-alive connections, spread over
+  --load-processes client processes, for --duration seconds.
+
+The 1-worker run is repeated with WARMUP_ENABLED=false to show what the
+warm-up costs at startup and saves on the first request. Fails if any
+request errors or a server doesn't come up within --timeout seconds.
+
+    python benchmarks/bench_workers.py --workers 1,2,4,8
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import SERVER_DIR, use_temp_database, seed_college, auth_headers
+
+READY_LINE = "Application startup complete"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def open_connection(port):
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+async def get(reader, writer, path, authorization):
+    """One keep-alive GET; the status code. Small enough not to be the bottleneck itself."""
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: bench\r\nAuthorization: {authorization}\r\n\r\n".encode()
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+def run_load(port, paths, authorization, connections, duration):
+    """One client process: --connections / --load-processes connections looping over the paths"""
+    async def client(offset, deadline, latencies, errors):
+        reader, writer = await open_connection(port)
+        i = offset
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status = await get(reader, writer, paths[i % len(paths)], authorization)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(status)
+                i += 1
+        finally:
+            writer.close()
+
+    async def main():
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client(i, deadline, latencies, errors) for i in range(connections)))
+        return latencies, errors
+
+    return asyncio.run(main())
+
+
+def first_request(port, path, authorization, deadline):
+    """Poll until the server answers `path` with 200; (seconds since the call, that request's latency)"""
+    async def attempt():
+        reader, writer = await open_connection(port)
+        try:
+            start = time.perf_counter()
+            status = await get(reader, writer, path, authorization)
+            return status, time.perf_counter() - start
+        finally:
+            writer.close()
+
+    while time.perf_counter() < deadline:
+        try:
+            status, latency = asyncio.run(attempt())
+            if status == 200:
+                return latency
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure(workers, args, paths, authorization, env):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "start_server.py", "--production", "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port), "--no-access-log"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        start_new_session=True
+    )
+    ready = []
+    output = []
+
+    def drain():
+        for line in server.stdout:
+            output.append(line)
+            if READY_LINE in line:
+                ready.append(time.perf_counter() - started)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    try:
+        deadline = started + args.timeout
+        latency = first_request(port, paths[0], authorization, deadline)
+        if latency is None:
+            raise RuntimeError(f"{workers} worker(s) not serving after {args.timeout}s:\n{''.join(output[-20:])}")
+        first = time.perf_counter() - started
+        while len(ready) < workers and time.perf_counter() < deadline:
+            time.sleep(0.01)
+
+        # Let every worker take a share of the connections before timing
+        run_load(port, paths, authorization, 4, 1.0)
+        per_process = max(args.connections // args.load_processes, 1)
+        with multiprocessing.Pool(args.load_processes) as pool:
+            results = pool.starmap(
+                run_load, [(port, paths, authorization, per_process, args.duration)] * args.load_processes
+            )
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            os.killpg(server.pid, signal.SIGKILL)
+            server.wait()
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = [status for result in results for status in result[1]]
+    return {
+        "first": first,
+        "first_latency": latency,
+        "all_ready": max(ready) if len(ready) >= workers else None,
+        "rps": len(latencies) / args.duration,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of steady-state load per run")
+    parser.add_argument("--connections", type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument("--load-processes", type=int, default=2, help="Client processes generating the load")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds a server may take to come up")
+    args = parser.parse_args()
+
+    use_temp_database("workers")
+    from migrate import migrate
+
+    migrate()
+    dataset = seed_college(num_events=args.events, registrations_per_event=10, feedback_per_event=2, num_students=50)
+    authorization = auth_headers(dataset["student_emails"][0])["Authorization"]
+    paths = [
+        "/events/upcoming?limit=20",
+        "/student/events?limit=20",
+        "/events/?limit=20",
+        *(f"/events/{event_id}" for event_id in dataset["event_ids"][:8]),
+    ]
+    print(f"{os.cpu_count()} CPU(s); {args.events} events, {args.connections} connections "
+          f"from {args.load_processes} client process(es), {args.duration:.0f}s per run")
+
+    runs = [(int(workers), "true") for workers in args.workers.split(",")]
+    runs.insert(1, (runs[0][0], "false"))
+    print(f"{'workers':>7} {'warm-up':>8} {'first request':>14} {'its latency':>12} {'all ready':>10} "
+          f"{'req/s':>8} {'p50':>8} {'p99':>8}")
+    failed = False
+    for workers, warmup in runs:
+        env = {**os.environ, "WARMUP_ENABLED": warmup}
+        result = measure(workers, args, paths, authorization, env)
+        all_ready = f"{result['all_ready']:.2f}s" if result["all_ready"] is not None else "n/a"
+        print(f"{workers:>7} {'on' if warmup == 'true' else 'off':>8} {result['first']:>13.2f}s "
+              f"{result['first_latency'] * 1000:>10.1f}ms {all_ready:>10} {result['rps']:>8.0f} "
+              f"{result['p50']:>6.1f}ms {result['p99']:>6.1f}ms")
+        if result["errors"]:
+            print(f"FAIL: {len(result['errors'])} requests failed with {sorted(set(result['errors']))}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-request query budget for every list endpoint.
+
+Each endpoint is called against a small and a large college. The number of
+SQL statements must stay within its budget and must not grow with the number
+of rows returned, which catches N+1 loads of nested response fields. The
+Server-Timing header of each response must report the same count.
+
+    python benchmarks/check_query_budget.py --events 500
+"""
+
+import argparse
+import sys
+
+from common import use_temp_database, create_schema, seed_college, auth_headers, count_queries
+
+# Principal lookup + one query for the page (nested fields are joined in)
+LIST_BUDGET = 2
+
+# Endpoints with extra fixed work on top of the page query
+BUDGETS = {
+    # Plus the college data_version read for the ETag
+    "/events/": 3,
+    # Plus the ETag read and the event calendar's read of the college versions;
+    # a cold calendar is built with three more (events, organizers, college)
+    "/events/upcoming": 6,
+    "/events/popular": 3,
+    # Plus the top event ids by sign-ups in the window, then their events
+    "/events/popular?rank=velocity": 4,
+    "/events/categories": 3,
+    # Plus the event calendar's read of the college versions and, cold, its build
+    "/student/events": 5,
+    # Event ownership check
+    "/admin/events/{event_id}/registrations": 3,
+    # Events page + registration aggregate + feedback aggregate
+    "/admin/reports/events": 4,
+}
+
+
+def list_endpoints(dataset):
+    admin = auth_headers(dataset["admin_email"])
+    student = auth_headers(dataset["student_emails"][0])
+    return [
+        ("/events/", student),
+        ("/events/upcoming", student),
+        ("/events/popular", student),
+        ("/events/popular?rank=velocity", student),
+        ("/events/categories", student),
+        ("/events/search?q=event", student),
+        ("/student/events", student),
+        ("/student/registrations", student),
+        ("/admin/events", admin),
+        ("/admin/events/{event_id}/registrations", admin),
+        ("/admin/students", admin),
+        ("/admin/feedback", admin),
+        ("/admin/reports/events", admin),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500, help="Events in the large college")
+    args = parser.parse_args()
+
+    use_temp_database("budget")
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from auth import principal_cache, token_cache
+    from main import app
+
+    small = seed_college(num_events=2, registrations_per_event=2, feedback_per_event=1, college_name="Small College")
+    large = seed_college(num_events=args.events, registrations_per_event=30, feedback_per_event=10,
+                         college_name="Large College", num_students=200)
+
+    client = TestClient(app)
+    counts = {}
+    mismatched = []
+    for label, dataset in (("small", small), ("large", large)):
+        for name, headers in list_endpoints(dataset):
+            # Cold caches so the principal lookup is counted the same way every time
+            principal_cache.clear()
+            token_cache.clear()
+            with count_queries() as queries:
+                response = client.get(name.format(event_id=dataset["event_ids"][0]), headers=headers)
+            response.raise_for_status()
+            counts.setdefault(name, {})[label] = (len(response.json()), queries["count"])
+            timing = response.headers.get("Server-Timing", "")
+            if f'desc="{queries["count"]} queries"' not in timing:
+                mismatched.append(f"{name}: counted {queries['count']}, Server-Timing {timing!r}")
+
+    failed = False
+    for mismatch in mismatched:
+        print(f"FAIL: Server-Timing query count is off for {mismatch}")
+        failed = True
+    for name, results in counts.items():
+        (small_rows, small_queries), (large_rows, large_queries) = results["small"], results["large"]
+        budget = BUDGETS.get(name, LIST_BUDGET)
+        print(f"{name:<40} rows {small_rows:>4} -> {large_rows:>4}   queries {small_queries} -> {large_queries}   budget {budget}")
+        if large_queries > budget or small_queries > budget or large_queries != small_queries:
+            print(f"FAIL: {name} query count depends on result size or exceeds its budget")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
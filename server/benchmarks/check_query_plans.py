@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN QUERY PLAN check for every endpoint.
+
+Builds the schema from the alembic migrations, calls each endpoint once,
+captures the SQL it runs and asks SQLite for the plan of every statement.
+Fails if any statement reads users, events, registrations or feedback with a
+full table scan instead of an index.
+
+    python benchmarks/check_query_plans.py
+"""
+
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+
+from common import SERVER_DIR, use_temp_database, seed_college, auth_headers
+
+HOT_TABLES = {"users", "events", "registrations", "feedback"}
+
+
+def full_scans(conn, statement, parameters):
+    """Plan lines that scan a hot table without an index"""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and words[1] in HOT_TABLES and "INDEX" not in detail:
+            scans.append(detail)
+    return scans
+
+
+def endpoint_calls(dataset, event_id, registration_id):
+    admin = auth_headers(dataset["admin_email"])
+    student = auth_headers(dataset["student_emails"][0])
+    other = auth_headers(dataset["student_emails"][-1])
+    event = {
+        "title": "Plan check", "description": "d", "date": "2030-01-01T00:00:00",
+        "time": "10:00 AM", "location": "Hall", "category": "Career", "max_attendees": 50
+    }
+    return [
+        ("POST", "/auth/login", {"json": {"email": "nobody@bench.edu", "password": "x"}}),
+        ("GET", "/admin/dashboard", {"headers": admin}),
+        ("GET", "/admin/events", {"headers": admin}),
+        ("POST", "/admin/events", {"headers": admin, "json": event}),
+        ("PUT", f"/admin/events/{event_id}", {"headers": admin, "json": {"title": "Renamed"}}),
+        ("GET", f"/admin/events/{event_id}/registrations", {"headers": admin}),
+        ("PUT", f"/admin/registrations/{registration_id}/checkin", {"headers": admin}),
+        ("POST", f"/admin/events/{event_id}/checkins", {"headers": admin, "json": {"student_ids": [1, 2, 3]}}),
+        ("GET", "/admin/students", {"headers": admin}),
+        ("GET", "/admin/reports/events", {"headers": admin}),
+        ("GET", "/admin/feedback", {"headers": admin}),
+        ("GET", f"/admin/events/{event_id}/feedback/summary", {"headers": admin}),
+        ("GET", f"/admin/events/{event_id}/registrations/export", {"headers": admin}),
+        ("GET", "/admin/feedback/export", {"headers": admin}),
+        ("GET", "/student/profile", {"headers": student}),
+        ("GET", "/student/events", {"headers": student}),
+        ("POST", f"/student/events/{event_id}/register", {"headers": other}),
+        ("GET", f"/student/events/{event_id}/waitlist", {"headers": other}),
+        ("DELETE", f"/student/events/{event_id}/register", {"headers": other}),
+        ("GET", "/student/registrations", {"headers": student}),
+        ("POST", f"/student/events/{event_id}/feedback", {"headers": other, "json": {"event_id": event_id, "rating": 5}}),
+        ("GET", f"/student/events/{event_id}", {"headers": student}),
+        ("GET", "/events/", {"headers": student}),
+        ("GET", "/events/upcoming", {"headers": student}),
+        ("GET", "/events/popular", {"headers": student}),
+        ("GET", "/events/popular", {"headers": student, "params": {"rank": "count"}}),
+        ("GET", "/events/popular", {"headers": student, "params": {"rank": "velocity", "hours": 48}}),
+        ("GET", "/events/categories", {"headers": student}),
+        ("GET", "/events/search", {"headers": student, "params": {"q": "event hall"}}),
+        ("GET", f"/events/{event_id}", {"headers": student}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true", help="Print every captured plan")
+    args = parser.parse_args()
+
+    path = use_temp_database("plans")
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=SERVER_DIR, check=True,
+                   env=dict(os.environ), capture_output=True)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event as sa_event
+    from database import engine, async_engine
+    from main import app
+
+    dataset = seed_college(num_events=args.events, registrations_per_event=10, feedback_per_event=3, num_students=40)
+    event_id = dataset["event_ids"][0]
+    with engine.connect() as conn:
+        registration_id = conn.exec_driver_sql(
+            "SELECT id FROM registrations WHERE event_id = ? AND status = 'REGISTERED' LIMIT 1", (event_id,)
+        ).scalar()
+
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        sa_event.listen(target, "before_cursor_execute", before_cursor_execute)
+
+    client = TestClient(app)
+    plans = sqlite3.connect(path)
+    failures = 0
+    try:
+        for method, url, kwargs in endpoint_calls(dataset, event_id, registration_id):
+            captured.clear()
+            client.request(method, url, **kwargs)
+            for statement, parameters in captured:
+                scans = full_scans(plans, statement, parameters)
+                if args.verbose or scans:
+                    print(f"{method} {url}\n  {' '.join(statement.split())}")
+                    for line in plans.execute(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                        print(f"    {line[-1]}")
+                if scans:
+                    failures += 1
+    finally:
+        plans.close()
+        for target in engines:
+            sa_event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+    if failures:
+        print(f"FAIL: {failures} statement(s) scan a table without an index")
+        sys.exit(1)
+    print("OK: every endpoint query is served by an index")
+
+
+if __name__ == "__main__":
+    main()
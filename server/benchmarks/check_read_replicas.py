@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Read replica routing, checked against two SQLite copies of the primary.
+
+Seeds the primary, copies it to two replica files with read_replicas.py's
+sync step and boots the app with DATABASE_READ_URLS pointing at them. Fails
+unless:
+
+- every GET endpoint is served by the replicas, round-robin, with no
+  statement on the primary;
+- a student who just registered sees the registration straight away (read
+  from the primary) while the replicas are still stale, and other students
+  keep reading from the replicas;
+- once the read-your-writes window is over, the student reads from a
+  replica again, and sees the registration after the next copy;
+- with a replica's file gone every request still succeeds on the other one,
+  with both gone they fall back to the primary, and a replica only rejoins
+  once it holds the schema again.
+
+    python benchmarks/check_read_replicas.py
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from common import use_temp_database, create_schema, seed_college, auth_headers
+
+
+class EngineCounts:
+    """Statements per engine: the primary's async engine and each replica's"""
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+
+        self.counts = {name: 0 for name in engines}
+        for name, engine in engines.items():
+            event.listen(engine.sync_engine, "after_cursor_execute", self._counter(name))
+
+    def _counter(self, name):
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.counts[name] += 1
+        return after_cursor_execute
+
+    def take(self):
+        counts = dict(self.counts)
+        for name in self.counts:
+            self.counts[name] = 0
+        return counts
+
+
+def remove_database(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+async def run(app, dataset, replica_paths, args):
+    import httpx
+    from database import DATABASE_URL, async_engine
+    from read_replicas import _replicas, sync_sqlite_replicas
+
+    def sync(paths=replica_paths):
+        sync_sqlite_replicas(DATABASE_URL, [f"sqlite:///{path}" for path in paths])
+
+    counts = EngineCounts({"primary": async_engine, **{f"replica{i}": r.engine for i, r in enumerate(_replicas, 1)}})
+    admin = auth_headers(dataset["admin_email"])
+    writer = auth_headers(dataset["student_emails"][-1])
+    reader = auth_headers(dataset["student_emails"][-2])
+    endpoints = [
+        ("/events/", reader),
+        ("/events/upcoming", reader),
+        ("/events/popular", reader),
+        ("/events/categories", reader),
+        ("/events/search?q=event", reader),
+        (f"/events/{dataset['event_ids'][0]}", reader),
+        ("/student/profile", reader),
+        ("/student/events", reader),
+        ("/student/registrations", reader),
+        ("/admin/dashboard", admin),
+        ("/admin/events", admin),
+        (f"/admin/events/{dataset['event_ids'][0]}/registrations", admin),
+        (f"/admin/events/{dataset['event_ids'][0]}/registrations/export", admin),
+        (f"/admin/events/{dataset['event_ids'][0]}/feedback/summary", admin),
+        ("/admin/students", admin),
+        ("/admin/feedback", admin),
+        ("/admin/feedback/export", admin),
+        ("/admin/reports/events", admin),
+        ("/auth/colleges", None),
+    ]
+    failures = []
+
+    def check(condition, message):
+        print(f"{'ok  ' if condition else 'FAIL'} {message}")
+        if not condition:
+            failures.append(message)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=None) as client:
+        async def get(url, headers):
+            response = await client.get(url, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} -> {response.status_code}: {response.text[:200]}")
+            return response
+
+        async def get_all():
+            for url, headers in endpoints:
+                await get(url, headers)
+            return counts.take()
+
+        async def registered(headers):
+            return {r["event_id"] for r in (await get("/student/registrations?limit=100", headers)).json()}
+
+        # Principals are looked up on the primary, then cached
+        await get_all()
+        counts.take()
+
+        taken = await get_all()
+        check(taken["primary"] == 0 and taken["replica1"] > 0 and taken["replica2"] > 0,
+              f"GET endpoints read from both replicas only: {taken}")
+
+        event_id = (await get("/student/events?limit=1", writer)).json()[0]["id"]
+        response = await client.post(f"/student/events/{event_id}/register", headers=writer)
+        if response.status_code != 200:
+            raise RuntimeError(f"register -> {response.status_code}: {response.text[:200]}")
+        counts.take()
+        seen = event_id in await registered(writer)
+        taken = counts.take()
+        check(seen and taken["primary"] > 0 and taken["replica1"] == taken["replica2"] == 0,
+              f"registering student reads their registration from the primary: {seen}, {taken}")
+        await registered(reader)
+        taken = counts.take()
+        check(taken["primary"] == 0, f"other students still read from the replicas: {taken}")
+
+        await asyncio.sleep(args.window)
+        stale = event_id not in await registered(writer)
+        taken = counts.take()
+        check(stale and taken["primary"] == 0,
+              f"after the window the student reads the (stale) replicas again: {stale}, {taken}")
+        sync()
+        check(event_id in await registered(writer), "the registration reaches the replicas with the next copy")
+
+        # Failover: the pools are emptied so the next connection opens the (missing) file
+        await _replicas[1].engine.dispose()
+        remove_database(replica_paths[1])
+        counts.take()
+        taken = await get_all()
+        check(taken["primary"] == 0 and taken["replica1"] > 0 and taken["replica2"] == 0,
+              f"with replica2 gone every request succeeds on replica1: {taken}")
+
+        await _replicas[0].engine.dispose()
+        remove_database(replica_paths[0])
+        taken = await get_all()
+        check(taken["primary"] > 0 and taken["replica1"] == taken["replica2"] == 0,
+              f"with both replicas gone reads fall back to the primary: {taken}")
+
+        # replica2 comes back empty: its probe fails and it stays out
+        await asyncio.sleep(args.window)
+        sync(replica_paths[:1])
+        open(replica_paths[1], "wb").close()
+        taken = await get_all()
+        check(taken["primary"] == 0 and taken["replica1"] > 0 and taken["replica2"] <= 1,
+              f"replica1 rejoins after its retry delay, an empty replica2 does not: {taken}")
+
+        await asyncio.sleep(args.window)
+        sync()
+        await get_all()
+        taken = await get_all()
+        check(taken["primary"] == 0 and taken["replica1"] > 0 and taken["replica2"] > 0,
+              f"both replicas serve reads once copied again: {taken}")
+
+        stats = (await get("/admin/replicas/stats", admin)).json()
+        print(f"Stats: {stats}")
+        check(stats["pinned_reads"] > 0 and stats["failovers"] > 0 and stats["replicas"][1]["failures"] >= 2,
+              "/admin/replicas/stats counts pinned reads, failovers and replica failures")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--window", type=float, default=1.0, help="Read-your-writes window and replica retry delay")
+    args = parser.parse_args()
+
+    primary = use_temp_database("primary")
+    replica_paths = [os.path.join(os.path.dirname(primary), f"replica{i}.db") for i in (1, 2)]
+    os.environ["DATABASE_READ_URLS"] = ",".join(f"sqlite:///{path}" for path in replica_paths)
+    os.environ["READ_YOUR_WRITES_SECONDS"] = str(args.window)
+    os.environ["REPLICA_RETRY_SECONDS"] = str(args.window)
+    create_schema()
+
+    dataset = seed_college(num_events=args.events, registrations_per_event=10, feedback_per_event=5, num_students=30)
+    from database import DATABASE_URL
+    from read_replicas import sync_sqlite_replicas
+    sync_sqlite_replicas(DATABASE_URL, os.environ["DATABASE_READ_URLS"].split(","))
+
+    from main import app
+
+    failures = asyncio.run(run(app, dataset, replica_paths, args))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Shared helpers for the in-process benchmark scripts.
+
+Every benchmark boots the FastAPI app against a throwaway SQLite file so
+runs never touch the development database.
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+# The benchmarks drive the app from one address with a handful of users, far past
+# the per-client rate limits; bench_ratelimit.py switches them back on
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+def use_temp_database(name="bench"):
+    """Point DATABASE_URL at a fresh SQLite file. Must run before importing the app."""
+    path = os.path.join(tempfile.mkdtemp(prefix="campus_spark_"), f"{name}.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def create_schema():
+    from database import engine
+    from models import Base
+    from search import create_search_index
+
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+
+
+def seed_college(num_events=100, registrations_per_event=20, feedback_per_event=5, college_name="Bench University",
+                 num_students=None, max_attendees=None):
+    """Bulk insert one college with an admin, students, events, registrations and feedback."""
+    from database import engine, SessionLocal
+    from college_stats import rebuild_college_stats
+    from trending import rebuild_trending_scores
+    from feedback_stats import rebuild_feedback_stats
+    from models import College, User, Event, Registration, Feedback, UserRole, EventCategory, EventStatus, RegistrationStatus
+
+    now = datetime.utcnow()
+    categories = list(EventCategory)
+    num_students = max(num_students or 0, registrations_per_event, feedback_per_event, 1)
+
+    with engine.begin() as conn:
+        college_id = conn.execute(
+            College.__table__.insert().values(name=college_name, address="1 Benchmark Way")
+        ).inserted_primary_key[0]
+
+        admin_id = conn.execute(
+            User.__table__.insert().values(
+                name="Bench Admin",
+                email=f"admin{college_id}@bench.edu",
+                password="!",
+                role=UserRole.ADMIN,
+                college_id=college_id,
+                is_active=True,
+                events_attended=0
+            )
+        ).inserted_primary_key[0]
+
+        conn.execute(User.__table__.insert(), [
+            {
+                "name": f"Student {i}",
+                "email": f"student{i}.{college_id}@bench.edu",
+                "password": "!",
+                "role": UserRole.STUDENT,
+                "college_id": college_id,
+                "is_active": True,
+                "events_attended": 0,
+            }
+            for i in range(num_students)
+        ])
+        student_ids = [row[0] for row in conn.execute(
+            User.__table__.select().with_only_columns(User.id).where(
+                User.college_id == college_id, User.role == UserRole.STUDENT
+            ).order_by(User.id)
+        )]
+
+        events = [
+            {
+                "title": f"Event {i}",
+                "description": "Benchmark event",
+                "date": now + timedelta(days=(i % 60) - 30, minutes=i),
+                "time": "10:00 AM",
+                "location": f"Hall {i % 10}",
+                "category": categories[i % len(categories)],
+                "max_attendees": max_attendees or registrations_per_event * 2 or 10,
+                "registered_count": registrations_per_event,
+                "attended_count": registrations_per_event // 2,
+                "status": EventStatus.ACTIVE,
+                "is_registration_open": True,
+                "organizer_id": admin_id,
+                "college_id": college_id,
+            }
+            for i in range(num_events)
+        ]
+        if events:
+            conn.execute(Event.__table__.insert(), events)
+        event_ids = [row[0] for row in conn.execute(
+            Event.__table__.select().with_only_columns(Event.id).where(
+                Event.college_id == college_id
+            ).order_by(Event.id)
+        )]
+
+        registrations = []
+        feedback = []
+        for event_id in event_ids:
+            for i in range(registrations_per_event):
+                registrations.append({
+                    "student_id": student_ids[i],
+                    "event_id": event_id,
+                    "status": RegistrationStatus.ATTENDED if i % 2 == 0 else RegistrationStatus.REGISTERED,
+                })
+            for i in range(feedback_per_event):
+                feedback.append({
+                    "student_id": student_ids[i],
+                    "event_id": event_id,
+                    "rating": 1 + (event_id + i) % 5,
+                })
+        if registrations:
+            conn.execute(Registration.__table__.insert(), registrations)
+        if feedback:
+            conn.execute(Feedback.__table__.insert(), feedback)
+
+    # The API creates the counter row with the college and keeps trending
+    # scores and feedback aggregates as students use it; bulk loads rebuild them
+    db = SessionLocal()
+    try:
+        rebuild_college_stats(db, [college_id])
+        rebuild_trending_scores(db, [college_id])
+        rebuild_feedback_stats(db, [college_id])
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "college_id": college_id,
+        "admin_email": f"admin{college_id}@bench.edu",
+        "student_emails": [f"student{i}.{college_id}@bench.edu" for i in range(num_students)],
+        "event_ids": event_ids,
+    }
+
+
+def auth_headers(email):
+    from auth import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': email})}"}
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the app engines inside the block."""
+    from sqlalchemy import event
+    from database import engine, async_engine
+
+    counter = {"count": 0}
+    engines = (engine, async_engine.sync_engine)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
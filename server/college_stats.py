@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Materialized per-college dashboard counters and data version.
+
+Write paths call bump_college_stats() inside their own transaction so the
+counters commit (or roll back) together with the change they describe.
+Run this module directly to rebuild every counter row from scratch:
+
+    python college_stats.py --reconcile
+"""
+
+import argparse
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, case, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import AsyncSessionLocal, SessionLocal, engine
+from models import Base, College, CollegeStats, User, Event, Registration, UserRole, EventStatus, RegistrationStatus
+
+COUNTER_FIELDS = ("total_events", "total_students", "total_registrations", "completed_events")
+
+def count_college_stats(db: Session, college_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """Counter values recounted from the data, one dict per college (all colleges if None)"""
+    colleges = db.query(College.id)
+    if college_ids is not None:
+        college_ids = list(college_ids)
+        colleges = colleges.filter(College.id.in_(college_ids))
+    ids = [row.id for row in colleges]
+    if not ids:
+        return []
+
+    event_counts = {
+        row.college_id: row
+        for row in db.query(
+            Event.college_id,
+            func.count(Event.id).label("total_events"),
+            func.sum(case((Event.status == EventStatus.COMPLETED, 1), else_=0)).label("completed_events")
+        ).filter(Event.college_id.in_(ids)).group_by(Event.college_id)
+    }
+    student_counts = dict(
+        db.query(User.college_id, func.count(User.id)).filter(
+            User.college_id.in_(ids),
+            User.role == UserRole.STUDENT
+        ).group_by(User.college_id).all()
+    )
+    registration_counts = dict(
+        db.query(Event.college_id, func.count(Registration.id)).join(
+            Event, Registration.event_id == Event.id
+        ).filter(
+            Event.college_id.in_(ids),
+            # Waitlisted students count once they are promoted to a seat
+            Registration.status != RegistrationStatus.WAITLISTED
+        ).group_by(Event.college_id).all()
+    )
+
+    counts = []
+    for college_id in ids:
+        events = event_counts.get(college_id)
+        counts.append(dict(
+            college_id=college_id,
+            total_events=events.total_events if events else 0,
+            completed_events=int(events.completed_events or 0) if events else 0,
+            total_students=student_counts.get(college_id, 0),
+            total_registrations=registration_counts.get(college_id, 0)
+        ))
+    return counts
+
+def rebuild_college_stats(db: Session, college_ids: Optional[Iterable[int]] = None) -> List[CollegeStats]:
+    """Recount the counters for the given colleges (all colleges if None). Does not commit."""
+    rows = [db.merge(CollegeStats(**counts)) for counts in count_college_stats(db, college_ids)]
+    db.flush()
+    return rows
+
+async def bump_college_stats(db: AsyncSession, college_id: int, events_changed: bool = False, **deltas: int) -> None:
+    """Apply counter deltas and bump data_version with a single atomic UPDATE in the caller's transaction.
+
+    Call this after the ORM change it describes has been added to the session:
+    if the college has no counter row yet, the row is rebuilt from the flushed state.
+    Writes that change event or registration data without moving a counter
+    call it with no deltas, so cached listings are still invalidated.
+    Writes to the events themselves (not just their registrations) pass
+    events_changed=True, which also bumps events_version for the event calendar.
+    """
+    unknown = set(deltas) - set(COUNTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown college stats counters: {', '.join(sorted(unknown))}")
+
+    values = {
+        field: getattr(CollegeStats, field) + delta
+        for field, delta in deltas.items()
+        if delta
+    }
+    values["data_version"] = CollegeStats.data_version + 1
+    if events_changed:
+        values["events_version"] = CollegeStats.events_version + 1
+
+    statement = update(CollegeStats).where(
+        CollegeStats.college_id == college_id
+    ).values(**values).execution_options(synchronize_session=False)
+    if (await db.execute(statement)).rowcount:
+        return
+
+    # First write for this college: create the row from the flushed state, which
+    # already includes this change. A concurrent first write may win the insert;
+    # then the row exists without our change, and the UPDATE applies it.
+    await db.flush()
+    counts = await db.run_sync(count_college_stats, [college_id])
+    if not counts:
+        return
+    insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    created = await db.execute(
+        insert(CollegeStats).values(**counts[0]).on_conflict_do_nothing(
+            index_elements=[CollegeStats.college_id]
+        )
+    )
+    if not created.rowcount:
+        await db.execute(statement)
+
+async def get_college_stats(db: AsyncSession, college_id: int) -> CollegeStats:
+    """Primary-key read of the counter row, building it on first use."""
+    stats = await db.get(CollegeStats, college_id)
+    if stats is None and db.info.get("replica"):
+        # Read replicas refuse writes: build the row on the primary
+        async with AsyncSessionLocal() as primary:
+            return await get_college_stats(primary, college_id)
+    if stats is None:
+        await db.run_sync(rebuild_college_stats, [college_id])
+        await db.commit()
+        stats = await db.get(CollegeStats, college_id)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain materialized college dashboard counters")
+    parser.add_argument("--reconcile", action="store_true", help="Rebuild all counters from scratch")
+    parser.add_argument("--college-id", type=int, action="append", help="Limit to these colleges")
+    args = parser.parse_args()
+
+    if not args.reconcile:
+        parser.print_help()
+        return
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rows = rebuild_college_stats(db, args.college_id)
+        db.commit()
+        for row in rows:
+            print(
+                f"College {row.college_id}: {row.total_events} events, {row.total_students} students, "
+                f"{row.total_registrations} registrations, {row.completed_events} completed"
+            )
+        print(f"Reconciled {len(rows)} college(s)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
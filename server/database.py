@@ -1,5 +1,18 @@
+import json
+import logging
 import os
-from sqlalchemy import create_engine
+import random
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Iterator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -9,9 +22,220 @@ load_dotenv()
 # Database URL - using SQLite for development, PostgreSQL for production
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./campus_spark.db")
 
-engine = create_engine(DATABASE_URL)
+# Async drivers used by the API routers
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+# Connection pool, per engine and per worker process. DB_POOL_SIZE=0 disables
+# pooling (NullPool), e.g. behind an external pooler such as PgBouncer.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# SQLite connection pragmas
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    finally:
+        cursor.close()
+
+# Query instrumentation: per-request query count and DB time (see
+# track_queries), plus a structured log of slow statements. SLOW_QUERY_MS=0
+# logs every statement; SLOW_QUERY_SAMPLE_RATE logs only that share of them.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0))
+
+slow_query_logger = logging.getLogger("campus_spark.slow_query")
+
+class RequestQueries:
+    """Statements executed on behalf of one request"""
+
+    __slots__ = ("count", "seconds", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.count = 0
+        self.seconds = 0.0
+        # ASGI scope of the request; names the matched route once routed
+        self.scope = scope
+
+    @property
+    def route(self) -> Optional[str]:
+        if not self.scope:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope.get('method')} {route.path}" if route else self.scope.get("path")
+
+_current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+@contextmanager
+def track_queries(scope: Optional[dict] = None) -> Iterator[RequestQueries]:
+    """Count statements and DB time for everything executed inside the block.
+
+    Context-local, so concurrent requests on one event loop are kept apart;
+    tasks spawned inside the block (such as streaming responses) keep adding
+    to the same counters.
+    """
+    queries = RequestQueries(scope)
+    token = _current_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        _current_queries.reset(token)
+
+# Placeholders of an expanded IN list, in any DBAPI paramstyle
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """One-line SQL with IN lists collapsed, so the same query always logs the same way"""
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+def _parameters_shape(parameters, executemany: bool):
+    # Types only: values can hold personal data
+    def shape(params):
+        if isinstance(params, dict):
+            return {key: type(value).__name__ for key, value in params.items()}
+        return [type(value).__name__ for value in params or ()]
+
+    if executemany:
+        return {"rows": len(parameters), "row": shape(parameters[0]) if parameters else []}
+    return shape(parameters)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    queries = _current_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += duration
+
+    if duration * 1000 >= SLOW_QUERY_MS and random.random() < SLOW_QUERY_SAMPLE_RATE:
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(duration * 1000, 2),
+            "route": queries.route if queries else None,
+            "statement": normalize_sql(statement),
+            "parameters": _parameters_shape(parameters, executemany),
+        }))
+
+async def _aiosqlite_connect(database: str, read_only: bool = False):
+    import aiosqlite
+    
+    if read_only:
+        connection = aiosqlite.connect(f"file:{database}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        connection = aiosqlite.connect(database, check_same_thread=False)
+    # aiosqlite runs each connection on its own non-daemon thread; idle pooled
+    # connections would otherwise keep scripts that never shut the app down alive.
+    # The connection is the thread up to aiosqlite 0.20, later it holds one.
+    getattr(connection, "_thread", connection).daemon = True
+    return await connection
+
+def create_db_engine(url: str, is_async: bool = False, read_only: bool = False):
+    """Engine for `url` with the pool and connection settings from the environment.
+    
+    SQLite file databases get a real connection pool (SQLAlchemy defaults to
+    NullPool for aiosqlite, i.e. a new connection and thread per session) and
+    the pragmas above on every new connection. In-memory SQLite databases keep
+    SQLAlchemy's single-connection defaults.
+    
+    read_only engines (read replicas) refuse writes: SQLite files are opened
+    with mode=ro, so a missing file fails to connect instead of being created,
+    and PostgreSQL sessions default to read-only transactions.
+    """
+    parsed = make_url(url)
+    sqlite = parsed.get_backend_name() == "sqlite"
+    in_memory = sqlite and parsed.database in (None, "", ":memory:")
+    options = {}
+    
+    if sqlite:
+        # Connections are shared across threads by the pool and aiosqlite
+        options["connect_args"] = {"check_same_thread": False}
+    elif read_only:
+        options["connect_args"] = (
+            {"server_settings": {"default_transaction_read_only": "on"}} if is_async
+            else {"options": "-c default_transaction_read_only=on"}
+        )
+    
+    if in_memory:
+        pass
+    elif DB_POOL_SIZE <= 0:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        if sqlite and is_async:
+            options["async_creator"] = partial(_aiosqlite_connect, parsed.database)
+        if not sqlite:
+            # Server connections can be dropped by the server, proxies or failovers
+            options.update(pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
+    
+    if sqlite and read_only and not in_memory:
+        if is_async:
+            options["async_creator"] = partial(_aiosqlite_connect, parsed.database, True)
+        else:
+            options["creator"] = partial(
+                sqlite3.connect, f"file:{parsed.database}?mode=ro", uri=True, check_same_thread=False
+            )
+    
+    if is_async:
+        new_engine = create_async_engine(url, **options)
+        sync_engine = new_engine.sync_engine
+    else:
+        new_engine = sync_engine = create_engine(url, **options)
+    
+    if sqlite:
+        event.listen(sync_engine, "connect", _sqlite_pragmas)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return new_engine
+
+# Sync engine: seed.py, alembic and maintenance commands
+engine: Engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers, so queries never block the event loop.
+# Objects stay usable after commit because responses are serialized afterwards.
+async_engine: AsyncEngine = create_db_engine(ASYNC_DATABASE_URL, is_async=True)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -20,3 +244,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
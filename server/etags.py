@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from college_stats import get_college_stats
+
+# Listings are per user (college scoped) and must be revalidated on every poll
+CACHE_CONTROL = "private, no-cache"
+
+async def college_etag(db: AsyncSession, college_id: int, *parts) -> str:
+    """Strong ETag for college-scoped data: changes whenever the college's data_version does.
+
+    `parts` distinguishes representations that also depend on something
+    other than stored data, such as the current time.
+    """
+    stats = await get_college_stats(db, college_id)
+    return '"' + "-".join([f"c{college_id}", f"v{stats.data_version}", *map(str, parts)]) + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return etag in (candidate.strip().removeprefix("W/") for candidate in header.split(","))
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    college_id: int,
+    *parts
+) -> Optional[Response]:
+    """Tag the response with the college's ETag.
+
+    Returns a 304 response when the client's copy is current; the caller
+    returns it as-is instead of querying and serializing the listing.
+    """
+    etag = await college_etag(db, college_id, *parts)
+    if etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
@@ -0,0 +1,314 @@
+import asyncio
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from college_stats import get_college_stats
+from models import College, CollegeStats, Event, EventCategory, EventStatus, User
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from schemas import College as CollegeSchema, Event as EventSchema, EventResponse, User as UserSchema
+
+# Process-local calendar of each college's upcoming active events.
+#
+# /events/upcoming, /student/events and the dashboard's upcoming count all
+# ask for "active events of college X from now on, by date". The answer only
+# changes when an admin edits events, so each worker keeps the events sorted
+# by (date, id) and answers with a bisect plus a slice. Events that have
+# started are simply skipped over until the next rebuild drops them.
+#
+# A calendar is built lazily on the first request for a college and tagged
+# with the college's events_version (bumped by every event write, from any
+# worker), so a stale one is rebuilt on the next request. Registration and
+# check-in counts change far more often; each snapshot remembers the
+# data_version its counts were read at, and pages with older counts get them
+# (and updated_at) refreshed in one primary-key query. Organizer and college
+# details are shared by every event and, like listing ETags, only refreshed
+# by event writes.
+EVENT_CALENDAR_ENABLED = os.getenv("EVENT_CALENDAR_ENABLED", "true").lower() in ("1", "true", "yes")
+# Colleges kept in memory; the least recently used calendar is dropped first
+EVENT_CALENDAR_MAX_COLLEGES = int(os.getenv("EVENT_CALENDAR_MAX_COLLEGES", 256))
+
+# Snapshots are plain tuples of the Event schema's fields, in this order; a
+# response model is only made for the events on the page being returned
+SNAPSHOT_FIELDS = tuple(EventSchema.model_fields)
+_ID = SNAPSHOT_FIELDS.index("id")
+_ORGANIZER_ID = SNAPSHOT_FIELDS.index("organizer_id")
+_COUNT_FIELDS = ("registered_count", "attended_count", "updated_at")
+_COUNT_POSITIONS = tuple(SNAPSHOT_FIELDS.index(field) for field in _COUNT_FIELDS)
+
+Key = Tuple[datetime, int]
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC, the form Event.date comes back in from SQLite"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class _Entry:
+    """One event's snapshot and the data_version its counts were read at"""
+
+    __slots__ = ("values", "counts_version")
+
+    def __init__(self, values: tuple, counts_version: int):
+        self.values = values
+        self.counts_version = counts_version
+
+class _Index:
+    """Entries sorted by (date, id), with the keys kept in a parallel list for bisect"""
+
+    __slots__ = ("keys", "entries")
+
+    def __init__(self):
+        self.keys: List[Key] = []
+        self.entries: List[_Entry] = []
+
+    def add(self, key: Key, entry: _Entry) -> None:
+        # Built from rows already in key order
+        self.keys.append(key)
+        self.entries.append(entry)
+
+    def page(self, after: Key, limit: int, inclusive: bool = False, skip: int = 0) -> List[_Entry]:
+        start = (bisect_left if inclusive else bisect_right)(self.keys, after) + skip
+        return self.entries[start:start + limit]
+
+    def count_from(self, after: Key) -> int:
+        return len(self.keys) - bisect_left(self.keys, after)
+
+class CollegeCalendar:
+    """Upcoming active events of one college, as of `events_version`"""
+
+    __slots__ = (
+        "college_id", "events_version", "college", "organizers", "upcoming", "open", "open_by_category", "nbytes"
+    )
+
+    def __init__(self, college_id: int, events_version: int):
+        self.college_id = college_id
+        self.events_version = events_version
+        self.college: Optional[CollegeSchema] = None
+        self.organizers: Dict[int, UserSchema] = {}
+        # Every active event, for /events/upcoming and the dashboard count
+        self.upcoming = _Index()
+        # Events open for registration, for /student/events, also split by category
+        self.open = _Index()
+        self.open_by_category: Dict[EventCategory, _Index] = {}
+        self.nbytes = 0
+
+    def upcoming_events(self, now: datetime, limit: int) -> List[_Entry]:
+        """Active events starting at or after `now`, soonest first"""
+        return self.upcoming.page((_utc(now), 0), limit, inclusive=True)
+
+    def count_upcoming(self, now: datetime) -> int:
+        return self.upcoming.count_from((_utc(now), 0))
+
+    def available_events(
+        self,
+        now: datetime,
+        limit: int,
+        category: Optional[str] = None,
+        after: Optional[Key] = None,
+        skip: int = 0
+    ) -> List[_Entry]:
+        """Events open for registration from `now` on, after the (date, id) cursor `after` if given"""
+        index = self.open
+        if category:
+            member = EventCategory._value2member_map_.get(category) or EventCategory.__members__.get(category)
+            index = self.open_by_category.get(member)
+            if index is None:
+                return []
+        start = (_utc(now), 0)
+        if after is not None:
+            after = (_utc(after[0]), after[1])
+            if after >= start:
+                return index.page(after, limit)
+            return index.page(start, limit, inclusive=True)
+        return index.page(start, limit, inclusive=True, skip=skip)
+
+    def response(self, entry: _Entry) -> EventResponse:
+        """The entry as the model the SQL path would have returned (nothing to validate)"""
+        fields = dict(zip(SNAPSHOT_FIELDS, entry.values))
+        return EventResponse.model_construct(
+            organizer=self.organizers.get(entry.values[_ORGANIZER_ID]),
+            college=self.college,
+            **fields
+        )
+
+class _Stats:
+    __slots__ = ("hits", "builds", "refreshes", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.builds = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+_calendars: "OrderedDict[int, CollegeCalendar]" = OrderedDict()
+# Builds in progress, so concurrent requests for a cold college share one
+_building: Dict[int, asyncio.Future] = {}
+_lock = threading.Lock()
+_stats = _Stats()
+
+def _entry_size(key: Key, entry: _Entry) -> int:
+    """Approximate bytes held by one event's slot (the key's date is shared with the snapshot)"""
+    size = sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry.values)
+    for value in entry.values:
+        # Enum members, booleans, None and small ints are shared by every event
+        if value is None or isinstance(value, (bool, EventCategory, EventStatus)):
+            continue
+        if isinstance(value, int) and -5 <= value <= 256:
+            continue
+        size += sys.getsizeof(value)
+    return size
+
+async def _build(db: AsyncSession, college_id: int, events_version: int, data_version: int) -> CollegeCalendar:
+    # /events/upcoming still lists events that started earlier in the current minute
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    # Plain rows rather than ORM instances, which a large college would have
+    # tens of thousands of; they already hold the types the schema declares
+    rows = (await db.execute(
+        select(*(Event.__table__.c[field] for field in SNAPSHOT_FIELDS)).filter(
+            and_(
+                Event.college_id == college_id,
+                Event.status == EventStatus.ACTIVE,
+                Event.date >= now
+            )
+        ).order_by(Event.date, Event.id)
+    )).all()
+
+    calendar = CollegeCalendar(college_id, events_version)
+    organizer_ids = {row[_ORGANIZER_ID] for row in rows}
+    calendar.organizers = {
+        user.id: UserSchema.model_validate(user)
+        for user in (await db.execute(select(User).filter(User.id.in_(organizer_ids)))).scalars()
+    }
+    college = await db.get(College, college_id)
+    if college is not None:
+        calendar.college = CollegeSchema.model_validate(college)
+
+    for row in rows:
+        event = row._mapping
+        key = (_utc(event["date"]), event["id"])
+        entry = _Entry(tuple(row), data_version)
+        calendar.upcoming.add(key, entry)
+        calendar.nbytes += _entry_size(key, entry)
+        if event["is_registration_open"]:
+            calendar.open.add(key, entry)
+            calendar.open_by_category.setdefault(event["category"], _Index()).add(key, entry)
+    for index in (calendar.upcoming, calendar.open, *calendar.open_by_category.values()):
+        calendar.nbytes += sys.getsizeof(index.keys) + sys.getsizeof(index.entries)
+    return calendar
+
+async def get_calendar(db: AsyncSession, stats: CollegeStats) -> CollegeCalendar:
+    """The college's calendar, (re)built if missing or older than its events_version"""
+    college_id = stats.college_id
+    with _lock:
+        calendar = _calendars.get(college_id)
+        # A replica behind the worker's newest calendar is served that calendar
+        if calendar is not None and calendar.events_version >= stats.events_version:
+            _calendars.move_to_end(college_id)
+            _stats.hits += 1
+            return calendar
+
+    building = _building.get(college_id)
+    if building is not None and not building.done():
+        calendar = await asyncio.shield(building)
+        if calendar.events_version >= stats.events_version:
+            return calendar
+
+    future = asyncio.get_running_loop().create_future()
+    _building[college_id] = future
+    try:
+        calendar = await _build(db, college_id, stats.events_version, stats.data_version)
+    except BaseException as exc:
+        future.set_exception(exc)
+        # Waiters see the error; nobody else needs to retrieve it
+        future.exception()
+        raise
+    finally:
+        if _building.get(college_id) is future:
+            del _building[college_id]
+    future.set_result(calendar)
+
+    with _lock:
+        _stats.builds += 1
+        current = _calendars.get(college_id)
+        if current is None or current.events_version <= calendar.events_version:
+            _calendars[college_id] = calendar
+            _calendars.move_to_end(college_id)
+            while len(_calendars) > EVENT_CALENDAR_MAX_COLLEGES:
+                _calendars.popitem(last=False)
+    return calendar
+
+async def current_events(
+    db: AsyncSession,
+    calendar: CollegeCalendar,
+    data_version: int,
+    entries: List[_Entry]
+) -> List[EventResponse]:
+    """Responses for `entries`, re-reading counts that predate the college's data_version"""
+    stale = {entry.values[_ID]: entry for entry in entries if entry.counts_version < data_version}
+    if stale:
+        rows = await db.execute(
+            select(Event.id, *(getattr(Event, field) for field in _COUNT_FIELDS)).filter(Event.id.in_(stale))
+        )
+        for event_id, *counts in rows:
+            entry = stale[event_id]
+            values = list(entry.values)
+            for position, value in zip(_COUNT_POSITIONS, counts):
+                values[position] = value
+            entry.values = tuple(values)
+            entry.counts_version = data_version
+        _stats.refreshes += 1
+    return [calendar.response(entry) for entry in entries]
+
+async def upcoming_events(db: AsyncSession, college_id: int, now: datetime, limit: int) -> List[EventResponse]:
+    """Calendar version of the /events/upcoming query"""
+    stats = await get_college_stats(db, college_id)
+    calendar = await get_calendar(db, stats)
+    return await current_events(db, calendar, stats.data_version, calendar.upcoming_events(now, limit))
+
+async def available_events(
+    db: AsyncSession,
+    college_id: int,
+    limit: int,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    response: Optional[Response] = None
+) -> List[EventResponse]:
+    """Calendar version of the /student/events query, paginated like pagination.paginate()"""
+    after = decode_cursor(cursor, (Event.date, Event.id)) if cursor else None
+    stats = await get_college_stats(db, college_id)
+    calendar = await get_calendar(db, stats)
+    entries = calendar.available_events(datetime.utcnow(), limit + 1, category, after, skip)
+    events = await current_events(db, calendar, stats.data_version, entries[:limit])
+    if len(entries) > limit and response is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([events[-1].date, events[-1].id])
+    return events
+
+def invalidate_calendar(college_id: int) -> None:
+    """Drop this worker's calendar for the college right away (other workers notice its events_version)"""
+    with _lock:
+        if _calendars.pop(college_id, None) is not None:
+            _stats.invalidations += 1
+
+def calendar_stats() -> dict:
+    with _lock:
+        return {
+            "enabled": EVENT_CALENDAR_ENABLED,
+            "colleges": len(_calendars),
+            "max_colleges": EVENT_CALENDAR_MAX_COLLEGES,
+            "events": sum(len(calendar.upcoming.keys) for calendar in _calendars.values()),
+            "bytes": sum(calendar.nbytes for calendar in _calendars.values()),
+            "hits": _stats.hits,
+            "builds": _stats.builds,
+            "count_refreshes": _stats.refreshes,
+            "invalidations": _stats.invalidations,
+        }
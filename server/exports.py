@@ -0,0 +1,68 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.sql import Select
+
+from database import AsyncSessionLocal
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows fetched per round trip from the server-side cursor, and per chunk written
+EXPORT_BATCH_SIZE = 1000
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+async def stream_rows(query: Select, export_format: str, bind: Optional[AsyncEngine] = None) -> AsyncIterator[str]:
+    """Encode the rows of a column query batch by batch as CSV or NDJSON.
+
+    The query runs on its own session so the cursor stays open for as long
+    as the client keeps reading, independent of the request's session.
+    Only one batch of plain tuples is held in memory at a time. `bind` is
+    the engine to read from (the request session's, e.g. a read replica);
+    the primary by default.
+    """
+    async with (AsyncSession(bind) if bind is not None else AsyncSessionLocal()) as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            async for rows in result.partitions():
+                writer.writerows([_plain(value) for value in row] for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(columns, (_plain(value) for value in row)))) + "\n"
+                    for row in rows
+                )
+
+def export_response(
+    query: Select, export_format: str, filename: str, bind: Optional[AsyncEngine] = None
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(query, export_format, bind),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
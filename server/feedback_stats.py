@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Running per-event feedback aggregates: rating sum, count and 1-5 histogram.
+
+submit_feedback() calls record_feedback() in its own transaction, so an
+event's summary and its average in the reports are a primary-key read
+however much feedback it has. Feedback loaded outside the API (bulk imports,
+seed data) needs a rebuild:
+
+    python feedback_stats.py --rebuild
+"""
+
+import argparse
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, engine
+from models import Base, Event, EventFeedbackStats, Feedback
+from schemas import FeedbackSummary
+
+RATINGS = range(1, 6)
+HISTOGRAM_FIELDS = {rating: f"rating_{rating}" for rating in RATINGS}
+
+def _aggregates():
+    """Per-event aggregates recounted from the feedback rows"""
+    return select(
+        Feedback.event_id,
+        func.sum(Feedback.rating).label("rating_sum"),
+        func.count(Feedback.id).label("rating_count"),
+        *(
+            func.sum(case((Feedback.rating == rating, 1), else_=0)).label(field)
+            for rating, field in HISTOGRAM_FIELDS.items()
+        )
+    ).group_by(Feedback.event_id)
+
+def rebuild_feedback_stats(
+    db: Session,
+    college_ids: Optional[Iterable[int]] = None,
+    event_ids: Optional[Iterable[int]] = None
+) -> int:
+    """Recount the aggregates of the given colleges' or events' feedback (everything if neither). Does not commit."""
+    events = select(Event.id)
+    if college_ids is not None:
+        events = events.where(Event.college_id.in_(list(college_ids)))
+    if event_ids is not None:
+        events = events.where(Event.id.in_(list(event_ids)))
+    scoped = college_ids is not None or event_ids is not None
+
+    stale = delete(EventFeedbackStats)
+    aggregates = _aggregates()
+    if scoped:
+        stale = stale.where(EventFeedbackStats.event_id.in_(events))
+        aggregates = aggregates.where(Feedback.event_id.in_(events))
+
+    # Events without feedback have no row; their summary is all zeros
+    db.execute(stale.execution_options(synchronize_session=False))
+    rows = [dict(row._mapping) for row in db.execute(aggregates)]
+    if rows:
+        db.execute(EventFeedbackStats.__table__.insert(), rows)
+    db.flush()
+    return len(rows)
+
+async def record_feedback(db: AsyncSession, event_id: int, rating: int) -> None:
+    """Add one rating to the event's aggregates with a single atomic UPDATE in the caller's transaction.
+
+    Call this after the Feedback row has been added to the session: an event
+    with no aggregates row yet has it created from the flushed state.
+    """
+    values = {
+        "rating_sum": EventFeedbackStats.rating_sum + rating,
+        "rating_count": EventFeedbackStats.rating_count + 1,
+    }
+    if rating in HISTOGRAM_FIELDS:
+        field = HISTOGRAM_FIELDS[rating]
+        values[field] = getattr(EventFeedbackStats, field) + 1
+
+    statement = update(EventFeedbackStats).where(
+        EventFeedbackStats.event_id == event_id
+    ).values(**values).execution_options(synchronize_session=False)
+    if (await db.execute(statement)).rowcount:
+        return
+
+    # First rating for this event: create the row from the flushed state, which
+    # already includes this one. A concurrent first rating may win the insert;
+    # then the row exists without ours, and the UPDATE adds it.
+    await db.flush()
+    aggregates = (await db.execute(
+        _aggregates().where(Feedback.event_id == event_id)
+    )).first()
+    if aggregates is None:
+        return
+    insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    created = await db.execute(
+        insert(EventFeedbackStats).values(**aggregates._mapping).on_conflict_do_nothing(
+            index_elements=[EventFeedbackStats.event_id]
+        )
+    )
+    if not created.rowcount:
+        await db.execute(statement)
+
+def feedback_summary(event_id: int, stats: Optional[EventFeedbackStats]) -> FeedbackSummary:
+    """Summary from an aggregates row; None means the event has no feedback yet"""
+    count = stats.rating_count if stats else 0
+    return FeedbackSummary(
+        event_id=event_id,
+        feedback_count=count,
+        avg_rating=stats.rating_sum / count if count else None,
+        rating_histogram={
+            rating: getattr(stats, field) if stats else 0
+            for rating, field in HISTOGRAM_FIELDS.items()
+        }
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain per-event feedback aggregates")
+    parser.add_argument("--rebuild", action="store_true", help="Recount every event's aggregates from the feedback")
+    parser.add_argument("--college-id", type=int, action="append", help="Limit to these colleges")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_feedback_stats(db, args.college_id)
+        db.commit()
+        print(f"Rebuilt feedback aggregates for {count} event(s) with feedback")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import joinedload
+
+from models import User, Event, Registration, Feedback
+
+# Relationships serialized by each response model. AsyncSession cannot lazy-load
+# while FastAPI serializes the response, so every query whose rows are returned
+# through one of these schemas must apply the matching options.
+#
+# All of these are many-to-one, so a LEFT OUTER JOIN adds columns but never
+# multiplies rows: LIMIT/keyset pagination stays correct and a page is loaded
+# in a single round trip. Use selectinload for any collection added later.
+EVENT_RESPONSE_OPTIONS = (joinedload(Event.organizer), joinedload(Event.college))
+REGISTRATION_RESPONSE_OPTIONS = (joinedload(Registration.student), joinedload(Registration.event))
+FEEDBACK_RESPONSE_OPTIONS = (joinedload(Feedback.student), joinedload(Feedback.event))
+USER_RESPONSE_OPTIONS = (joinedload(User.college),)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -6,15 +6,24 @@ import uvicorn
 import os
 from dotenv import load_dotenv
 
-from database import engine, get_db
-from models import Base
+from database import engine, async_engine, get_db
 from routers import auth, admin, student, events
 from auth import get_current_user
+from pagination import NEXT_CURSOR_HEADER
+from metrics import (
+    METRICS_ENABLED, SERVER_TIMING_ENABLED, MetricsMiddleware, QueryTrackingMiddleware, instrument_engine,
+    mark_worker_stopped, render_metrics
+)
+from ratelimit import (
+    API_RATE_PER_IP, API_RATE_PER_USER, LOAD_SHED_ENABLED, LoadSheddingMiddleware, RateLimit, rate_limit
+)
+from read_replicas import DATABASE_READ_URLS, ReadYourWritesMiddleware, dispose_replicas, replica_engines
+from warmup import WARMUP_ENABLED, warm_up
 
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The schema is created or upgraded by `python migrate.py`, once per deploy,
+# rather than by every worker on import
 
 app = FastAPI(
     title="Campus Spark API",
@@ -36,8 +45,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
 
+# Always on: slow-query log entries name their route through it
+app.add_middleware(QueryTrackingMiddleware, server_timing=SERVER_TIMING_ENABLED)
+
+# Only needed to pin users who just wrote to the primary
+if DATABASE_READ_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Inside the metrics middleware, so shed requests still show up as 503s
+if LOAD_SHED_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware)
+
+# Added last so it is outermost and times CORS handling too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+    for i, replica_engine in enumerate(replica_engines(), 1):
+        instrument_engine(replica_engine.sync_engine, f"replica{i}")
+
+@app.on_event("startup")
+async def warm_up_worker():
+    # Runs before uvicorn accepts connections
+    if WARMUP_ENABLED:
+        await warm_up()
+
+@app.on_event("shutdown")
+async def dispose_engines():
+    # Close pooled connections cleanly (on SQLite this also checkpoints the WAL)
+    await async_engine.dispose()
+    await dispose_replicas()
+    engine.dispose()
+    mark_worker_stopped()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -47,13 +90,30 @@ async def health_check():
         "version": "2.0.0"
     }
 
+# Prometheus scrape endpoint; sync so reading multiprocess files stays off the event loop
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# Per-router limits: token buckets per route class (429 when empty). Login
+# and register add the stricter auth limits on their own routes (routers/auth.py)
+api_rate = RateLimit.parse(API_RATE_PER_IP), RateLimit.parse(API_RATE_PER_USER)
+auth_limits = [Depends(rate_limit("auth_lookup", *api_rate))]
+admin_limits = [Depends(rate_limit("admin", *api_rate))]
+student_limits = [Depends(rate_limit("student", *api_rate))]
+events_limits = [Depends(rate_limit("events", *api_rate))]
+
 # Include routers
-app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(admin.router, prefix="/admin", tags=["Admin"])
-app.include_router(student.router, prefix="/student", tags=["Student"])
-app.include_router(events.router, prefix="/events", tags=["Events"])
+app.include_router(auth.router, prefix="/auth", tags=["Authentication"], dependencies=auth_limits)
+app.include_router(admin.router, prefix="/admin", tags=["Admin"], dependencies=admin_limits)
+app.include_router(student.router, prefix="/student", tags=["Student"], dependencies=student_limits)
+app.include_router(events.router, prefix="/events", tags=["Events"], dependencies=events_limits)
 
 if __name__ == "__main__":
+    from migrate import migrate
+    
+    migrate()
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
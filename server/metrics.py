@@ -0,0 +1,171 @@
+import os
+import time
+from typing import Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database import track_queries
+
+# Prometheus metrics for every HTTP request and the database pools.
+#
+# With several uvicorn/gunicorn workers, point PROMETHEUS_MULTIPROC_DIR at an
+# empty directory before the workers start: each worker then writes its
+# samples there and /metrics aggregates all of them. Without it, /metrics
+# only reports the worker that serves the scrape.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+
+# Requests that match no route share one label, so unknown paths can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last response byte",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "Request body size", ["method", "route"], buckets=SIZE_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route", "status"], buckets=SIZE_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being served", ["method"], multiprocess_mode="livesum"
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time to get a connection from the pool, including opening a new one",
+    ["engine"], buckets=POOL_WAIT_BUCKETS
+)
+POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use", "Connections checked out of the pool", ["engine"], multiprocess_mode="livesum"
+)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, sizes and in-flight requests.
+
+    The route label is the matched path template (e.g. /events/{event_id}),
+    read from the scope after the router has handled the request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        request_size = 0
+        response_size = 0
+
+        async def receive_counted():
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def send_counted(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", UNMATCHED_ROUTE)
+            status = str(status_code)
+            REQUEST_LATENCY.labels(method, route, status).observe(duration)
+            REQUEST_SIZE.labels(method, route).observe(request_size)
+            RESPONSE_SIZE.labels(method, route, status).observe(response_size)
+
+class QueryTrackingMiddleware:
+    """Pure ASGI middleware counting the request's queries and DB time, and
+    naming its route in the slow-query log. Installed whatever the settings.
+
+    With server_timing, it also adds a Server-Timing header, e.g.
+    `db;dur=3.1;desc="4 queries", app;dur=9.8`. Both durations are in
+    milliseconds up to the start of the response, so rows fetched while a
+    streaming body is sent are not included.
+    """
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        with track_queries(scope) as queries:
+            if not self.server_timing:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_timed(message):
+                if message["type"] == "http.response.start":
+                    app_ms = (time.perf_counter() - start) * 1000
+                    timing = (
+                        f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries", '
+                        f"app;dur={app_ms:.1f}"
+                    ).encode("latin-1")
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing)]}
+                await send(message)
+
+            await self.app(scope, receive, send_timed)
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Record pool checkout wait and connections in use for `engine`.
+
+    SQLAlchemy has no event before a checkout starts, so the wait is timed
+    around Engine.raw_connection, which every Connection checks out through.
+    For an AsyncEngine pass its sync_engine.
+    """
+    raw_connection = engine.raw_connection
+    wait = POOL_CHECKOUT_WAIT.labels(name)
+    in_use = POOL_IN_USE.labels(name)
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+    event.listen(engine, "checkout", lambda *args: in_use.inc())
+    event.listen(engine, "checkin", lambda *args: in_use.dec())
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition for /metrics: every worker's samples in multiprocess mode"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the multiprocess directory on shutdown"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
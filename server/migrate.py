@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Explicit schema step: bring the database up to date before any worker starts.
+
+main.py no longer creates tables when it is imported, so a deploy runs this
+once instead of every worker inspecting the schema on boot:
+
+- a database under Alembic (it has an alembic_version table) is upgraded to head;
+- an empty database gets the models' schema and the search index, and is
+  stamped at head so later migrations apply to it;
+- a database created by create_all before the migrations existed (tables,
+  but no alembic_version) is stamped at the initial revision and upgraded,
+  so it gets every column and table added since.
+
+    python migrate.py
+"""
+
+import argparse
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from database import DATABASE_URL, engine
+from models import Base
+from search import create_search_index
+
+SERVER_DIR = os.path.dirname(os.path.realpath(__file__))
+
+def alembic_config() -> Config:
+    """The project's Alembic config, usable from any working directory"""
+    config = Config(os.path.join(SERVER_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(SERVER_DIR, "alembic"))
+    # alembic.ini's logging setup would disable the app's loggers (slow queries, startup)
+    config.attributes["configure_logger"] = False
+    return config
+
+def migrate() -> str:
+    """Create or upgrade the schema; returns what was done"""
+    tables = set(inspect(engine).get_table_names())
+
+    if "alembic_version" in tables:
+        command.upgrade(alembic_config(), "head")
+        return "upgraded to head"
+
+    if tables:
+        # create_all here would build the later tables with every column, and
+        # the migrations adding those columns would then fail
+        command.stamp(alembic_config(), "0001_initial_schema")
+        command.upgrade(alembic_config(), "head")
+        return "stamped at 0001_initial_schema and upgraded to head"
+
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    command.stamp(alembic_config(), "head")
+    return "created and stamped at head"
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.parse_args()
+
+    print(f"Schema {migrate()}: {engine.url.render_as_string(hide_password=True)}")
+
+if __name__ == "__main__":
+    main()
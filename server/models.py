@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -30,6 +30,7 @@ class RegistrationStatus(str, enum.Enum):
     CANCELLED = "cancelled"
     ATTENDED = "attended"
     NO_SHOW = "no-show"
+    WAITLISTED = "waitlisted"
 
 class College(Base):
     __tablename__ = "colleges"
@@ -76,6 +77,11 @@ class User(Base):
     organized_events = relationship("Event", back_populates="organizer")
     registrations = relationship("Registration", back_populates="student")
     feedback = relationship("Feedback", back_populates="student")
+    
+    __table_args__ = (
+        # College-scoped user lookups: /admin/students, dashboard counters
+        Index("ix_users_college_role", "college_id", "role"),
+    )
 
 class Event(Base):
     __tablename__ = "events"
@@ -97,6 +103,10 @@ class Event(Base):
     qr_code = Column(String)
     is_registration_open = Column(Boolean, default=True)
     registration_deadline = Column(DateTime(timezone=True))
+    # Last waitlist ticket handed out; tickets order the waitlist
+    waitlist_issued = Column(Integer, nullable=False, default=0, server_default="0")
+    # log2 of the time-weighted sign-up sum kept by trending.py; higher is hotter
+    trending_score = Column(Float, nullable=False, default=0.0, server_default="0")
     organizer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     college_id = Column(Integer, ForeignKey("colleges.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -107,6 +117,19 @@ class Event(Base):
     college = relationship("College", back_populates="events")
     registrations = relationship("Registration", back_populates="event")
     feedback = relationship("Feedback", back_populates="event")
+    
+    __table_args__ = (
+        # Upcoming/available events: college_id = ? AND status = ? AND date >= ?
+        Index("ix_events_college_status_date", "college_id", "status", "date"),
+        # Popular events: college_id = ? ORDER BY registered_count DESC
+        Index("ix_events_college_registered_count", "college_id", "registered_count"),
+        # Trending events: college_id = ? AND status = ? ORDER BY trending_score DESC
+        Index("ix_events_college_status_trending", "college_id", "status", "trending_score"),
+        # /events/ and reports: college_id = ? ORDER BY date, id
+        Index("ix_events_college_date", "college_id", "date", "id"),
+        # /admin/events: college_id = ? ORDER BY created_at, id
+        Index("ix_events_college_created_at", "college_id", "created_at", "id"),
+    )
 
 class Registration(Base):
     __tablename__ = "registrations"
@@ -118,6 +141,8 @@ class Registration(Base):
     status = Column(Enum(RegistrationStatus), default=RegistrationStatus.REGISTERED)
     check_in_time = Column(DateTime(timezone=True))
     notes = Column(Text)
+    # Ticket from Event.waitlist_issued while status is WAITLISTED
+    waitlist_ticket = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -125,8 +150,17 @@ class Registration(Base):
     student = relationship("User", back_populates="registrations")
     event = relationship("Event", back_populates="registrations")
     
-    # Unique constraint
     __table_args__ = (
+        # Event registrations and per-event report aggregates
+        Index("ix_registrations_event_status", "event_id", "status"),
+        # Waitlist head and positions: event_id = ? AND status = ? ORDER BY waitlist_ticket
+        Index("ix_registrations_event_waitlist", "event_id", "status", "waitlist_ticket"),
+        # Duplicate-registration checks
+        Index("ix_registrations_student_event", "student_id", "event_id"),
+        # /student/registrations: student_id = ? ORDER BY created_at, id
+        Index("ix_registrations_student_created_at", "student_id", "created_at", "id"),
+        # Sign-up velocity: event_id = ? AND registration_date >= ?
+        Index("ix_registrations_event_date", "event_id", "registration_date"),
         {"extend_existing": True},
     )
 
@@ -143,3 +177,49 @@ class Feedback(Base):
     # Relationships
     student = relationship("User", back_populates="feedback")
     event = relationship("Event", back_populates="feedback")
+    
+    __table_args__ = (
+        # Per-event feedback listings and rating aggregates
+        Index("ix_feedback_event_created_at", "event_id", "created_at", "id"),
+        # Duplicate-feedback checks
+        Index("ix_feedback_student_event", "student_id", "event_id"),
+    )
+
+class CollegeStats(Base):
+    __tablename__ = "college_stats"
+    
+    # Materialized dashboard counters, maintained by the write paths in the routers
+    college_id = Column(Integer, ForeignKey("colleges.id"), primary_key=True)
+    total_events = Column(Integer, nullable=False, default=0)
+    total_students = Column(Integer, nullable=False, default=0)
+    total_registrations = Column(Integer, nullable=False, default=0)
+    completed_events = Column(Integer, nullable=False, default=0)
+    # Bumped by every event/registration write; listing ETags are derived from it
+    data_version = Column(Integer, nullable=False, default=0)
+    # Bumped by event creates/edits/deletes only; the in-memory event calendar is keyed on it
+    events_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class EventFeedbackStats(Base):
+    __tablename__ = "event_feedback_stats"
+    
+    # Running feedback aggregates, maintained by submit_feedback (see feedback_stats.py)
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    # Histogram: how many ratings of each value 1-5
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    
+    # Token buckets shared by all workers when RATE_LIMIT_BACKEND=database
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # time.time() of the last refill
+    updated_at = Column(Float, nullable=False)
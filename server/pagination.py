@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import String, and_, desc, literal, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+# Response header carrying the cursor for the next page. List endpoints keep
+# returning plain JSON arrays, so existing clients are unaffected.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence) -> str:
+    """Opaque, URL-safe cursor for the sort key of the last row on a page"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence) -> Tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        return tuple(
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for column, value in zip(columns, payload)
+        )
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _bounds(column, value, dialect_name: str) -> Tuple:
+    """(low, high) bind values that both compare equal to `value` in the database.
+
+    SQLite stores DateTime as text, and CURRENT_TIMESTAMP server defaults omit the
+    fractional part SQLAlchemy writes ('... 12:00:00' vs '... 12:00:00.000000').
+    Seeking with a single bound would either repeat or skip rows sharing a second.
+    """
+    if dialect_name == "sqlite" and isinstance(value, datetime):
+        high = value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        low = high[:-7] if value.microsecond == 0 else high
+        return literal(low, String), literal(high, String)
+    return value, value
+
+def keyset_filter(columns: Sequence, values: Sequence, descending: bool, dialect_name: str):
+    """Rows strictly after `values` in (columns) order, expressed so the sort index can seek"""
+    bounds = [_bounds(column, value, dialect_name) for column, value in zip(columns, values)]
+    clauses = []
+    for i, column in enumerate(columns):
+        low, high = bounds[i]
+        prefix = [and_(columns[j] >= bounds[j][0], columns[j] <= bounds[j][1]) for j in range(i)]
+        clauses.append(and_(*prefix, column < low if descending else column > high))
+    return or_(*clauses)
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    columns: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+    response: Optional[Response] = None
+) -> List:
+    """Run a keyset-paginated query ordered by `columns` (unique together).
+
+    With a cursor the query seeks past the previous page through the sort
+    index instead of counting off `skip` rows, so deep pages cost the same
+    as the first one. `skip` is still honoured when no cursor is given.
+    The cursor for the next page is set as the X-Next-Cursor header of
+    `response`, if one is passed.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(keyset_filter(columns, values, descending, db.bind.dialect.name))
+    elif skip:
+        query = query.offset(skip)
+
+    query = query.order_by(*[desc(column) if descending else column for column in columns])
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if response is not None:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+    return rows
@@ -0,0 +1,342 @@
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from auth import verify_token
+from database import async_engine
+from models import RateLimitBucket
+
+# Rate limiting and load shedding.
+#
+# rate_limit() builds a router dependency that takes a token per request from
+# a token bucket per client IP and/or per user, separately for each route
+# class, so a login storm doesn't use up anyone's budget for browsing events.
+# A request that finds its bucket empty gets 429 with Retry-After set to when
+# the next token arrives. It runs before the endpoint's own dependencies, so
+# a rejected login never reaches bcrypt or the database.
+#
+# Buckets live in this process by default, so with N workers a client gets
+# up to N times the budget. RATE_LIMIT_BACKEND=database keeps them in the
+# rate_limit_buckets table instead, shared by every worker, at the cost of one
+# upsert per checked key. Any object with the same async take() can be
+# plugged in with set_backend().
+#
+# LoadSheddingMiddleware caps the requests a worker serves at once. Requests
+# over the cap wait their turn; once MAX_QUEUED_REQUESTS are waiting, or a
+# request has waited LOAD_SHED_QUEUE_TIMEOUT seconds, it is answered 503 with
+# Retry-After instead of adding to everyone's latency.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# Buckets kept by the in-memory backend; the least recently used are dropped (and start full again)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+# Only enable behind a proxy that sets X-Forwarded-For, or clients can pick their own IP key
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+# Budgets per route class as "<requests>/<second|minute|hour>"; empty disables that key
+AUTH_RATE_PER_IP = os.getenv("AUTH_RATE_PER_IP", "30/minute")
+AUTH_RATE_PER_USER = os.getenv("AUTH_RATE_PER_USER", "10/minute")
+API_RATE_PER_IP = os.getenv("API_RATE_PER_IP", "")
+API_RATE_PER_USER = os.getenv("API_RATE_PER_USER", "600/minute")
+
+LOAD_SHED_ENABLED = os.getenv("LOAD_SHED_ENABLED", "true").lower() in ("1", "true", "yes")
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 256))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", 1024))
+LOAD_SHED_QUEUE_TIMEOUT = float(os.getenv("LOAD_SHED_QUEUE_TIMEOUT", 10))
+# Separate, smaller cap for the auth routes, so a login storm can't take every slot
+AUTH_MAX_CONCURRENT_REQUESTS = int(os.getenv("AUTH_MAX_CONCURRENT_REQUESTS", 32))
+AUTH_MAX_QUEUED_REQUESTS = int(os.getenv("AUTH_MAX_QUEUED_REQUESTS", 128))
+# Retry-After sent with a shed request
+LOAD_SHED_RETRY_AFTER = int(os.getenv("LOAD_SHED_RETRY_AFTER", 1))
+
+SHED_DETAIL = "Server is busy, please retry"
+
+# Never shed, so probes and scrapes keep working under overload
+UNSHED_PATHS = ("/health", "/metrics")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Bucket of `capacity` tokens refilled at `capacity / period` tokens per second"""
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """'30/minute' -> RateLimit(30, 60); an empty string means no limit"""
+        if not value:
+            return None
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour)\s*", value)
+        if not match:
+            raise ValueError(f"Invalid rate limit '{value}', expected e.g. '30/minute'")
+        return cls(int(match.group(1)), PERIODS[match.group(2)])
+
+class MemoryBackend:
+    """Token buckets in this process, bounded to `max_keys` like TTLCache"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated_at) * limit.refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / limit.refill_rate
+            self._buckets[key] = (tokens - 1 if wait == 0 else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys}
+
+class DatabaseBackend:
+    """Token buckets in the rate_limit_buckets table, shared by all workers.
+
+    A take is one INSERT ... ON CONFLICT DO UPDATE whose WHERE only lets it
+    through while the refilled bucket still has a token, so concurrent
+    workers can't both spend the last one. Refused takes read the bucket
+    back to work out Retry-After.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        dialect = engine.dialect.name
+        if dialect not in ("sqlite", "postgresql"):
+            raise ValueError(f"No rate limit upsert for '{dialect}' databases")
+        self._insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now = time.time()
+        table = RateLimitBucket.__table__
+        refilled = table.c.tokens + (now - table.c.updated_at) * limit.refill_rate
+        refilled = case((refilled > limit.capacity, limit.capacity), else_=refilled)
+        statement = self._insert(table).values(key=key, tokens=limit.capacity - 1, updated_at=now)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={"tokens": refilled - 1, "updated_at": now},
+            where=refilled >= 1
+        ).returning(table.c.key)
+        async with self.engine.begin() as conn:
+            if (await conn.execute(statement)).first() is not None:
+                return 0.0
+            tokens, updated_at = (await conn.execute(
+                select(table.c.tokens, table.c.updated_at).where(table.c.key == key)
+            )).one()
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.refill_rate)
+        return max((1 - tokens) / limit.refill_rate, 0.0)
+
+    def stats(self) -> dict:
+        return {"backend": "database"}
+
+def _create_backend(name: str):
+    if name == "memory":
+        return MemoryBackend(RATE_LIMIT_MAX_KEYS)
+    if name == "database":
+        return DatabaseBackend(async_engine)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{name}', expected 'memory' or 'database'")
+
+_backend = _create_backend(RATE_LIMIT_BACKEND)
+# Refused requests per "<route class>:<key kind>"
+_rejected: Dict[str, int] = {}
+
+def set_backend(backend) -> None:
+    """Swap in another bucket store, e.g. one backed by Redis"""
+    global _backend
+    _backend = backend
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+async def _user_key(request: Request) -> Optional[str]:
+    """Token subject for authenticated requests, else the email being logged in or registered"""
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        try:
+            return verify_token(authorization[7:])
+        except HTTPException:
+            # The endpoint rejects the token itself; the IP budget still applies
+            return None
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        if isinstance(body, dict) and isinstance(body.get("email"), str):
+            return body["email"].strip().lower()
+    return None
+
+def rate_limit(route_class: str, per_ip: Optional[RateLimit] = None, per_user: Optional[RateLimit] = None):
+    """Router dependency spending a token from each configured bucket.
+
+    Keys are "<route_class>:ip:<address>" and "<route_class>:user:<email>";
+    requests with no user to key on only spend from the IP bucket.
+    """
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        checks = []
+        if per_ip is not None:
+            checks.append(("ip", client_ip(request), per_ip))
+        if per_user is not None:
+            user = await _user_key(request)
+            if user is not None:
+                checks.append(("user", user, per_user))
+        for kind, value, limit in checks:
+            wait = await _backend.take(f"{route_class}:{kind}:{value}", limit)
+            if wait > 0:
+                counter = f"{route_class}:{kind}"
+                _rejected[counter] = _rejected.get(counter, 0) + 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, please retry later",
+                    headers={"Retry-After": str(max(math.ceil(wait), 1))},
+                )
+
+    return dependency
+
+def rate_limit_stats() -> dict:
+    return {**_backend.stats(), "enabled": RATE_LIMIT_ENABLED, "rejected": dict(_rejected)}
+
+class Overloaded(Exception):
+    pass
+
+class ConcurrencyLimiter:
+    """At most `max_concurrent` holders at once, with a bounded, time-limited line.
+
+    Freed slots pass straight to the longest waiter. Plain futures are used
+    instead of asyncio.Semaphore so one limiter can outlive an event loop.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        if self.active < self.max_concurrent and self.queued == 0:
+            self.active += 1
+            self.admitted += 1
+            return
+        if self.queued >= self.max_queued:
+            self.shed += 1
+            raise Overloaded()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as exc:
+            if future.done() and not future.cancelled():
+                # Handed a slot just as we gave up: pass it on
+                self.release()
+            if isinstance(exc, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise Overloaded() from None
+            raise
+        finally:
+            self.queued -= 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "queue_timeout_seconds": self.queue_timeout,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+def concurrency_limit(limiter: ConcurrencyLimiter):
+    """Router dependency holding a slot of `limiter` until the response is sent"""
+    async def dependency():
+        try:
+            await limiter.acquire()
+        except Overloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=SHED_DETAIL,
+                headers={"Retry-After": str(LOAD_SHED_RETRY_AFTER)},
+            )
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return dependency
+
+request_limiter = ConcurrencyLimiter(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, LOAD_SHED_QUEUE_TIMEOUT)
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware holding a limiter slot for each HTTP request.
+
+    Requests the limiter turns away get 503 with Retry-After without reaching
+    the app; paths in `unshed_paths` bypass the limiter.
+    """
+
+    def __init__(self, app, limiter: ConcurrencyLimiter = request_limiter, unshed_paths=UNSHED_PATHS):
+        self.app = app
+        self.limiter = limiter
+        self.unshed_paths = unshed_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.unshed_paths:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.limiter.acquire()
+        except Overloaded:
+            response = JSONResponse(
+                {"detail": SHED_DETAIL},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(LOAD_SHED_RETRY_AFTER)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
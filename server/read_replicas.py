@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Read replicas for the GET endpoints.
+
+get_read_db() is the read-only counterpart of get_async_db(): it hands out a
+session on one of DATABASE_READ_URLS, round-robin. Without replicas it is a
+primary session, exactly like get_async_db(). Writes, logins and the
+principal lookup always use the primary.
+
+Replicas lag behind the primary, so a user whose write request succeeded
+reads from the primary for READ_YOUR_WRITES_SECONDS afterwards. That window
+is kept per worker process: behind several workers, only reads landing on
+the worker that served the write are pinned.
+
+A replica that cannot be reached, or whose query fails with a connection or
+operational error, is left out of the rotation for REPLICA_RETRY_SECONDS and
+probed before it rejoins; with every replica out, reads go to the primary.
+
+SQLite replicas are plain copies of the primary file, opened read-only. For
+local testing, keep them in sync with the backup API (a consistent copy,
+safe while the app is running):
+
+    python read_replicas.py --sync
+    python read_replicas.py --sync --interval 5
+"""
+
+import argparse
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from auth import verify_token
+from database import DATABASE_URL, AsyncSessionLocal, create_db_engine, to_async_url
+from models import College
+
+# Comma-separated replica URLs (sync or async drivers); empty reads from the primary
+DATABASE_READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+# Users with a write inside the window that are remembered; the oldest are forgotten first
+READ_YOUR_WRITES_MAX_USERS = int(os.getenv("READ_YOUR_WRITES_MAX_USERS", 100000))
+
+# Requests that may write; a successful one pins its user to the primary
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+class Replica:
+    """One read-only engine and its place in the rotation"""
+
+    def __init__(self, url: str):
+        url = to_async_url(url)
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_db_engine(url, is_async=True, read_only=True)
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine, autoflush=False, expire_on_commit=False, info={"replica": self.name}
+        )
+        # Probed before its first use and after every failure
+        self.verified = False
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def mark_down(self, error: BaseException) -> None:
+        self.verified = False
+        self.down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"[:200]
+
+    async def probe(self) -> bool:
+        """A connection and a read of the schema, so an empty or foreign database fails too"""
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(select(College.id).limit(1))
+        except (DBAPIError, OSError) as exc:
+            self.mark_down(exc)
+            return False
+        self.verified = True
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "url": self.name,
+            "up": time.monotonic() >= self.down_until,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+class _Stats:
+    __slots__ = ("primary_reads", "pinned_reads", "failovers")
+
+    def __init__(self):
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.failovers = 0
+
+_replicas: List[Replica] = [Replica(url) for url in DATABASE_READ_URLS]
+_rotation = itertools.count()
+# User -> monotonic time of their last successful write, oldest first
+_last_write: "OrderedDict[str, float]" = OrderedDict()
+_lock = threading.Lock()
+_stats = _Stats()
+
+def _user_key(request: Request) -> Optional[str]:
+    """Token subject of an authenticated request"""
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() != "bearer ":
+        return None
+    try:
+        return verify_token(authorization[7:])
+    except HTTPException:
+        return None
+
+def record_write(user: str) -> None:
+    """Pin the user's reads to the primary for the read-your-writes window"""
+    now = time.monotonic()
+    with _lock:
+        _last_write[user] = now
+        _last_write.move_to_end(user)
+        while _last_write:
+            oldest, written = next(iter(_last_write.items()))
+            if now - written < READ_YOUR_WRITES_SECONDS and len(_last_write) <= READ_YOUR_WRITES_MAX_USERS:
+                break
+            del _last_write[oldest]
+
+def wrote_recently(user: Optional[str]) -> bool:
+    if user is None:
+        return False
+    written = _last_write.get(user)
+    return written is not None and time.monotonic() - written < READ_YOUR_WRITES_SECONDS
+
+async def _pick_replica() -> Optional[Replica]:
+    """Next replica in the rotation that is up, probing any that are due back; None if all are down"""
+    start = next(_rotation)
+    now = time.monotonic()
+    for offset in range(len(_replicas)):
+        replica = _replicas[(start + offset) % len(_replicas)]
+        if now < replica.down_until:
+            continue
+        if replica.verified or await replica.probe():
+            return replica
+    return None
+
+async def _open_replica_session() -> Optional[Tuple[Replica, AsyncSession]]:
+    for _ in range(len(_replicas)):
+        replica = await _pick_replica()
+        if replica is None:
+            return None
+        db = replica.sessionmaker()
+        try:
+            # Check out the connection now, so an unreachable replica fails over within this request
+            await db.connection()
+        except (DBAPIError, OSError) as exc:
+            await db.close()
+            replica.mark_down(exc)
+            continue
+        return replica, db
+    return None
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for a read-only endpoint: a replica if one is up and the user hasn't just written"""
+    opened = None
+    if _replicas:
+        if wrote_recently(_user_key(request)):
+            _stats.pinned_reads += 1
+        else:
+            opened = await _open_replica_session()
+            if opened is None:
+                _stats.failovers += 1
+
+    if opened is None:
+        _stats.primary_reads += 1
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    replica, db = opened
+    replica.reads += 1
+    async with db:
+        try:
+            yield db
+        except DBAPIError as exc:
+            # This request fails; the next ones go elsewhere until the replica is back
+            replica.mark_down(exc)
+            raise
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware recording the user of every successful write request.
+
+    The write is recorded when the response starts, i.e. after the endpoint
+    committed and before the client can send its next request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_recorded(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user = _user_key(Request(scope))
+                if user is not None:
+                    record_write(user)
+            await send(message)
+
+        await self.app(scope, receive, send_recorded)
+
+def replica_stats() -> dict:
+    with _lock:
+        pinned_users = sum(1 for user in _last_write if wrote_recently(user))
+    return {
+        "replicas": [replica.stats() for replica in _replicas],
+        "primary_reads": _stats.primary_reads,
+        "pinned_reads": _stats.pinned_reads,
+        "failovers": _stats.failovers,
+        "pinned_users": pinned_users,
+        "read_your_writes_seconds": READ_YOUR_WRITES_SECONDS,
+    }
+
+def replica_engines() -> List[AsyncEngine]:
+    return [replica.engine for replica in _replicas]
+
+async def dispose_replicas() -> None:
+    for replica in _replicas:
+        await replica.engine.dispose()
+
+def sync_sqlite_replicas(primary_url: str, replica_urls: List[str]) -> Dict[str, float]:
+    """Copy the primary SQLite file over every SQLite replica; seconds taken per replica"""
+    primary = make_url(primary_url)
+    if primary.get_backend_name() != "sqlite":
+        raise ValueError("Only SQLite primaries can be copied; use the database's own replication")
+
+    timings = {}
+    source = sqlite3.connect(primary.database)
+    try:
+        for url in replica_urls:
+            replica = make_url(url)
+            if replica.get_backend_name() != "sqlite":
+                continue
+            start = time.perf_counter()
+            target = sqlite3.connect(replica.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+            timings[replica.database] = time.perf_counter() - start
+    finally:
+        source.close()
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain local SQLite read replicas")
+    parser.add_argument("--sync", action="store_true", help="Copy the primary database over DATABASE_READ_URLS")
+    parser.add_argument("--interval", type=float, help="Keep copying every this many seconds")
+    args = parser.parse_args()
+
+    if not args.sync:
+        parser.print_help()
+        return
+
+    while True:
+        for path, seconds in sync_sqlite_replicas(DATABASE_URL, DATABASE_READ_URLS).items():
+            print(f"Copied primary to {path} in {seconds * 1000:.0f}ms")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
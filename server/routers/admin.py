@@ -1,77 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, update, delete, func, desc, and_, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 from datetime import datetime
+from collections import Counter, defaultdict
 
-from database import get_db
-from models import User, Event, Registration, College, Feedback, EventStatus, RegistrationStatus
+from database import get_async_db
+from read_replicas import get_read_db, replica_stats
+from models import User, Event, Registration, College, Feedback, EventFeedbackStats, EventStatus, RegistrationStatus
 from schemas import (
     Event as EventSchema, EventCreate, EventUpdate, EventResponse,
     User as UserSchema, UserResponse,
     Registration as RegistrationSchema, RegistrationResponse,
+    BulkCheckinRequest, BulkCheckinResponse, CheckinResult,
     DashboardStats, EventReport,
-    Feedback as FeedbackSchema, FeedbackResponse
+    Feedback as FeedbackSchema, FeedbackResponse, FeedbackSummary
 )
-from auth import get_current_admin_user
+from auth import Principal, get_current_admin_user, auth_cache_stats, password_hasher
+from ratelimit import rate_limit_stats, request_limiter
+from college_stats import bump_college_stats, get_college_stats
+from feedback_stats import feedback_summary
+from loaders import EVENT_RESPONSE_OPTIONS, REGISTRATION_RESPONSE_OPTIONS, FEEDBACK_RESPONSE_OPTIONS, USER_RESPONSE_OPTIONS
+from pagination import paginate
+from exports import EXPORT_FORMATS, export_response
+from admission import fill_open_seats
+from event_calendar import EVENT_CALENDAR_ENABLED, calendar_stats, get_calendar, invalidate_calendar
 
 router = APIRouter()
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_admin_dashboard(
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     college_id = current_user.college_id
     
-    # Get statistics for the admin's college
-    total_events = db.query(Event).filter(Event.college_id == college_id).count()
-    total_students = db.query(User).filter(
-        and_(User.college_id == college_id, User.role == "student")
-    ).count()
-    total_registrations = db.query(Registration).join(Event).filter(
-        Event.college_id == college_id
-    ).count()
-    upcoming_events = db.query(Event).filter(
-        and_(
-            Event.college_id == college_id,
-            Event.date >= datetime.utcnow(),
-            Event.status == EventStatus.ACTIVE
-        )
-    ).count()
-    completed_events = db.query(Event).filter(
-        and_(
-            Event.college_id == college_id,
-            Event.status == EventStatus.COMPLETED
+    # Materialized counters: one primary-key read
+    stats = await get_college_stats(db, college_id)
+    
+    # Depends on the current time, so it cannot be materialized; a bisect in the
+    # event calendar, or served by the date index
+    if EVENT_CALENDAR_ENABLED:
+        upcoming_events = (await get_calendar(db, stats)).count_upcoming(datetime.utcnow())
+    else:
+        upcoming_events = await db.scalar(
+            select(func.count(Event.id)).filter(
+                and_(
+                    Event.college_id == college_id,
+                    Event.date >= datetime.utcnow(),
+                    Event.status == EventStatus.ACTIVE
+                )
+            )
         )
-    ).count()
     
     return DashboardStats(
-        total_events=total_events,
-        total_students=total_students,
-        total_registrations=total_registrations,
+        total_events=stats.total_events,
+        total_students=stats.total_students,
+        total_registrations=stats.total_registrations,
         upcoming_events=upcoming_events,
-        completed_events=completed_events
+        completed_events=stats.completed_events
     )
 
 @router.get("/events", response_model=List[EventResponse])
 async def get_admin_events(
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None)
 ):
-    events = db.query(Event).filter(
-        Event.college_id == current_user.college_id
-    ).order_by(desc(Event.created_at)).offset(skip).limit(limit).all()
+    events = await paginate(
+        db,
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+            Event.college_id == current_user.college_id
+        ),
+        (Event.created_at, Event.id), limit,
+        cursor=cursor, skip=skip, descending=True, response=response
+    )
     
     return events
 
 @router.post("/events", response_model=EventResponse)
 async def create_event(
     event: EventCreate,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_event = Event(
         **event.dict(),
@@ -80,24 +95,36 @@ async def create_event(
     )
     
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await bump_college_stats(
+        db, current_user.college_id,
+        events_changed=True,
+        total_events=1,
+        completed_events=int(db_event.status == EventStatus.COMPLETED)
+    )
+    await db.commit()
+    invalidate_calendar(current_user.college_id)
     
-    return db_event
+    return (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+            Event.id == db_event.id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
 
 @router.put("/events/{event_id}", response_model=EventResponse)
 async def update_event(
     event_id: int,
     event_update: EventUpdate,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    event = db.query(Event).filter(
-        and_(
-            Event.id == event_id,
-            Event.college_id == current_user.college_id
+    event = (await db.execute(
+        select(Event).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not event:
         raise HTTPException(
@@ -105,27 +132,47 @@ async def update_event(
             detail="Event not found"
         )
     
+    was_completed = event.status == EventStatus.COMPLETED
+    
     update_data = event_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(event, field, value)
     
-    db.commit()
-    db.refresh(event)
+    # Seats added by a larger capacity go to the waitlist first
+    promoted = 0
+    if "max_attendees" in update_data:
+        await db.flush()
+        promoted = await fill_open_seats(db, event.id)
+    
+    await bump_college_stats(
+        db, current_user.college_id,
+        events_changed=True,
+        completed_events=int(event.status == EventStatus.COMPLETED) - int(was_completed),
+        total_registrations=promoted
+    )
+    await db.commit()
+    invalidate_calendar(current_user.college_id)
     
-    return event
+    return (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+            Event.id == event.id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
 
 @router.delete("/events/{event_id}")
 async def delete_event(
     event_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    event = db.query(Event).filter(
-        and_(
-            Event.id == event_id,
-            Event.college_id == current_user.college_id
+    event = (await db.execute(
+        select(Event).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not event:
         raise HTTPException(
@@ -133,24 +180,51 @@ async def delete_event(
             detail="Event not found"
         )
     
-    db.delete(event)
-    db.commit()
+    registrations_count = await db.scalar(
+        select(func.count(Registration.id)).filter(
+            Registration.event_id == event_id,
+            # Waitlisted rows were never added to the counter
+            Registration.status != RegistrationStatus.WAITLISTED
+        )
+    )
+    
+    await db.execute(
+        delete(EventFeedbackStats).where(
+            EventFeedbackStats.event_id == event_id
+        ).execution_options(synchronize_session=False)
+    )
+    await db.delete(event)
+    await bump_college_stats(
+        db, current_user.college_id,
+        events_changed=True,
+        total_events=-1,
+        total_registrations=-registrations_count,
+        completed_events=-int(event.status == EventStatus.COMPLETED)
+    )
+    await db.commit()
+    invalidate_calendar(current_user.college_id)
     
     return {"message": "Event deleted successfully"}
 
 @router.get("/events/{event_id}/registrations", response_model=List[RegistrationResponse])
 async def get_event_registrations(
     event_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None)
 ):
     # Verify event belongs to admin's college
-    event = db.query(Event).filter(
-        and_(
-            Event.id == event_id,
-            Event.college_id == current_user.college_id
+    event = (await db.execute(
+        select(Event).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not event:
         raise HTTPException(
@@ -158,25 +232,102 @@ async def get_event_registrations(
             detail="Event not found"
         )
     
-    registrations = db.query(Registration).filter(
-        Registration.event_id == event_id
-    ).all()
+    registrations = await paginate(
+        db,
+        select(Registration).options(*REGISTRATION_RESPONSE_OPTIONS).filter(
+            Registration.event_id == event_id
+        ),
+        (Registration.id,), limit,
+        cursor=cursor, skip=skip, response=response
+    )
     
     return registrations
 
+@router.get("/events/{event_id}/registrations/export")
+async def export_event_registrations(
+    event_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db),
+    export_format: str = Query("csv", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$")
+):
+    """Stream every registration of an event as CSV or NDJSON"""
+    # Verify event belongs to admin's college
+    event_found = (await db.execute(
+        select(Event.id).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
+        )
+    )).scalar()
+    
+    if event_found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    query = select(
+        Registration.id.label("registration_id"),
+        Registration.student_id,
+        User.name.label("student_name"),
+        User.email.label("student_email"),
+        User.department,
+        User.year,
+        Registration.status,
+        Registration.registration_date,
+        Registration.check_in_time,
+        Registration.notes
+    ).join(User, Registration.student_id == User.id).filter(
+        Registration.event_id == event_id
+    ).order_by(Registration.id)
+    
+    return export_response(query, export_format, f"event-{event_id}-registrations", bind=db.bind)
+
+@router.get("/events/{event_id}/feedback/summary", response_model=FeedbackSummary)
+async def get_event_feedback_summary(
+    event_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Feedback count, average and 1-5 histogram from the running aggregates"""
+    # Ownership check and aggregates row in one primary-key lookup
+    row = (await db.execute(
+        select(Event.id, EventFeedbackStats).outerjoin(
+            EventFeedbackStats, EventFeedbackStats.event_id == Event.id
+        ).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
+        )
+    )).first()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    return feedback_summary(event_id, row.EventFeedbackStats)
+
 @router.put("/registrations/{registration_id}/checkin")
 async def checkin_student(
     registration_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Get registration and verify it belongs to admin's college
-    registration = db.query(Registration).join(Event).filter(
-        and_(
-            Registration.id == registration_id,
-            Event.college_id == current_user.college_id
+    registration = (await db.execute(
+        select(Registration).join(Event).options(
+            joinedload(Registration.event), joinedload(Registration.student)
+        ).filter(
+            and_(
+                Registration.id == registration_id,
+                Event.college_id == current_user.college_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not registration:
         raise HTTPException(
@@ -190,6 +341,12 @@ async def checkin_student(
             detail="Student already checked in"
         )
     
+    if registration.status == RegistrationStatus.WAITLISTED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Student is on the waitlist and has no seat"
+        )
+    
     # Update registration
     registration.status = RegistrationStatus.ATTENDED
     registration.check_in_time = datetime.utcnow()
@@ -202,81 +359,302 @@ async def checkin_student(
     student = registration.student
     student.events_attended += 1
     
-    db.commit()
+    await bump_college_stats(db, current_user.college_id)
+    await db.commit()
     
     return {"message": "Student checked in successfully"}
 
+@router.post("/events/{event_id}/checkins", response_model=BulkCheckinResponse)
+async def bulk_checkin(
+    event_id: int,
+    checkins: BulkCheckinRequest,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Check in a batch of registrations (by registration or student id) in one transaction.
+    
+    Results are reported per item as checked_in, already_checked_in or not_found.
+    """
+    # Verify event belongs to admin's college
+    event_found = (await db.execute(
+        select(Event.id).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
+        )
+    )).scalar()
+    
+    if event_found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    # Waitlisted students hold no seat, so they are reported as not found
+    requested = and_(
+        Registration.event_id == event_id,
+        Registration.status != RegistrationStatus.WAITLISTED,
+        or_(
+            Registration.id.in_(checkins.registration_ids),
+            Registration.student_id.in_(checkins.student_ids)
+        )
+    )
+    
+    # One conditional UPDATE for the whole batch; RETURNING tells us exactly
+    # which rows this request checked in, even with several scanners at the door
+    checked_in = (await db.execute(
+        update(Registration).where(
+            and_(
+                requested,
+                Registration.status != RegistrationStatus.ATTENDED
+            )
+        ).values(
+            status=RegistrationStatus.ATTENDED,
+            check_in_time=datetime.utcnow()
+        ).returning(
+            Registration.id, Registration.student_id
+        ).execution_options(synchronize_session=False)
+    )).all()
+    
+    if checked_in:
+        await db.execute(
+            update(Event).where(Event.id == event_id).values(
+                attended_count=Event.attended_count + len(checked_in)
+            ).execution_options(synchronize_session=False)
+        )
+    
+        # One UPDATE per distinct increment rather than one per student
+        students_by_increment = defaultdict(list)
+        for student_id, increment in Counter(row.student_id for row in checked_in).items():
+            students_by_increment[increment].append(student_id)
+        for increment, student_ids in students_by_increment.items():
+            await db.execute(
+                update(User).where(User.id.in_(student_ids)).values(
+                    events_attended=User.events_attended + increment
+                ).execution_options(synchronize_session=False)
+            )
+        await bump_college_stats(db, current_user.college_id)
+    
+    # Every matching registration is now checked in, by this request or an earlier one
+    matched = (await db.execute(
+        select(Registration.id, Registration.student_id).filter(requested)
+    )).all()
+    await db.commit()
+    
+    updated_ids = {row.id for row in checked_in}
+    updated_students = {row.student_id for row in checked_in}
+    matched_ids = {row.id for row in matched}
+    matched_students = {row.student_id for row in matched}
+    
+    def outcome(found, updated):
+        if updated:
+            return "checked_in"
+        return "already_checked_in" if found else "not_found"
+    
+    results = [
+        CheckinResult(
+            registration_id=registration_id,
+            status=outcome(registration_id in matched_ids, registration_id in updated_ids)
+        )
+        for registration_id in checkins.registration_ids
+    ] + [
+        CheckinResult(
+            student_id=student_id,
+            status=outcome(student_id in matched_students, student_id in updated_students)
+        )
+        for student_id in checkins.student_ids
+    ]
+    
+    return BulkCheckinResponse(checked_in=len(checked_in), results=results)
+
 @router.get("/students", response_model=List[UserResponse])
 async def get_students(
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None)
 ):
-    students = db.query(User).filter(
-        and_(
-            User.college_id == current_user.college_id,
-            User.role == "student"
-        )
-    ).offset(skip).limit(limit).all()
+    students = await paginate(
+        db,
+        select(User).options(*USER_RESPONSE_OPTIONS).filter(
+            and_(
+                User.college_id == current_user.college_id,
+                User.role == "student"
+            )
+        ),
+        (User.id,), limit,
+        cursor=cursor, skip=skip, response=response
+    )
     
     return students
 
 @router.get("/reports/events", response_model=List[EventReport])
 async def get_event_reports(
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    category: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500)
 ):
-    events = db.query(Event).filter(
+    """Event reports computed with grouped aggregates (constant number of queries per page)"""
+    query = select(Event).filter(
         Event.college_id == current_user.college_id
-    ).all()
+    )
+    
+    if start_date:
+        query = query.filter(Event.date >= start_date)
+    
+    if end_date:
+        query = query.filter(Event.date <= end_date)
+    
+    if category:
+        query = query.filter(Event.category == category)
+    
+    events = (await db.execute(
+        query.order_by(desc(Event.date), desc(Event.id)).offset(skip).limit(limit)
+    )).scalars().all()
+    if not events:
+        return []
+    
+    event_ids = [event.id for event in events]
+    
+    # One GROUP BY pass over registrations for the whole page
+    registration_stats = {
+        row.event_id: row
+        for row in await db.execute(
+            select(
+                Registration.event_id,
+                func.count(Registration.id).label("total_registrations"),
+                func.sum(
+                    case((Registration.status == RegistrationStatus.ATTENDED, 1), else_=0)
+                ).label("total_attendance")
+            ).filter(
+                Registration.event_id.in_(event_ids),
+                Registration.status != RegistrationStatus.WAITLISTED
+            ).group_by(Registration.event_id)
+        )
+    }
+    
+    # Running aggregates: one primary-key read per event, however much feedback it has
+    feedback_stats = {
+        stats.event_id: stats
+        for stats in (await db.execute(
+            select(EventFeedbackStats).filter(
+                EventFeedbackStats.event_id.in_(event_ids)
+            )
+        )).scalars()
+    }
     
     reports = []
     for event in events:
-        registrations_count = db.query(Registration).filter(
-            Registration.event_id == event.id
-        ).count()
-        
-        attendance_count = db.query(Registration).filter(
-            and_(
-                Registration.event_id == event.id,
-                Registration.status == RegistrationStatus.ATTENDED
-            )
-        ).count()
-        
-        avg_rating = db.query(func.avg(Feedback.rating)).filter(
-            Feedback.event_id == event.id
-        ).scalar()
-        
-        feedback_count = db.query(Feedback).filter(
-            Feedback.event_id == event.id
-        ).count()
-        
+        registrations = registration_stats.get(event.id)
+        feedback = feedback_summary(event.id, feedback_stats.get(event.id))
+    
+        registrations_count = registrations.total_registrations if registrations else 0
+        attendance_count = int(registrations.total_attendance or 0) if registrations else 0
+    
         attendance_rate = (attendance_count / registrations_count * 100) if registrations_count > 0 else 0
-        
+    
         reports.append(EventReport(
             event=event,
             total_registrations=registrations_count,
             total_attendance=attendance_count,
             attendance_rate=attendance_rate,
-            avg_rating=float(avg_rating) if avg_rating else None,
-            feedback_count=feedback_count
+            avg_rating=feedback.avg_rating,
+            feedback_count=feedback.feedback_count
         ))
     
     return reports
 
 @router.get("/feedback", response_model=List[FeedbackResponse])
 async def get_all_feedback(
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
-    event_id: Optional[int] = Query(None)
+    response: Response,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_read_db),
+    event_id: Optional[int] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None)
 ):
-    query = db.query(Feedback).join(Event).filter(
+    query = select(Feedback).options(*FEEDBACK_RESPONSE_OPTIONS).join(Event).filter(
         Event.college_id == current_user.college_id
     )
     
     if event_id:
         query = query.filter(Feedback.event_id == event_id)
     
-    feedback = query.order_by(desc(Feedback.created_at)).all()
+    feedback = await paginate(
+        db, query, (Feedback.created_at, Feedback.id), limit,
+        cursor=cursor, skip=skip, descending=True, response=response
+    )
     return feedback
+
+@router.get("/feedback/export")
+async def export_feedback(
+    current_user: Principal = Depends(get_current_admin_user),
+    event_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    export_format: str = Query("csv", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$")
+):
+    """Stream the college's feedback as CSV or NDJSON"""
+    query = select(
+        Feedback.id.label("feedback_id"),
+        Feedback.event_id,
+        Event.title.label("event_title"),
+        Feedback.student_id,
+        User.name.label("student_name"),
+        Feedback.rating,
+        Feedback.comment,
+        Feedback.created_at
+    ).join(Event, Feedback.event_id == Event.id).join(User, Feedback.student_id == User.id).filter(
+        Event.college_id == current_user.college_id
+    )
+    
+    if event_id:
+        query = query.filter(Feedback.event_id == event_id)
+    
+    # The rows stream from the engine this request was routed to
+    return export_response(query.order_by(Feedback.id), export_format, "feedback", bind=db.bind)
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Hit/miss counters for the process-local auth caches"""
+    return auth_cache_stats()
+
+@router.get("/hashing/stats")
+async def get_hashing_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Queue depth and throughput of the password hashing pool"""
+    return password_hasher.stats()
+
+@router.get("/load/stats")
+async def get_load_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Concurrency limiter queue depth and rate limit rejections for this worker"""
+    return {
+        "requests": request_limiter.stats(),
+        "rate_limits": rate_limit_stats()
+    }
+
+@router.get("/calendar/stats")
+async def get_calendar_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Event calendar size and hit counts for this worker"""
+    return calendar_stats()
+
+@router.get("/replicas/stats")
+async def get_replica_stats(
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Read replica health and where this worker's reads went"""
+    return replica_stats()
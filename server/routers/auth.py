@@ -1,18 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
-from database import get_db
-from models import User, College
+from database import get_async_db
+from read_replicas import get_read_db
+from models import User, College, CollegeStats, UserRole
 from schemas import UserCreate, UserLogin, Token, UserResponse, College as CollegeSchema, CollegeCreate
-from auth import verify_password, create_access_token, get_password_hash
+from auth import create_access_token, hash_password, verify_and_update_password
+from college_stats import bump_college_stats
+from loaders import USER_RESPONSE_OPTIONS
+from ratelimit import (
+    AUTH_MAX_CONCURRENT_REQUESTS, AUTH_MAX_QUEUED_REQUESTS, AUTH_RATE_PER_IP, AUTH_RATE_PER_USER,
+    LOAD_SHED_QUEUE_TIMEOUT, ConcurrencyLimiter, RateLimit, concurrency_limit, rate_limit
+)
 
 router = APIRouter()
 
-@router.post("/register", response_model=UserResponse)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+# Strict limits for the bcrypt-heavy routes only: token buckets per IP and
+# email (429 when empty) and a concurrency cap of their own (503 when full).
+# The college lookup the signup page loads stays on the router's API budget.
+credential_limiter = ConcurrencyLimiter(AUTH_MAX_CONCURRENT_REQUESTS, AUTH_MAX_QUEUED_REQUESTS, LOAD_SHED_QUEUE_TIMEOUT)
+credential_limits = [
+    Depends(rate_limit("auth", per_ip=RateLimit.parse(AUTH_RATE_PER_IP), per_user=RateLimit.parse(AUTH_RATE_PER_USER))),
+    Depends(concurrency_limit(credential_limiter)),
+]
+
+@router.post("/register", response_model=UserResponse, dependencies=credential_limits)
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = (await db.execute(select(User).filter(User.email == user.email))).scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -20,7 +37,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if college exists
-    college = db.query(College).filter(College.id == user.college_id).first()
+    college = await db.get(College, user.college_id)
     if not college:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,7 +45,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
@@ -41,16 +58,24 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await bump_college_stats(db, user.college_id, total_students=int(user.role == UserRole.STUDENT))
+    await db.commit()
     
-    return db_user
+    return (await db.execute(
+        select(User).options(*USER_RESPONSE_OPTIONS).filter(
+            User.id == db_user.id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
 
-@router.post("/login", response_model=Token)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+@router.post("/login", response_model=Token, dependencies=credential_limits)
+async def login_user(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).filter(User.email == user_credentials.email))).scalars().first()
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(user_credentials.password, user.password)
     
-    if not user or not verify_password(user_credentials.password, user.password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -63,9 +88,13 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
             detail="Account is deactivated"
         )
     
+    # Transparently upgrade hashes made with a different bcrypt cost
+    if new_hash:
+        user.password = new_hash
+    
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Create access token
     access_token_expires = timedelta(minutes=60 * 24)  # 24 hours
@@ -74,7 +103,11 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
     )
     
     # Load college information
-    user_with_college = db.query(User).filter(User.id == user.id).first()
+    user_with_college = (await db.execute(
+        select(User).options(*USER_RESPONSE_OPTIONS).filter(
+            User.id == user.id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
     
     return {
         "access_token": access_token,
@@ -83,14 +116,16 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
     }
 
 @router.get("/colleges", response_model=list[CollegeSchema])
-async def get_colleges(db: Session = Depends(get_db)):
-    colleges = db.query(College).all()
+async def get_colleges(db: AsyncSession = Depends(get_read_db)):
+    colleges = (await db.execute(select(College))).scalars().all()
     return colleges
 
 @router.post("/colleges", response_model=CollegeSchema)
-async def create_college(college: CollegeCreate, db: Session = Depends(get_db)):
+async def create_college(college: CollegeCreate, db: AsyncSession = Depends(get_async_db)):
     db_college = College(**college.dict())
     db.add(db_college)
-    db.commit()
-    db.refresh(db_college)
+    await db.flush()
+    db.add(CollegeStats(college_id=db_college.id))
+    await db.commit()
+    await db.refresh(db_college)
     return db_college
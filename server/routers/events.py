@@ -1,27 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, and_, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from database import get_db
-from models import Event, EventStatus
+from read_replicas import get_read_db
+from models import Event, EventStatus, Registration, RegistrationStatus
 from schemas import Event as EventSchema, EventResponse
 from auth import get_current_user
+from loaders import EVENT_RESPONSE_OPTIONS
+from pagination import paginate
+from search import apply_search, search_terms
+from etags import conditional_get
+from event_calendar import EVENT_CALENDAR_ENABLED, upcoming_events as calendar_upcoming_events
 
 router = APIRouter()
 
+POPULAR_RANKINGS = ("trending", "count", "velocity")
+
 @router.get("/", response_model=List[EventResponse])
 async def get_all_events(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     category: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None)
 ):
     """Get all events for the user's college"""
-    query = db.query(Event).filter(
+    not_modified = await conditional_get(request, response, db, current_user.college_id)
+    if not_modified:
+        return not_modified
+    
+    query = select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
         Event.college_id == current_user.college_id
     )
     
@@ -31,67 +45,163 @@ async def get_all_events(
     if status_filter:
         query = query.filter(Event.status == status_filter)
     
-    events = query.order_by(desc(Event.date)).offset(skip).limit(limit).all()
+    events = await paginate(
+        db, query, (Event.date, Event.id), limit,
+        cursor=cursor, skip=skip, descending=True, response=response
+    )
     return events
 
 @router.get("/upcoming", response_model=List[EventResponse])
 async def get_upcoming_events(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     limit: int = Query(10, ge=1, le=50)
 ):
     """Get upcoming events for the user's college"""
-    events = db.query(Event).filter(
-        and_(
-            Event.college_id == current_user.college_id,
-            Event.date >= datetime.utcnow(),
-            Event.status == EventStatus.ACTIVE
-        )
-    ).order_by(Event.date).limit(limit).all()
+    # Events drop off the list as they start, so the tag also rolls over every
+    # minute; filtering on the start of the minute keeps one body per tag
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    not_modified = await conditional_get(request, response, db, current_user.college_id, now.strftime("%Y%m%d%H%M"))
+    if not_modified:
+        return not_modified
+    
+    if EVENT_CALENDAR_ENABLED:
+        return await calendar_upcoming_events(db, current_user.college_id, now, limit)
+    
+    events = (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+            and_(
+                Event.college_id == current_user.college_id,
+                Event.date >= now,
+                Event.status == EventStatus.ACTIVE
+            )
+        ).order_by(Event.date, Event.id).limit(limit)
+    )).scalars().all()
     
     return events
 
 @router.get("/popular", response_model=List[EventResponse])
 async def get_popular_events(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    limit: int = Query(10, ge=1, le=50)
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(10, ge=1, le=50),
+    rank: str = Query("trending", pattern=f"^({'|'.join(POPULAR_RANKINGS)})$"),
+    hours: int = Query(24, ge=1, le=24 * 30)
 ):
-    """Get most popular events (by registration count) for the user's college"""
-    events = db.query(Event).filter(
-        and_(
-            Event.college_id == current_user.college_id,
-            Event.status == EventStatus.ACTIVE
-        )
-    ).order_by(desc(Event.registered_count)).limit(limit).all()
+    """Get most popular events for the user's college.
+    
+    rank=trending orders by time-decayed sign-ups, rank=count by seats taken
+    and rank=velocity by sign-ups in the last `hours` hours.
+    """
+    parts = [rank]
+    if rank == "velocity":
+        # The window slides without any write, so the tag rolls over every minute like /upcoming
+        now = datetime.utcnow().replace(second=0, microsecond=0)
+        parts += [hours, now.strftime("%Y%m%d%H%M")]
+    not_modified = await conditional_get(request, response, db, current_user.college_id, *parts)
+    if not_modified:
+        return not_modified
+    
+    active = and_(
+        Event.college_id == current_user.college_id,
+        Event.status == EventStatus.ACTIVE
+    )
+    
+    if rank == "velocity":
+        sign_ups = func.count(Registration.id)
+        top = (await db.execute(
+            select(Registration.event_id).join(Event, Registration.event_id == Event.id).filter(
+                and_(
+                    active,
+                    Registration.registration_date >= now - timedelta(hours=hours),
+                    Registration.status != RegistrationStatus.CANCELLED
+                )
+            ).group_by(Registration.event_id).order_by(desc(sign_ups), desc(Registration.event_id)).limit(limit)
+        )).scalars().all()
+        events = {
+            event.id: event
+            for event in (await db.execute(
+                select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(Event.id.in_(top))
+            )).scalars()
+        }
+        return [events[event_id] for event_id in top]
+    
+    order = (Event.trending_score if rank == "trending" else Event.registered_count, Event.id)
+    events = (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(active).order_by(*map(desc, order)).limit(limit)
+    )).scalars().all()
     
     return events
 
 @router.get("/categories")
 async def get_event_categories(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all event categories used in the user's college"""
-    categories = db.query(Event.category).filter(
-        Event.college_id == current_user.college_id
-    ).distinct().all()
+    not_modified = await conditional_get(request, response, db, current_user.college_id)
+    if not_modified:
+        return not_modified
+    
+    categories = (await db.execute(
+        select(Event.category).filter(
+            Event.college_id == current_user.college_id
+        ).distinct()
+    )).all()
     
     return [category[0] for category in categories]
 
+@router.get("/search", response_model=List[EventResponse])
+async def search_events(
+    q: str = Query(..., min_length=1, max_length=200),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    category: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search events in the user's college by title, description, location and tags, best matches first"""
+    if not search_terms(q):
+        return []
+    
+    query = select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+        Event.college_id == current_user.college_id
+    )
+    
+    if category:
+        query = query.filter(Event.category == category)
+    
+    if status_filter:
+        query = query.filter(Event.status == status_filter)
+    
+    events = (await db.execute(
+        apply_search(query, q, db.bind.dialect.name).offset(skip).limit(limit)
+    )).scalars().all()
+    
+    return events
+
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event_by_id(
     event_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific event by ID"""
-    event = db.query(Event).filter(
-        and_(
-            Event.id == event_id,
-            Event.college_id == current_user.college_id
+    event = (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not event:
         raise HTTPException(
@@ -1,37 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, update, and_, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
+from database import get_async_db
+from read_replicas import get_read_db
 from models import User, Event, Registration, Feedback, EventStatus, RegistrationStatus
 from schemas import (
     Event as EventSchema, EventResponse,
-    Registration as RegistrationSchema, RegistrationCreate, RegistrationResponse,
+    Registration as RegistrationSchema, RegistrationCreate, RegistrationResponse, WaitlistStatus,
     Feedback as FeedbackSchema, FeedbackCreate, FeedbackResponse,
     UserResponse
 )
-from auth import get_current_student_user
+from auth import Principal, get_current_student_user
+from college_stats import bump_college_stats
+from trending import bump_trending
+from feedback_stats import record_feedback
+from loaders import EVENT_RESPONSE_OPTIONS, REGISTRATION_RESPONSE_OPTIONS, FEEDBACK_RESPONSE_OPTIONS, USER_RESPONSE_OPTIONS
+from pagination import paginate
+from admission import ADMISSION_QUEUE_ENABLED, WAITLIST_POLL_SECONDS, admit, register_one, promote_next, waitlist_position
+from event_calendar import EVENT_CALENDAR_ENABLED, available_events as calendar_available_events
 
 router = APIRouter()
 
 @router.get("/profile", response_model=UserResponse)
 async def get_student_profile(
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    return current_user
+    return (await db.execute(
+        select(User).options(*USER_RESPONSE_OPTIONS).filter(User.id == current_user.id)
+    )).scalars().first()
 
 @router.get("/events", response_model=List[EventResponse])
 async def get_available_events(
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_read_db),
     category: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None)
 ):
-    query = db.query(Event).filter(
+    if EVENT_CALENDAR_ENABLED:
+        return await calendar_available_events(
+            db, current_user.college_id, limit,
+            category=category, cursor=cursor, skip=skip, response=response
+        )
+    
+    query = select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
         and_(
             Event.college_id == current_user.college_id,
             Event.status == EventStatus.ACTIVE,
@@ -43,24 +62,30 @@ async def get_available_events(
     if category:
         query = query.filter(Event.category == category)
     
-    events = query.order_by(Event.date).offset(skip).limit(limit).all()
+    events = await paginate(
+        db, query, (Event.date, Event.id), limit,
+        cursor=cursor, skip=skip, response=response
+    )
     return events
 
 @router.post("/events/{event_id}/register", response_model=RegistrationResponse)
 async def register_for_event(
     event_id: int,
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if event exists and belongs to same college
-    event = db.query(Event).filter(
-        and_(
-            Event.id == event_id,
-            Event.college_id == current_user.college_id,
-            Event.status == EventStatus.ACTIVE,
-            Event.is_registration_open == True
+    event = (await db.execute(
+        select(Event).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id,
+                Event.status == EventStatus.ACTIVE,
+                Event.is_registration_open == True
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not event:
         raise HTTPException(
@@ -68,8 +93,8 @@ async def register_for_event(
             detail="Event not found or registration closed"
         )
     
-    # Check if event is full
-    if event.registered_count >= event.max_attendees:
+    # Check if event is full; with the admission queue on, a full event waitlists the student instead
+    if event.registered_count >= event.max_attendees and not ADMISSION_QUEUE_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Event is full"
@@ -83,49 +108,60 @@ async def register_for_event(
         )
     
     # Check if already registered
-    existing_registration = db.query(Registration).filter(
-        and_(
-            Registration.student_id == current_user.id,
-            Registration.event_id == event_id,
-            Registration.status.in_([RegistrationStatus.REGISTERED, RegistrationStatus.ATTENDED])
+    existing_registration = (await db.execute(
+        select(Registration).filter(
+            and_(
+                Registration.student_id == current_user.id,
+                Registration.event_id == event_id,
+                Registration.status.in_([
+                    RegistrationStatus.REGISTERED, RegistrationStatus.ATTENDED, RegistrationStatus.WAITLISTED
+                ])
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if existing_registration:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already registered for this event"
+            detail="Already on the waitlist for this event"
+            if existing_registration.status == RegistrationStatus.WAITLISTED
+            else "Already registered for this event"
         )
     
-    # Create registration
-    registration = Registration(
-        student_id=current_user.id,
-        event_id=event_id,
-        status=RegistrationStatus.REGISTERED
-    )
-    
-    # Update event registered count
-    event.registered_count += 1
+    if ADMISSION_QUEUE_ENABLED:
+        # End this read transaction: the admission batch commits on its own connection
+        await db.rollback()
+        registration_id = await admit(event_id, current_user.college_id, current_user.id)
+    else:
+        registration_id = await register_one(db, event_id, event.college_id, current_user.id)
     
-    db.add(registration)
-    db.commit()
-    db.refresh(registration)
+    registration = (await db.execute(
+        select(Registration).options(*REGISTRATION_RESPONSE_OPTIONS).filter(
+            Registration.id == registration_id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
     
-    return registration
+    result = RegistrationResponse.model_validate(registration)
+    if registration.status == RegistrationStatus.WAITLISTED:
+        result.waitlist_position = await waitlist_position(db, registration)
+        response.headers["Retry-After"] = str(WAITLIST_POLL_SECONDS)
+    return result
 
 @router.delete("/events/{event_id}/register")
 async def cancel_registration(
     event_id: int,
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    registration = db.query(Registration).filter(
-        and_(
-            Registration.student_id == current_user.id,
-            Registration.event_id == event_id,
-            Registration.status == RegistrationStatus.REGISTERED
+    registration = (await db.execute(
+        select(Registration).options(joinedload(Registration.event)).filter(
+            and_(
+                Registration.student_id == current_user.id,
+                Registration.event_id == event_id,
+                Registration.status.in_([RegistrationStatus.REGISTERED, RegistrationStatus.WAITLISTED])
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not registration:
         raise HTTPException(
@@ -141,45 +177,125 @@ async def cancel_registration(
             detail="Cannot cancel registration for past events"
         )
     
-    # Cancel registration
-    registration.status = RegistrationStatus.CANCELLED
-    event.registered_count -= 1
+    # Cancel registration; the status guard makes a repeated cancel a no-op
+    cancelled = await db.execute(
+        update(Registration).where(
+            and_(
+                Registration.id == registration.id,
+                Registration.status == registration.status
+            )
+        ).values(
+            status=RegistrationStatus.CANCELLED,
+            waitlist_ticket=None
+        ).execution_options(synchronize_session=False)
+    )
+    
+    if cancelled.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Registration not found"
+        )
+    
+    # A freed seat goes to the head of the waitlist; only release it if nobody is waiting
+    promoted = None
+    if registration.status == RegistrationStatus.REGISTERED:
+        promoted = await promote_next(db, event.id)
+        if promoted is None:
+            await db.execute(
+                update(Event).where(
+                    and_(
+                        Event.id == event.id,
+                        Event.registered_count > 0
+                    )
+                ).values(
+                    registered_count=Event.registered_count - 1
+                ).execution_options(synchronize_session=False)
+            )
     
-    db.commit()
+    # Waitlisted students only count as registrations once promoted
+    await bump_college_stats(db, event.college_id, total_registrations=int(promoted is not None))
+    await bump_trending(db, event.id, removed=[registration.registration_date])
+    await db.commit()
     
     return {"message": "Registration cancelled successfully"}
 
+@router.get("/events/{event_id}/waitlist", response_model=WaitlistStatus)
+async def get_waitlist_status(
+    event_id: int,
+    response: Response,
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Read-only, so waitlisted clients can poll this instead of retrying registration
+    registration = (await db.execute(
+        select(Registration).filter(
+            and_(
+                Registration.student_id == current_user.id,
+                Registration.event_id == event_id,
+                Registration.status.in_([RegistrationStatus.WAITLISTED, RegistrationStatus.REGISTERED])
+            )
+        )
+    )).scalars().first()
+    
+    if not registration:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not registered or waitlisted for this event"
+        )
+    
+    position = None
+    if registration.status == RegistrationStatus.WAITLISTED:
+        position = await waitlist_position(db, registration)
+        response.headers["Retry-After"] = str(WAITLIST_POLL_SECONDS)
+    
+    return WaitlistStatus(
+        registration_id=registration.id,
+        event_id=event_id,
+        status=registration.status,
+        position=position
+    )
+
 @router.get("/registrations", response_model=List[RegistrationResponse])
 async def get_my_registrations(
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db),
-    status_filter: Optional[str] = Query(None)
+    response: Response,
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_read_db),
+    status_filter: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None)
 ):
-    query = db.query(Registration).filter(
+    query = select(Registration).options(*REGISTRATION_RESPONSE_OPTIONS).filter(
         Registration.student_id == current_user.id
     )
     
     if status_filter:
         query = query.filter(Registration.status == status_filter)
     
-    registrations = query.order_by(desc(Registration.created_at)).all()
+    registrations = await paginate(
+        db, query, (Registration.created_at, Registration.id), limit,
+        cursor=cursor, skip=skip, descending=True, response=response
+    )
     return registrations
 
 @router.post("/events/{event_id}/feedback", response_model=FeedbackResponse)
 async def submit_feedback(
     event_id: int,
     feedback: FeedbackCreate,
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if student attended the event
-    registration = db.query(Registration).filter(
-        and_(
-            Registration.student_id == current_user.id,
-            Registration.event_id == event_id,
-            Registration.status == RegistrationStatus.ATTENDED
+    registration = (await db.execute(
+        select(Registration).filter(
+            and_(
+                Registration.student_id == current_user.id,
+                Registration.event_id == event_id,
+                Registration.status == RegistrationStatus.ATTENDED
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not registration:
         raise HTTPException(
@@ -188,12 +304,14 @@ async def submit_feedback(
         )
     
     # Check if feedback already exists
-    existing_feedback = db.query(Feedback).filter(
-        and_(
-            Feedback.student_id == current_user.id,
-            Feedback.event_id == event_id
+    existing_feedback = (await db.execute(
+        select(Feedback).filter(
+            and_(
+                Feedback.student_id == current_user.id,
+                Feedback.event_id == event_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if existing_feedback:
         raise HTTPException(
@@ -210,23 +328,29 @@ async def submit_feedback(
     )
     
     db.add(db_feedback)
-    db.commit()
-    db.refresh(db_feedback)
+    await record_feedback(db, event_id, feedback.rating)
+    await db.commit()
     
-    return db_feedback
+    return (await db.execute(
+        select(Feedback).options(*FEEDBACK_RESPONSE_OPTIONS).filter(
+            Feedback.id == db_feedback.id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
 
 @router.get("/events/{event_id}", response_model=EventResponse)
 async def get_event_details(
     event_id: int,
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    event = db.query(Event).filter(
-        and_(
-            Event.id == event_id,
-            Event.college_id == current_user.college_id
+    event = (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).filter(
+            and_(
+                Event.id == event_id,
+                Event.college_id == current_user.college_id
+            )
         )
-    ).first()
+    )).scalars().first()
     
     if not event:
         raise HTTPException(
@@ -238,15 +362,17 @@ async def get_event_details(
 
 @router.get("/events/history", response_model=List[EventResponse])
 async def get_attended_events(
-    current_user: User = Depends(get_current_student_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_student_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    events = db.query(Event).join(Registration).filter(
-        and_(
-            Registration.student_id == current_user.id,
-            Registration.status == RegistrationStatus.ATTENDED,
-            Event.college_id == current_user.college_id
-        )
-    ).order_by(desc(Event.date)).all()
+    events = (await db.execute(
+        select(Event).options(*EVENT_RESPONSE_OPTIONS).join(Registration).filter(
+            and_(
+                Registration.student_id == current_user.id,
+                Registration.status == RegistrationStatus.ATTENDED,
+                Event.college_id == current_user.college_id
+            )
+        ).order_by(desc(Event.date))
+    )).scalars().all()
     
     return events
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 from datetime import datetime
 from models import UserRole, EventStatus, EventCategory, RegistrationStatus
 
@@ -133,6 +133,40 @@ class Registration(RegistrationBase):
 class RegistrationResponse(Registration):
     student: Optional[User] = None
     event: Optional[Event] = None
+    # Place in the event's waitlist, set when registering puts the student on it
+    waitlist_position: Optional[int] = None
+
+class WaitlistStatus(BaseModel):
+    registration_id: int
+    event_id: int
+    status: RegistrationStatus
+    # 1-based while waitlisted, None once promoted to a seat
+    position: Optional[int] = None
+
+# Check-in schemas
+MAX_CHECKIN_BATCH = 1000
+
+class BulkCheckinRequest(BaseModel):
+    registration_ids: List[int] = []
+    student_ids: List[int] = []
+    
+    @validator('student_ids', always=True)
+    def validate_batch_size(cls, v, values):
+        total = len(v) + len(values.get('registration_ids', []))
+        if total == 0:
+            raise ValueError('Provide registration_ids or student_ids')
+        if total > MAX_CHECKIN_BATCH:
+            raise ValueError(f'At most {MAX_CHECKIN_BATCH} check-ins per request')
+        return v
+
+class CheckinResult(BaseModel):
+    registration_id: Optional[int] = None
+    student_id: Optional[int] = None
+    status: str
+
+class BulkCheckinResponse(BaseModel):
+    checked_in: int
+    results: List[CheckinResult]
 
 # Feedback schemas
 class FeedbackBase(BaseModel):
@@ -161,6 +195,13 @@ class FeedbackResponse(Feedback):
     student: Optional[User] = None
     event: Optional[Event] = None
 
+class FeedbackSummary(BaseModel):
+    event_id: int
+    feedback_count: int
+    avg_rating: Optional[float] = None
+    # Number of ratings of each value, keyed 1-5
+    rating_histogram: Dict[int, int]
+
 # Token schemas
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,110 @@
+import re
+from typing import List
+
+from sqlalchemy import column, desc, func, literal_column, or_, table
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+
+from models import Event
+
+# Search index over Event.title, description, location and tags.
+#
+# SQLite: an external-content FTS5 table over `events`, kept in sync by
+# triggers. The update trigger only fires when an indexed column changes,
+# so seat and attendance counters never touch the index.
+#
+# PostgreSQL: a GIN index on a weighted tsvector expression. The query
+# below must use exactly the same expression for the index to be used.
+FTS_TABLE = "events_fts"
+
+SQLITE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, location, tags,
+        content='events', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON events BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location, tags)
+        VALUES (new.id, new.title, new.description, new.location, new.tags);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON events BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.location, old.tags);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, location, tags ON events BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, location, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.location, old.tags);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, location, tags)
+        VALUES (new.id, new.title, new.description, new.location, new.tags);
+    END""",
+]
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(events.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(events.description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(events.location, '') || ' ' || coalesce(events.tags, '')), 'C')"
+)
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_events_search ON events USING GIN (({SEARCH_VECTOR_SQL}))",
+]
+
+# bm25 column weights, in FTS column order: title, description, location, tags
+FTS_WEIGHTS = (10.0, 4.0, 2.0, 2.0)
+
+_fts = table(FTS_TABLE, column("rowid"))
+
+def create_search_index(bind: Engine) -> None:
+    """Create the search index if missing and backfill it from existing events.
+
+    Idempotent; run after create_all so databases that predate the index
+    pick it up. Migration 0004 does the same for alembic-managed databases.
+    """
+    dialect = bind.dialect.name
+    with bind.begin() as conn:
+        if dialect == "sqlite":
+            existed = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+            ).first() is not None
+            for statement in SQLITE_SEARCH_DDL:
+                conn.exec_driver_sql(statement)
+            if not existed:
+                conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif dialect == "postgresql":
+            for statement in POSTGRES_SEARCH_DDL:
+                conn.exec_driver_sql(statement)
+
+def search_terms(q: str) -> List[str]:
+    """Words in the query, stripped of search-syntax characters"""
+    return re.findall(r"\w+", q.lower())
+
+def _fts_match(terms: List[str]) -> str:
+    # Every term must match; the last one as a prefix so results appear while typing
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def apply_search(query: Select, q: str, dialect_name: str) -> Select:
+    """Restrict an Event query to rows matching `q`, best matches first.
+
+    `q` must contain at least one search term (see search_terms).
+    """
+    terms = search_terms(q)
+
+    if dialect_name == "sqlite":
+        rank = func.bm25(literal_column(FTS_TABLE), *FTS_WEIGHTS)
+        return query.join(_fts, _fts.c.rowid == Event.id).filter(
+            literal_column(FTS_TABLE).op("MATCH")(_fts_match(terms))
+        ).order_by(rank, Event.id)
+
+    if dialect_name == "postgresql":
+        vector = literal_column(SEARCH_VECTOR_SQL)
+        tsquery = func.to_tsquery("english", " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+        return query.filter(vector.op("@@")(tsquery)).order_by(
+            desc(func.ts_rank(vector, tsquery)), Event.id
+        )
+
+    # Other databases: unranked substring match on every term
+    columns = (Event.title, Event.description, Event.location, Event.tags)
+    for term in terms:
+        query = query.filter(or_(*[col.ilike(f"%{term}%") for col in columns]))
+    return query.order_by(desc(Event.date), Event.id)
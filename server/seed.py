@@ -1,4 +1,9 @@
+import argparse
 import asyncio
+import random
+import time
+from collections import Counter
+from sqlalchemy import bindparam, column, select, table
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import sys
@@ -8,12 +13,19 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 from database import SessionLocal, engine
-from models import Base, College, User, Event, UserRole, EventCategory, EventStatus
+from models import (
+    Base, College, User, Event, Registration, Feedback,
+    UserRole, EventCategory, EventStatus, RegistrationStatus
+)
 from auth import get_password_hash
+from college_stats import rebuild_college_stats
+from trending import rebuild_trending_scores
+from feedback_stats import rebuild_feedback_stats
+from migrate import migrate
 
 def create_tables():
-    """Create database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create database tables (the migrate step: stamped at head, so later migrations apply)"""
+    migrate()
 
 def seed_database():
     """Seed the database with initial data"""
@@ -210,8 +222,312 @@ def seed_database():
     finally:
         db.close()
 
+# Synthetic data for capacity testing (--scale)
+
+SCALE_PASSWORD = "student123"
+SCALE_DEPARTMENTS = [
+    "Computer Science", "Engineering", "Business Administration", "Economics", "Physics",
+    "Mathematics", "Biology", "Chemistry", "Psychology", "Design", "Law", "Medicine"
+]
+SCALE_YEARS = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
+SCALE_TOPICS = [
+    "AI", "Robotics", "Startup", "Jazz", "Poetry", "Football", "Cricket", "Cloud", "Security",
+    "Data Science", "Climate", "Photography", "Film", "Debate", "Chess", "Yoga", "Finance", "Design"
+]
+SCALE_FORMATS = ["Workshop", "Meetup", "Seminar", "Night", "Championship", "Fair", "Bootcamp", "Talk", "Festival"]
+SCALE_VENUES = ["Main Auditorium", "Library Hall", "Sports Complex", "Lab", "Student Center", "Lecture Theatre"]
+SCALE_CAPACITIES = [30, 50, 100, 200, 500, 1000, 2000, 5000]
+# Categories and ratings are skewed the way real campuses are
+SCALE_CATEGORY_WEIGHTS = {
+    EventCategory.TECHNOLOGY: 20, EventCategory.CAREER: 12, EventCategory.CULTURAL: 15,
+    EventCategory.SPORTS: 15, EventCategory.ACADEMIC: 12, EventCategory.WORKSHOP: 12,
+    EventCategory.SEMINAR: 9, EventCategory.OTHER: 5,
+}
+SCALE_COMMENTS = {
+    1: ["Poorly organized.", "Not what was advertised."],
+    2: ["Started late and ran over.", "Too crowded to follow."],
+    3: ["Decent, but could be shorter.", "Okay overall."],
+    4: ["Good speakers, learned a lot.", "Well run, would attend again."],
+    5: ["Excellent, the best event this term!", "Amazing energy, loved it."],
+}
+
+def _split(total: int, parts: int) -> list:
+    """Split `total` into `parts` near-equal integers"""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+def _insert_batches(conn, table, rows, batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        conn.execute(table.insert(), rows[start:start + batch_size])
+
+def _bulk_table(model, *names):
+    """Untyped view of a model's table for the bulk inserts.
+    
+    Skips per-value bind processing, which is most of Core's per-row cost,
+    so rows must already hold database values: enum names and timestamps
+    formatted by _db_time.
+    """
+    return table(model.__tablename__, *[column(name) for name in names])
+
+def _db_time(value: datetime) -> str:
+    return value.isoformat(" ", "microseconds")
+
+def _registration_counts(rng: random.Random, num_events: int, total: int, max_per_event: int) -> list:
+    """Registrations per event: heavy-tailed popularity, summing to `total` where `max_per_event` allows"""
+    weights = [rng.paretovariate(1.2) for _ in range(num_events)]
+    counts = [0] * num_events
+    remaining = min(total, num_events * max_per_event)
+    open_events = set(range(num_events))
+    # Hand out what is left in proportion to popularity, capping events at
+    # `max_per_event`, until everything is placed
+    while remaining > 0 and open_events:
+        weight_sum = sum(weights[i] for i in open_events)
+        placed = 0
+        for i in sorted(open_events):
+            share = min(max(1, round(remaining * weights[i] / weight_sum)), max_per_event - counts[i], remaining - placed)
+            counts[i] += share
+            placed += share
+            if counts[i] >= max_per_event:
+                open_events.discard(i)
+            if placed >= remaining:
+                break
+        remaining -= placed
+    return counts
+
+def _seed_scale_college(conn, rng, index, num_students, num_events, num_registrations, feedback_rate,
+                        password_hash, anchor, batch_size) -> dict:
+    domain = f"college{index}.scale.edu"
+    college_id = conn.execute(College.__table__.insert().values(
+        name=f"Scale College {index}",
+        address=f"{index} University Avenue",
+        email=f"info@{domain}",
+        website=f"https://{domain}"
+    )).inserted_primary_key[0]
+    
+    admin_id = conn.execute(User.__table__.insert().values(
+        name=f"Scale Admin {index}",
+        email=f"admin@{domain}",
+        password=password_hash,
+        role=UserRole.ADMIN,
+        department="Administration",
+        college_id=college_id,
+        is_active=True,
+        events_attended=0
+    )).inserted_primary_key[0]
+    
+    _insert_batches(conn, User.__table__, [
+        {
+            "name": f"Student {i} ({index})",
+            "email": f"student{i}@{domain}",
+            "password": password_hash,
+            "role": UserRole.STUDENT,
+            "department": rng.choice(SCALE_DEPARTMENTS),
+            "year": rng.choice(SCALE_YEARS),
+            "college_id": college_id,
+            "is_active": True,
+            "events_attended": 0,
+        }
+        for i in range(num_students)
+    ], batch_size)
+    student_ids = conn.execute(
+        select(User.id).where(User.college_id == college_id, User.role == UserRole.STUDENT).order_by(User.id)
+    ).scalars().all()
+    
+    # Events from six months ago to three months ahead; past ones are completed
+    categories = list(SCALE_CATEGORY_WEIGHTS)
+    category_weights = list(SCALE_CATEGORY_WEIGHTS.values())
+    schedule = []
+    for i in range(num_events):
+        date = anchor + timedelta(days=rng.randint(-180, 90), hours=rng.randint(8, 20))
+        roll = rng.random()
+        if roll < 0.05:
+            status = EventStatus.CANCELLED
+        elif date < anchor:
+            status = EventStatus.COMPLETED
+        elif roll < 0.07:
+            status = EventStatus.DRAFT
+        else:
+            status = EventStatus.ACTIVE
+        schedule.append((date, status))
+    # Drafts are not open for registration, so the rest share the total
+    published = [i for i, (_, status) in enumerate(schedule) if status != EventStatus.DRAFT]
+    counts = [0] * num_events
+    for i, count in zip(published, _registration_counts(
+        rng, len(published), num_registrations, min(len(student_ids), SCALE_CAPACITIES[-1])
+    )):
+        counts[i] = count
+    
+    plans = []
+    events = []
+    for i, ((date, status), count) in enumerate(zip(schedule, counts)):
+        past = date < anchor
+        registrations = []
+        for student in rng.sample(range(len(student_ids)), count):
+            if status == EventStatus.CANCELLED or rng.random() < 0.05:
+                registration_status = RegistrationStatus.CANCELLED
+            elif past and rng.random() < 0.75:
+                registration_status = RegistrationStatus.ATTENDED
+            else:
+                registration_status = RegistrationStatus.REGISTERED
+            registrations.append((student, registration_status))
+        registered = sum(1 for _, s in registrations if s != RegistrationStatus.CANCELLED)
+        attended = sum(1 for _, s in registrations if s == RegistrationStatus.ATTENDED)
+    
+        # Popular events often sell out; the rest get the next standard room size
+        capacity = next((size for size in SCALE_CAPACITIES if size >= registered), registered)
+        if registered >= 30 and rng.random() < 0.3:
+            capacity = registered
+    
+        topic = rng.choice(SCALE_TOPICS)
+        plans.append((date, registrations))
+        events.append({
+            "title": f"{topic} {rng.choice(SCALE_FORMATS)} #{i}",
+            "description": f"A {topic.lower()} event for students of every department at Scale College {index}.",
+            "date": date,
+            "time": date.strftime("%I:%M %p"),
+            "location": rng.choice(SCALE_VENUES),
+            "category": rng.choices(categories, category_weights)[0],
+            "max_attendees": capacity,
+            "registered_count": registered,
+            "attended_count": attended,
+            "status": status,
+            "tags": ",".join(rng.sample(SCALE_TOPICS, 2)).lower(),
+            "is_registration_open": status == EventStatus.ACTIVE,
+            "registration_deadline": date - timedelta(days=1),
+            "organizer_id": admin_id,
+            "college_id": college_id,
+        })
+    _insert_batches(conn, Event.__table__, events, batch_size)
+    event_ids = conn.execute(
+        select(Event.id).where(Event.college_id == college_id).order_by(Event.id)
+    ).scalars().all()
+    
+    # Registrations and feedback, flushed in batches so memory stays flat
+    registrations_table = _bulk_table(
+        Registration, "student_id", "event_id", "status", "registration_date", "created_at", "check_in_time"
+    )
+    feedback_table = _bulk_table(Feedback, "student_id", "event_id", "rating", "comment", "created_at")
+    pending = {registrations_table: [], feedback_table: []}
+    totals = Counter()
+    attended_per_student = Counter()
+    
+    def flush(min_rows):
+        for table, rows in pending.items():
+            if rows and len(rows) >= min_rows:
+                conn.execute(table.insert(), rows)
+                totals[table.name] += len(rows)
+                rows.clear()
+    
+    for event_id, (date, registrations) in zip(event_ids, plans):
+        quality = rng.gauss(4.0, 0.6)
+        for student, registration_status in registrations:
+            # Signed up one to thirty days before the event, or before today for
+            # upcoming ones (rng.random() is much cheaper than randint)
+            registered_at = _db_time(min(date, anchor) - timedelta(minutes=1440 + int(rng.random() * 41760)))
+            attended = registration_status == RegistrationStatus.ATTENDED
+            pending[registrations_table].append({
+                "student_id": student_ids[student],
+                "event_id": event_id,
+                "status": registration_status.name,
+                "registration_date": registered_at,
+                "created_at": registered_at,
+                "check_in_time": _db_time(date + timedelta(minutes=int(rng.random() * 45) - 15)) if attended else None,
+            })
+            if not attended:
+                continue
+            attended_per_student[student_ids[student]] += 1
+            if rng.random() < feedback_rate:
+                rating = min(5, max(1, round(rng.gauss(quality, 0.9))))
+                pending[feedback_table].append({
+                    "student_id": student_ids[student],
+                    "event_id": event_id,
+                    "rating": rating,
+                    "comment": rng.choice(SCALE_COMMENTS[rating]) if rng.random() < 0.4 else None,
+                    "created_at": _db_time(min(date + timedelta(minutes=120 + int(rng.random() * 4200)), anchor)),
+                })
+        flush(batch_size)
+    flush(1)
+    
+    set_attended = User.__table__.update().where(
+        User.__table__.c.id == bindparam("user_id")
+    ).values(events_attended=bindparam("attended"))
+    attended_rows = [{"user_id": user_id, "attended": count} for user_id, count in attended_per_student.items()]
+    for start in range(0, len(attended_rows), batch_size):
+        conn.execute(set_attended, attended_rows[start:start + batch_size])
+    
+    return {"college_id": college_id, "students": len(student_ids), "events": len(event_ids), **totals}
+
+def seed_scale(colleges: int, students: int, events: int, registrations: int, feedback_rate: float,
+               seed: int, batch_size: int) -> None:
+    """Bulk-load a large synthetic dataset for capacity testing.
+    
+    Totals are split evenly across colleges. The same seed generates the
+    same rows; dates are relative to midnight UTC of the day it runs, so
+    upcoming/past splits look the same whenever it runs. Every account
+    uses the password SCALE_PASSWORD, hashed once.
+    """
+    with engine.connect() as conn:
+        if conn.execute(select(User.id).where(User.email == "admin@college1.scale.edu")).first():
+            print("Scale data already present; point DATABASE_URL at an empty database to generate it again.")
+            return
+    
+    rng = random.Random(seed)
+    anchor = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = get_password_hash(SCALE_PASSWORD)
+    started = time.perf_counter()
+    college_ids = []
+    totals = Counter()
+    
+    for index, (num_students, num_events, num_registrations) in enumerate(zip(
+        _split(students, colleges), _split(events, colleges), _split(registrations, colleges)
+    ), start=1):
+        college_started = time.perf_counter()
+        # One transaction per college: far faster on SQLite than autocommitted batches
+        with engine.begin() as conn:
+            result = _seed_scale_college(
+                conn, rng, index, num_students, num_events, num_registrations,
+                feedback_rate, password_hash, anchor, batch_size
+            )
+        college_ids.append(result["college_id"])
+        totals.update({key: value for key, value in result.items() if key != "college_id"})
+        print(f"Scale College {index}: {result['students']:,} students, {result['events']:,} events, "
+              f"{result['registrations']:,} registrations, {result['feedback']:,} feedback "
+              f"in {time.perf_counter() - college_started:.1f}s")
+    
+    db = SessionLocal()
+    try:
+        rebuild_college_stats(db, college_ids)
+        rebuild_trending_scores(db, college_ids)
+        rebuild_feedback_stats(db, college_ids)
+        db.commit()
+    finally:
+        db.close()
+    
+    elapsed = time.perf_counter() - started
+    print(f"\nGenerated {colleges} colleges, {totals['students']:,} students, {totals['events']:,} events, "
+          f"{totals['registrations']:,} registrations and {totals['feedback']:,} feedback in {elapsed:.1f}s "
+          f"({totals['registrations'] / elapsed:,.0f} registrations/s)")
+    print(f"Accounts: admin@college<N>.scale.edu and student<i>@college<N>.scale.edu, password {SCALE_PASSWORD}")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create tables and seed demo or synthetic data")
+    parser.add_argument("--scale", action="store_true", help="Generate a large synthetic dataset instead of the demo data")
+    parser.add_argument("--colleges", type=int, default=10)
+    parser.add_argument("--students", type=int, default=200000, help="Total students across all colleges")
+    parser.add_argument("--events", type=int, default=20000, help="Total events across all colleges")
+    parser.add_argument("--registrations", type=int, default=2000000, help="Total registrations across all colleges")
+    parser.add_argument("--feedback-rate", type=float, default=0.35, help="Share of attendees who leave feedback")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per INSERT batch")
+    args = parser.parse_args()
+    
     print("Creating database tables...")
     create_tables()
-    print("Seeding database with sample data...")
-    seed_database()
+    if args.scale:
+        print("Generating synthetic data...")
+        seed_scale(
+            args.colleges, args.students, args.events, args.registrations,
+            args.feedback_rate, args.seed, args.batch_size
+        )
+    else:
+        print("Seeding database with sample data...")
+        seed_database()
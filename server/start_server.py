@@ -1,39 +1,156 @@
 #!/usr/bin/env python3
 """
-Simple FastAPI server launcher
+FastAPI server launcher
+
+    python start_server.py                           # development: one process, auto-reload
+    python start_server.py --production              # one worker per CPU
+    python start_server.py --production --workers 4
+
+Production mode runs the migrate step once, imports the app once in this
+process, binds the socket and forks the workers from it, so they share the
+imported code and start without re-importing anything. Each worker warms its
+connection pools and event calendars (warmup.py) before it accepts
+connections. Workers that die are replaced; SIGTERM or Ctrl+C stops them all.
 """
-import sys
+import argparse
 import os
+import signal
+import sys
+import tempfile
+import time
+import traceback
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-try:
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, else the CPUs this process may run on"""
+    if os.getenv("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def run_development(host: str, port: int) -> None:
     import uvicorn
-    from main import app
+    from migrate import migrate
     
     print("🚀 Starting Campus Spark API server...")
     print("📚 API Documentation available at:")
-    print("   - Swagger UI: http://localhost:8000/docs")
-    print("   - ReDoc: http://localhost:8000/redoc")
+    print(f"   - Swagger UI: http://localhost:{port}/docs")
+    print(f"   - ReDoc: http://localhost:{port}/redoc")
     print("\n🔑 Sample login credentials:")
     print("   - Admin: admin@techuniv.edu / admin123")
     print("   - Student: alice@techuniv.edu / student123")
     print("\nPress Ctrl+C to stop the server\n")
     
+    migrate()
+    # Reload needs an import string: the reloader re-imports the app on every change
     uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
+        "main:app",
+        host=host,
+        port=port,
         reload=True,
         log_level="info"
     )
     
-except ImportError as e:
-    print(f"❌ Import error: {e}")
-    print("Please make sure all dependencies are installed:")
-    print("   pip install -r requirements.txt")
-except Exception as e:
-    print(f"❌ Error starting server: {e}")
-    import traceback
-    traceback.print_exc()
+def _fork_worker(config, sock) -> int:
+    import uvicorn
+
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            uvicorn.Server(config).run(sockets=[sock])
+        except BaseException:
+            traceback.print_exc()
+            os._exit(1)
+        os._exit(0)
+    return pid
+
+def run_production(host: str, port: int, workers: int, migrate_first: bool, access_log: bool = True) -> None:
+    import uvicorn
+
+    if migrate_first:
+        from migrate import migrate
+
+        print(f"Schema {migrate()}")
+
+    # Prometheus needs a directory shared by the workers, set before metrics.py is imported
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="campus_spark_metrics_")
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): uvicorn spawns workers that import the app themselves
+        uvicorn.run("main:app", host=host, port=port, workers=workers, log_level="info", access_log=access_log)
+        return
+
+    # Preload: the app and everything it imports are loaded once, before forking
+    from main import app
+    from database import engine
+
+    # Forked workers must not share connections: close the ones the migrate
+    # step opened (the async engines are never used in this process)
+    engine.dispose()
+
+    config = uvicorn.Config(app, host=host, port=port, log_level="info", access_log=access_log)
+    sock = config.bind_socket()
+    print(f"Serving on http://{host}:{port} with {workers} worker(s)")
+
+    children = {_fork_worker(config, sock) for _ in range(workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}; starting a replacement")
+            # Don't spin if workers fail on startup
+            time.sleep(1)
+            children.add(_fork_worker(config, sock))
+    sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Start the Campus Spark API server")
+    parser.add_argument("--production", action="store_true", help="Preloaded app, several workers, no reload")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--no-migrate", action="store_true", help="Skip the migrate step (it ran separately)")
+    parser.add_argument("--no-access-log", action="store_true", help="Don't log every request")
+    args = parser.parse_args()
+
+    try:
+        if args.production:
+            run_production(
+                args.host, args.port, args.workers or default_workers(),
+                migrate_first=not args.no_migrate, access_log=not args.no_access_log
+            )
+        else:
+            run_development(args.host, args.port)
+    except ImportError as e:
+        print(f"❌ Import error: {e}")
+        print("Please make sure all dependencies are installed:")
+        print("   pip install -r requirements.txt")
+    except Exception as e:
+        print(f"❌ Error starting server: {e}")
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
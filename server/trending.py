@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Time-decayed trending scores for /events/popular.
+
+Every sign-up adds a weight of 2^(t / half-life) to its event's score, with t
+measured from a fixed epoch, and cancelling takes the same weight back out.
+Dividing all scores by 2^(now / half-life) would give the familiar decayed
+count (a sign-up counts 1 when new, 1/2 one half-life later, ...), but that
+factor is the same for every event, so the ranking never changes between
+writes and stored scores never need refreshing. Scores are stored as log2 of
+the sum to stay in floating-point range, and updated in the same transaction
+as the registration they describe.
+
+Registrations loaded outside the API (bulk imports, seed data) carry no
+weight until the scores are rebuilt:
+
+    python trending.py --rebuild
+"""
+
+import argparse
+import math
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, engine
+from models import Base, Event, Registration, RegistrationStatus
+
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24))
+# Fixed for good: moving it would change the meaning of every stored score
+TRENDING_EPOCH = datetime(2000, 1, 1)
+# Score of an event nobody has signed up for (real scores are far above it)
+NO_SCORE = 0.0
+# A removal leaving less than this share of the sum empties the score
+_REMAINDER_FLOOR = 1e-12
+
+def sign_up_weight(registered_at: datetime) -> float:
+    """log2 of the weight a sign-up at `registered_at` adds to its event's score"""
+    if registered_at.tzinfo is not None:
+        registered_at = registered_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return (registered_at - TRENDING_EPOCH).total_seconds() / (TRENDING_HALF_LIFE_HOURS * 3600)
+
+def add_weights(score: float, weights: Iterable[float]) -> float:
+    for weight in weights:
+        if score == NO_SCORE:
+            score = weight
+        else:
+            high, low = max(score, weight), min(score, weight)
+            score = high + math.log2(1 + 2 ** (low - high))
+    return score
+
+def remove_weights(score: float, weights: Iterable[float]) -> float:
+    for weight in weights:
+        # A larger weight was never added, e.g. a row bulk-loaded since the last rebuild
+        if score == NO_SCORE or weight > score:
+            continue
+        remainder = 1 - 2 ** (weight - score)
+        score = score + math.log2(remainder) if remainder > _REMAINDER_FLOOR else NO_SCORE
+    return score
+
+async def bump_trending(
+    db: AsyncSession,
+    event_id: int,
+    added: Iterable[datetime] = (),
+    removed: Iterable[datetime] = ()
+) -> None:
+    """Add and remove sign-ups from the event's score in the caller's transaction.
+
+    Call it after the write that changed the registrations: on SQLite that
+    write already holds the database lock, and elsewhere FOR UPDATE locks the
+    event row, so concurrent bumps can't overwrite each other.
+    """
+    score = (await db.execute(
+        select(Event.trending_score).where(Event.id == event_id).with_for_update()
+    )).scalar_one()
+    new_score = remove_weights(
+        add_weights(score, map(sign_up_weight, filter(None, added))),
+        map(sign_up_weight, filter(None, removed))
+    )
+    if new_score != score:
+        await db.execute(
+            update(Event).where(Event.id == event_id).values(
+                trending_score=new_score
+            ).execution_options(synchronize_session=False)
+        )
+
+def rebuild_trending_scores(db: Session, college_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute the scores of the given colleges' events (all events if None). Does not commit."""
+    events = select(Event.id)
+    if college_ids is not None:
+        events = events.where(Event.college_id.in_(list(college_ids)))
+    scores = {event_id: NO_SCORE for event_id in db.scalars(events)}
+    if not scores:
+        return 0
+
+    sign_ups = db.query(Registration.event_id, Registration.registration_date).filter(
+        Registration.status != RegistrationStatus.CANCELLED,
+        Registration.registration_date.isnot(None)
+    )
+    if college_ids is not None:
+        sign_ups = sign_ups.filter(Registration.event_id.in_(events))
+    for event_id, registered_at in sign_ups.yield_per(10000):
+        scores[event_id] = add_weights(scores[event_id], [sign_up_weight(registered_at)])
+
+    db.execute(update(Event), [{"id": event_id, "trending_score": score} for event_id, score in scores.items()])
+    return len(scores)
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain event trending scores")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every score from the registrations")
+    parser.add_argument("--college-id", type=int, action="append", help="Limit to these colleges")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_trending_scores(db, args.college_id)
+        db.commit()
+        print(f"Rebuilt trending scores for {count} event(s)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import DB_POOL_SIZE, AsyncSessionLocal, async_engine
+from event_calendar import EVENT_CALENDAR_ENABLED, get_calendar
+from models import CollegeStats
+from read_replicas import replica_engines
+
+# Worker warm-up, run from the app's startup event. uvicorn only starts
+# accepting connections once startup is complete, so with several workers on
+# one socket the first requests go to workers that are ready instead of
+# paying for connection setup (SQLite pragmas, TLS to PostgreSQL) and the
+# first event calendar builds themselves.
+#
+# Failures are logged rather than raised: a replica that is down is taken
+# out of the rotation by the first request anyway, and a database without
+# its schema (migrate.py not run) fails loudly on every request.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Connections opened per engine (the primary's and each replica's)
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", min(max(DB_POOL_SIZE, 1), 4)))
+# Event calendars built up front, for the colleges with the most events
+WARMUP_CALENDAR_COLLEGES = int(os.getenv("WARMUP_CALENDAR_COLLEGES", 8))
+
+startup_logger = logging.getLogger("campus_spark.startup")
+
+async def _open_connections(engine: AsyncEngine, count: int) -> None:
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held at the same time, so the pool ends up with `count` distinct connections
+    await asyncio.gather(*(touch() for _ in range(count)))
+
+async def _build_calendars(count: int) -> int:
+    async with AsyncSessionLocal() as db:
+        colleges = (await db.execute(
+            select(CollegeStats).order_by(CollegeStats.total_events.desc()).limit(count)
+        )).scalars().all()
+        for stats in colleges:
+            await get_calendar(db, stats)
+    return len(colleges)
+
+async def warm_up() -> dict:
+    """Fill the connection pools and event calendars; milliseconds per step"""
+    timings = {}
+    steps = [("primary_pool", _open_connections(async_engine, WARMUP_CONNECTIONS))]
+    steps += [
+        (f"replica{i}_pool", _open_connections(engine, WARMUP_CONNECTIONS))
+        for i, engine in enumerate(replica_engines(), 1)
+    ]
+    if EVENT_CALENDAR_ENABLED and WARMUP_CALENDAR_COLLEGES > 0:
+        steps.append(("calendars", _build_calendars(WARMUP_CALENDAR_COLLEGES)))
+
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            await step
+        except (DBAPIError, OSError) as exc:
+            startup_logger.warning(json.dumps({"event": "warmup_failed", "step": name, "error": str(exc)[:200]}))
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    startup_logger.info(json.dumps({"event": "warmup", "pid": os.getpid(), "ms": timings}))
+    return timings